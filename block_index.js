@@ -0,0 +1,232 @@
+// block_index.js
+// Per-bot index of the "interesting" blocks in loaded chunks: logs, ores,
+// mature / growing crops and chests. Each column is classified once when it
+// loads (sections whose palette holds nothing interesting are skipped without
+// touching a block) and then kept current from blockUpdate, so tasks ask the
+// index for the nearest logs instead of walking every block in range.
+// A freshly loaded column first gets a surface pass (heightmap plus the band
+// above the ground, where trees, crops and most chests are) so surface work can
+// start right away; the full walk that also finds ores comes after.
+const Vec3 = require('vec3');
+const { CATEGORIES, blockSets } = require('./block_registry');
+const { SurfaceCache, sectionStates } = require('./surface_cache');
+
+const SURFACE_CATEGORIES = ['logs', 'crops_mature', 'crops_growing', 'chests'].map(name => CATEGORIES.indexOf(name) + 1);
+
+class BlockIndex {
+    constructor(bot) {
+        this.bot = bot;
+        this.table = blockSets(bot).categories;
+        this.surface = new SurfaceCache(bot);
+        // "cx,cz" -> array (one per category) of Sets of packed column-local positions
+        this.columns = new Map();
+        // columns waiting for their surface pass, then for the full walk
+        this.surfaceQueue = [];
+        this.queue = [];
+        // "cx,cz" keys still waiting in the queue (stream() may index them early)
+        this.queued = new Set();
+        this.pumpScheduled = false;
+    }
+
+    get minY() {
+        return this.bot.game && typeof this.bot.game.minY === 'number' ? this.bot.game.minY : 0;
+    }
+
+    categoryOf(stateId) {
+        return stateId < this.table.length ? this.table[stateId] : 0;
+    }
+
+    // x/z are 0..15 inside the column; y is offset from minY (up to 4064 blocks tall)
+    pack(x, y, z) {
+        return ((y - this.minY) << 8) | ((z & 15) << 4) | (x & 15);
+    }
+
+    emptyColumn() {
+        return CATEGORIES.map(() => new Set());
+    }
+
+    // Columns are classified one per setImmediate so a burst of chunk loads
+    // after spawn or a teleport does not stall packet handling.
+    // Surface passes go first: they are cheap and are what tree and farm work wait on.
+    queueColumn(chunkX, chunkZ) {
+        this.surfaceQueue.push([chunkX, chunkZ]);
+        this.queue.push([chunkX, chunkZ]);
+        this.queued.add(`${chunkX},${chunkZ}`);
+        if (this.pumpScheduled) return;
+        this.pumpScheduled = true;
+        setImmediate(() => this.pump());
+    }
+
+    pump() {
+        this.pumpScheduled = false;
+        const surface = this.surfaceQueue.shift();
+        if (surface) {
+            const key = `${surface[0]},${surface[1]}`;
+            // stream() may have run the surface pass (or the full walk) already
+            if (this.queued.has(key) && !this.columns.has(key)) this.indexSurface(surface[0], surface[1]);
+        } else {
+            const next = this.queue.shift();
+            if (!next) return;
+            if (this.queued.has(`${next[0]},${next[1]}`)) this.indexColumn(next[0], next[1]);
+        }
+        if (this.surfaceQueue.length || this.queue.length) {
+            this.pumpScheduled = true;
+            setImmediate(() => this.pump());
+        }
+    }
+
+    get pending() {
+        return this.queued.size;
+    }
+
+    // Heightmap plus the surface-band logs, crops and chests of a column; the
+    // full walk in indexColumn() later replaces these sets.
+    indexSurface(chunkX, chunkZ) {
+        const column = this.bot.world.getColumn(chunkX, chunkZ);
+        if (!column || !this.surface.build(chunkX, chunkZ, column)) return;
+        const sets = this.emptyColumn();
+        this.surface.scanBand(chunkX, chunkZ, state => SURFACE_CATEGORIES.includes(this.categoryOf(state)), (x, y, z, state) => {
+            sets[this.categoryOf(state) - 1].add(this.pack(x, y, z));
+        });
+        this.columns.set(`${chunkX},${chunkZ}`, sets);
+    }
+
+    indexColumn(chunkX, chunkZ) {
+        this.queued.delete(`${chunkX},${chunkZ}`);
+        const column = this.bot.world.getColumn(chunkX, chunkZ);
+        if (!column) return;
+        if (!this.surface.columns.has(`${chunkX},${chunkZ}`)) this.surface.build(chunkX, chunkZ, column);
+        const sets = this.emptyColumn();
+        const minY = typeof column.minY === 'number' ? column.minY : this.minY;
+        const sections = column.sections || [];
+        const pos = new Vec3(0, 0, 0);
+        for (let s = 0; s < sections.length; s++) {
+            const states = sectionStates(sections[s]);
+            if (states && !states.some(state => this.categoryOf(state))) continue;
+            const baseY = minY + s * 16;
+            for (let y = 0; y < 16; y++) {
+                pos.y = baseY + y;
+                for (let z = 0; z < 16; z++) {
+                    pos.z = z;
+                    for (let x = 0; x < 16; x++) {
+                        pos.x = x;
+                        const category = this.categoryOf(column.getBlockStateId(pos));
+                        if (category) sets[category - 1].add(this.pack(x, pos.y, z));
+                    }
+                }
+            }
+        }
+        this.columns.set(`${chunkX},${chunkZ}`, sets);
+    }
+
+    dropColumn(chunkX, chunkZ) {
+        this.columns.delete(`${chunkX},${chunkZ}`);
+        this.surface.drop(chunkX, chunkZ);
+    }
+
+    update(oldBlock, newBlock) {
+        const block = newBlock || oldBlock;
+        if (!block) return;
+        this.surface.update(oldBlock, newBlock);
+        const p = block.position;
+        const sets = this.columns.get(`${p.x >> 4},${p.z >> 4}`);
+        if (!sets) return; // not indexed yet; the queued scan will read the new state
+        const key = this.pack(p.x, p.y, p.z);
+        const before = oldBlock ? this.categoryOf(oldBlock.stateId) : 0;
+        const after = newBlock ? this.categoryOf(newBlock.stateId) : 0;
+        if (before === after) return;
+        if (before) sets[before - 1].delete(key);
+        if (after) sets[after - 1].add(key);
+    }
+
+    // Positions of a category within maxDistance of point, nearest first.
+    near(category, point, maxDistance, count = Infinity) {
+        const c = CATEGORIES.indexOf(category);
+        if (c < 0) throw new Error(`Unknown block category: ${category}`);
+        const minY = this.minY;
+        const r2 = maxDistance * maxDistance;
+        const found = [];
+        const x0 = Math.floor((point.x - maxDistance) / 16), x1 = Math.floor((point.x + maxDistance) / 16);
+        const z0 = Math.floor((point.z - maxDistance) / 16), z1 = Math.floor((point.z + maxDistance) / 16);
+        for (let cx = x0; cx <= x1; cx++) {
+            for (let cz = z0; cz <= z1; cz++) {
+                const sets = this.columns.get(`${cx},${cz}`);
+                if (!sets) continue;
+                for (const key of sets[c]) {
+                    const x = cx * 16 + (key & 15);
+                    const z = cz * 16 + ((key >> 4) & 15);
+                    const y = (key >> 8) + minY;
+                    const dx = x - point.x, dy = y - point.y, dz = z - point.z;
+                    const d2 = dx * dx + dy * dy + dz * dz;
+                    if (d2 <= r2) found.push({ d2, x, y, z });
+                }
+            }
+        }
+        found.sort((a, b) => a.d2 - b.d2);
+        if (found.length > count) found.length = count;
+        return found.map(f => new Vec3(f.x, f.y, f.z));
+    }
+
+    // Same results as near(), but as an async iterator with no result cap.
+    // Chunk columns are visited in rings around point, yielding the event loop
+    // after every column it had to index and after every ring, and a hit is released as soon as no unvisited ring can hold anything
+    // closer, so the caller starts on the nearest blocks while the rest of the
+    // area is still being searched. Queued columns are indexed when reached:
+    // for a surface category the surface pass is enough, anything else needs
+    // the full walk.
+    async *stream(category, point, maxDistance) {
+        const c = CATEGORIES.indexOf(category);
+        if (c < 0) throw new Error(`Unknown block category: ${category}`);
+        const surfaceOnly = SURFACE_CATEGORIES.includes(c + 1);
+        const origin = new Vec3(point.x, point.y, point.z);
+        const ocx = Math.floor(origin.x / 16);
+        const ocz = Math.floor(origin.z / 16);
+        const rings = Math.ceil(maxDistance / 16) + 1;
+        const r2 = maxDistance * maxDistance;
+        let held = [];
+        for (let ring = 0; ring <= rings; ring++) {
+            const minY = this.minY;
+            for (let dx = -ring; dx <= ring; dx++) {
+                for (let dz = -ring; dz <= ring; dz++) {
+                    if (Math.max(Math.abs(dx), Math.abs(dz)) !== ring) continue;
+                    const cx = ocx + dx, cz = ocz + dz;
+                    const key = `${cx},${cz}`;
+                    if (this.queued.has(key) && (!surfaceOnly || !this.columns.has(key))) {
+                        if (surfaceOnly) this.indexSurface(cx, cz);
+                        else this.indexColumn(cx, cz);
+                        await new Promise(resolve => setImmediate(resolve));
+                    }
+                    const sets = this.columns.get(key);
+                    if (!sets) continue;
+                    for (const key of sets[c]) {
+                        const x = cx * 16 + (key & 15);
+                        const z = cz * 16 + ((key >> 4) & 15);
+                        const y = (key >> 8) + minY;
+                        const d2 = (x - origin.x) ** 2 + (y - origin.y) ** 2 + (z - origin.z) ** 2;
+                        if (d2 <= r2) held.push({ d2, x, y, z });
+                    }
+                }
+            }
+            // every column in a later ring is at least ring * 16 blocks away horizontally
+            held.sort((a, b) => a.d2 - b.d2);
+            const safe = (ring * 16) ** 2;
+            let ready = 0;
+            while (ready < held.length && held[ready].d2 <= safe) ready++;
+            const out = held.slice(0, ready);
+            held = held.slice(ready);
+            for (const f of out) yield new Vec3(f.x, f.y, f.z);
+            await new Promise(resolve => setImmediate(resolve));
+        }
+        for (const f of held) yield new Vec3(f.x, f.y, f.z);
+    }
+
+    counts() {
+        const totals = Object.fromEntries(CATEGORIES.map(name => [name, 0]));
+        for (const sets of this.columns.values()) {
+            CATEGORIES.forEach((name, i) => { totals[name] += sets[i].size; });
+        }
+        return { columns: this.columns.size, pending: this.queued.size, surface: this.surface.counts(), ...totals };
+    }
+}
+
+module.exports = { BlockIndex, CATEGORIES, sectionStates };
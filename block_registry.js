@@ -0,0 +1,131 @@
+// block_registry.js
+// Block and entity id sets the bot's scans match against, built once per
+// bot.version from the minecraft-data registry and shared by every bot on that
+// version. Matching an id against a Set replaces the per-block name closures
+// (name.includes('log') && !name.includes('stripped'), metadata === 7, ...),
+// and id arrays let findBlocks rule out a whole section from its palette.
+
+const CATEGORIES = ['logs', 'ores', 'crops_mature', 'crops_growing', 'chests'];
+const CROPS = ['wheat', 'carrots', 'potatoes', 'beetroots'];
+
+const setsByVersion = new Map();
+
+// Pre-1.13 registries have no state ids; mineflayer uses (type << 4) | metadata.
+function stateRange(block) {
+    if (typeof block.minStateId === 'number') return [block.minStateId, block.maxStateId];
+    return [block.id << 4, (block.id << 4) | 15];
+}
+
+// Value of one block property in a state: properties are laid out in registry
+// order with the last one varying fastest.
+function propertyValue(block, stateId, property) {
+    const states = block.states || [];
+    let stride = 1;
+    for (let i = states.length - 1; i >= 0; i--) {
+        if (states[i].name === property) {
+            return Math.floor((stateId - block.minStateId) / stride) % states[i].num_values;
+        }
+        stride *= states[i].num_values;
+    }
+    return null;
+}
+
+// Highest age of a crop block; pre-flattening metadata is the age and
+// beetroots top out at 3, the rest at 7.
+function maxAge(block) {
+    if (typeof block.minStateId !== 'number') return block.name === 'beetroots' ? 3 : 7;
+    const age = (block.states || []).find(s => s.name === 'age');
+    return age ? age.num_values - 1 : 0;
+}
+
+// Age of a crop Block (mineflayer/prismarine-block instance).
+function cropAge(registry, block) {
+    const entry = registry.blocks[block.type];
+    if (!entry || typeof entry.minStateId !== 'number') return block.metadata;
+    return propertyValue(entry, block.stateId, 'age');
+}
+
+// State ids of a crop that is fully grown (age at its maximum).
+function matureStates(block) {
+    const [low, high] = stateRange(block);
+    const top = maxAge(block);
+    if (typeof block.minStateId !== 'number') return [low | top];
+    const out = [];
+    for (let s = low; s <= high; s++) {
+        if (propertyValue(block, s, 'age') === top) out.push(s);
+    }
+    return out;
+}
+
+function buildSets(registry) {
+    const logs = new Set();
+    const ores = new Set();
+    const chests = new Set();
+    const crops = new Set();
+    const matureCrops = new Set();
+    const cropMaxAge = new Map();
+    // blocks that fall when the block under them is dug
+    const falling = new Set();
+    let maxState = 0;
+
+    for (const b of registry.blocksArray) {
+        const name = b.name;
+        maxState = Math.max(maxState, stateRange(b)[1]);
+        if (name.includes('log') && !name.includes('stripped')) logs.add(b.id);
+        else if (name.endsWith('_ore') || name === 'ancient_debris') ores.add(b.id);
+        else if (name.endsWith('chest')) chests.add(b.id);
+        else if (['sand', 'red_sand', 'gravel', 'suspicious_sand', 'suspicious_gravel'].includes(name) || name.endsWith('concrete_powder')) falling.add(b.id);
+        else if (CROPS.includes(name)) {
+            crops.add(b.id);
+            cropMaxAge.set(b.id, maxAge(b));
+            for (const s of matureStates(b)) matureCrops.add(s);
+        }
+    }
+
+    // stateId -> category number (index in CATEGORIES + 1, 0 = none), for the block index
+    const categories = new Uint8Array(maxState + 1);
+    const code = (name) => CATEGORIES.indexOf(name) + 1;
+    for (const b of registry.blocksArray) {
+        let category = 0;
+        if (logs.has(b.id)) category = code('logs');
+        else if (ores.has(b.id)) category = code('ores');
+        else if (chests.has(b.id)) category = code('chests');
+        else if (crops.has(b.id)) category = code('crops_growing');
+        if (!category) continue;
+        const [low, high] = stateRange(b);
+        for (let s = low; s <= high; s++) {
+            categories[s] = category === code('crops_growing') && matureCrops.has(s) ? code('crops_mature') : category;
+        }
+    }
+
+    // terrain a tree or crop stands on: full blocks that are not logs or leaves
+    const ground = new Uint8Array(maxState + 1);
+    const air = new Uint8Array(maxState + 1);
+    for (const b of registry.blocksArray) {
+        const [low, high] = stateRange(b);
+        if (b.name === 'air' || b.name === 'cave_air' || b.name === 'void_air') air.fill(1, low, high + 1);
+        else if (b.boundingBox === 'block' && !logs.has(b.id) && !b.name.endsWith('leaves')) ground.fill(1, low, high + 1);
+    }
+
+    const hostileMobs = new Set();
+    for (const e of registry.entitiesArray || []) {
+        if (e.type === 'hostile' || e.category === 'Hostile mobs') hostileMobs.add(e.name);
+    }
+
+    return {
+        logs, ores, chests, crops, matureCrops, cropMaxAge, falling, hostileMobs, categories, ground, air,
+        // plain id arrays for bot.findBlocks({ matching }) (palette fast path)
+        ids: { logs: [...logs], ores: [...ores], chests: [...chests], crops: [...crops] },
+    };
+}
+
+function blockSets(bot) {
+    let sets = setsByVersion.get(bot.version);
+    if (!sets) {
+        sets = buildSets(bot.registry);
+        setsByVersion.set(bot.version, sets);
+    }
+    return sets;
+}
+
+module.exports = { CATEGORIES, blockSets, propertyValue, cropAge };
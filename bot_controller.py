@@ -1,139 +1,670 @@
-import subprocess
-import threading
-import json
+import asyncio
+import collections
+import contextlib
+import itertools
 import time
 import os
 
+import bridge
+
 HOST = "localhost"
 PORT = 52387
 USERNAME = "IsaacsFembo(y)t"
 ALLOWED_USER = "Isaacthebomb360"
 COMMAND_PREFIX = "!"
+WRAPPER = os.path.join(os.path.dirname(os.path.abspath(__file__)), "mineflayer_wrapper.js")
+# When set, each bot's wrapper runs detached and listens on <dir>/<username>.sock,
+# so restarting this script reattaches instead of logging the bot in again.
+SOCKET_DIR = os.environ.get("BRIDGE_SOCKET_DIR")
+# When set, mirrored chunks are kept in memory-mapped region files under
+# <dir>/<host>_<port>/<dimension>/ and reused after a restart (world_cache.py).
+WORLD_CACHE_DIR = os.environ.get("WORLD_CACHE_DIR")
+
+# Rate of the wrapper's delta-compressed state frames (position, health, task...)
+STATE_RATE_HZ = 5
+
+# Outbound command queue. Retargeting commands coalesce while still queued:
+# only the newest follow/come target is worth sending to a busy wrapper.
+MAX_QUEUE = 256
+OVERFLOW_POLICIES = ("reject", "drop_oldest")
+COALESCE_COMMANDS = {"follow", "come", "subscribe"}
+# coalesced commands whose args are partial updates: merged, not replaced
+MERGE_COMMANDS = {"subscribe"}
+# wrapper events that feed a ChunkMirror instead of on_event/on_chat
+CHUNK_EVENTS = {"chunk_section", "block_update", "chunk_unload", "world_reset"}
+# !stripmine patterns (mine_layouts.js), plus "ores" for whole veins in the box
+STRIPMINE_MODES = ("tunnel", "branch", "volume", "ores")
+
+class CommandError(Exception):
+    """Raised through a command's Future when the wrapper replies with an error."""
+
+    def __init__(self, event):
+        super().__init__(event.get("message", "command failed"))
+        self.event = event
+
+class QueueFull(CommandError):
+    """Raised through a command's Future when the outbound queue overflowed."""
+
+def coalesce_key(command, args, bot=None):
+    if command not in COALESCE_COMMANDS:
+        return None
+    if command == "subscribe":
+        return (command, args.get("event"))
+    return (command, bot)
+
+class BotProcess:
+    """One ``mineflayer_wrapper.js`` bot driven over asyncio streams.
+
+    Everything runs on the event loop: no reader threads, and chat handlers
+    are scheduled as tasks so a slow handler never stalls event intake. A
+    single controller can hold as many of these as it likes.
+
+    Without ``socket_path`` the wrapper is a child process talking over
+    stdin/stdout and dies with us. With ``socket_path`` the wrapper runs
+    detached and listens on that Unix socket: ``start()`` attaches to a
+    running wrapper (spawning one only if none is listening) and ``stop()``
+    merely detaches, leaving the bot logged in. ``role="observer"`` attaches
+    read-only next to the controller, e.g. for metrics or dashboards.
+    """
+
+    def __init__(self, username=USERNAME, host=HOST, port=PORT, on_chat=None,
+                 socket_path=None, role="controller", on_event=None,
+                 max_queue=MAX_QUEUE, overflow="drop_oldest", usernames=None):
+        if overflow not in OVERFLOW_POLICIES:
+            raise ValueError(f"overflow must be one of {OVERFLOW_POLICIES}")
+        self.username = username
+        # more than one name hosts the whole crew in this single wrapper process
+        self.usernames = list(usernames) if usernames else [username]
+        self.handles = {}
+        # bot id -> latest state, merged from the wrapper's delta frames
+        self.states = {}
+        # bot id -> ChunkMirror, only for bots that enable_mirror() was called for
+        self.mirrors = {}
+        # bot id -> cache dir its mirror was enabled with, to re-open it per dimension
+        self.mirror_cache_dirs = {}
+        self.host = host
+        self.port = port
+        self.on_chat = on_chat or handle_chat
+        self.on_event = on_event
+        self.socket_path = socket_path
+        self.role = role
+        self.proc = None
+        self.reader = None
+        self.writer = None
+        self.reader_task = None
+        self.framing = "json"
+        # command id -> (Futures, time sent, ms queued); filled by the writer, drained by the reader
+        self.pending = {}
+        self.command_ids = itertools.count(1)
+        self.tasks = set()
+        # outbound queue, drained by write_commands(); coalescing looks entries up by key
+        self.max_queue = max_queue
+        self.overflow = overflow
+        self.outbox = collections.deque()
+        self.queued_by_key = {}
+        self.outbox_ready = asyncio.Event()
+        self.queue_stats = {
+            "enqueued": 0, "sent": 0, "coalesced": 0, "dropped": 0, "rejected": 0,
+            "max_depth": 0, "wait_ms_total": 0.0, "wait_ms_max": 0.0,
+        }
+
+    def wrapper_env(self):
+        env = os.environ.copy()
+        env.update({
+            "HOST": self.host, "PORT": str(self.port), "USERNAME": self.username,
+            "USERNAMES": ",".join(self.usernames),
+        })
+        env.setdefault("BRIDGE_FRAMING", bridge.preferred_framing())
+        return env
+
+    async def start(self):
+        if self.socket_path is None:
+            early_events = await self.spawn_stdio()
+        else:
+            try:
+                early_events = await self.attach()
+            except (FileNotFoundError, ConnectionRefusedError) as err:
+                if self.role != "controller":
+                    raise
+                if isinstance(err, ConnectionRefusedError):
+                    # nobody listening: left behind by a wrapper that was killed
+                    with contextlib.suppress(FileNotFoundError):
+                        os.unlink(self.socket_path)
+                early_events = await self.spawn_detached()
+        print(f"[{self.username}] Bridge framing: {self.framing}")
+        self.reader_task = self.spawn(self.read_output(early_events))
+        self.spawn(self.write_commands())
+        if self.role == "controller":
+            # handle_chat ignores everything but ALLOWED_USER's prefixed commands,
+            # so let the wrapper drop the rest before it ever reaches the pipe
+            self.subscribe("chat", senders=[ALLOWED_USER], prefix=COMMAND_PREFIX)
+            for name in self.usernames:
+                self.stream_state(STATE_RATE_HZ, bot=name)
+        return self
+
+    async def spawn_stdio(self):
+        self.proc = await asyncio.create_subprocess_exec(
+            "node", WRAPPER,
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+            env=self.wrapper_env(),
+            limit=bridge.STREAM_LIMIT,
+        )
+        self.reader, self.writer = self.proc.stdout, self.proc.stdin
+        self.spawn(self.read_error())
+        # The wrapper's first stdout line names the framing both sides use from here on.
+        self.framing, early_events = await bridge.read_handshake(self.reader)
+        return early_events
+
+    async def spawn_detached(self, timeout=15):
+        env = self.wrapper_env()
+        env["BRIDGE_SOCKET"] = self.socket_path
+        with open(self.socket_path + ".log", "ab") as log:
+            # own session: the wrapper must outlive this controller and its Ctrl-C
+            await asyncio.create_subprocess_exec(
+                "node", WRAPPER,
+                stdin=asyncio.subprocess.DEVNULL,
+                stdout=log,
+                stderr=log,
+                env=env,
+                start_new_session=True,
+            )
+        # attach as soon as it accepts; the path alone may appear before it listens
+        deadline = time.monotonic() + timeout
+        while True:
+            try:
+                return await self.attach()
+            except (FileNotFoundError, ConnectionRefusedError):
+                if time.monotonic() > deadline:
+                    raise TimeoutError(f"wrapper did not open {self.socket_path}") from None
+                await asyncio.sleep(0.1)
 
-env = os.environ.copy()
-env.update({"HOST": HOST, "PORT": str(PORT), "USERNAME": USERNAME})
-
-proc = subprocess.Popen(
-    ["node", "mineflayer_wrapper.js"],
-    stdin=subprocess.PIPE,
-    stdout=subprocess.PIPE,
-    stderr=subprocess.PIPE,
-    text=True,
-    env=env,
-)
-
-def read_output():
-    for line in proc.stdout:
-        if not line:
-            continue
-        print("NODE OUT RAW:", line.strip())
+    async def attach(self):
+        self.reader, self.writer = await asyncio.open_unix_connection(self.socket_path, limit=bridge.STREAM_LIMIT)
+        framing = os.environ.get("BRIDGE_FRAMING", bridge.preferred_framing())
+        self.writer.write(bridge.encode({"command": "hello", "framing": framing, "role": self.role}, "json"))
+        self.framing, early_events = await bridge.read_handshake(self.reader)
+        return early_events
+
+    def spawn(self, coro):
+        task = asyncio.create_task(coro)
+        self.tasks.add(task)
+        task.add_done_callback(self.tasks.discard)
+        return task
+
+    async def read_output(self, early_events=()):
+        for event in early_events:
+            self.handle_event(event)
         try:
-            event = json.loads(line.strip())
-            if event.get("event") == "chat":
-                handle_chat(event["user"], event["message"])
+            async for event in bridge.iter_messages(self.reader, self.framing):
+                self.handle_event(event)
+        finally:
+            # also when a handler raises: nothing would ever resolve these otherwise
+            self.fail_pending("wrapper connection closed")
+
+    async def read_error(self):
+        while line := await self.proc.stderr.readline():
+            print(f"[{self.username}] NODE ERR:", line.decode("utf-8", "replace").strip())
+
+    def handle_event(self, event):
+        if event.get("event") in ("result", "error") and event.get("id") is not None:
+            self.resolve_command(event)
+            return
+        if event.get("event") == "state":
+            self.update_state(event)
+            if self.on_event is not None:
+                self.on_event(self, event)
+        elif event.get("event") in CHUNK_EVENTS:
+            mirror = self.mirrors.get(event.get("bot"))
+            if mirror is not None and event["event"] == "world_reset":
+                self.reset_mirror(event.get("bot"), mirror, event)
+            elif mirror is not None:
+                mirror.apply(event)
+        elif self.on_event is not None:
+            self.on_event(self, event)
+        elif event.get("event") == "chat":
+            self.spawn(self.on_chat(self.bot(event.get("bot")), event["user"], event["message"]))
+        else:
+            print(f"[{self.username}] NODE EVENT:", event)
+
+    def update_state(self, event):
+        bot_id = event.get("bot")
+        state = self.states.setdefault(bot_id, {})
+        if not event.get("full") and state.get("seq") is not None and event["seq"] != state["seq"] + 1:
+            # a delta went missing (e.g. we reattached mid-stream); fetch a full snapshot
+            self.spawn(self.resync_state(bot_id))
+        if event.get("full"):
+            state.clear()
+        for key, value in event.items():
+            if key not in ("event", "bot", "full"):
+                state[key] = value
+
+    async def resync_state(self, bot_id):
+        reply = await self.send_command("state", {}, bot=bot_id)
+        self.states[bot_id] = dict(reply["data"])
+
+    def stream_state(self, rate_hz, bot=None):
+        """Ask the wrapper for delta state frames at ``rate_hz`` (0 turns them off)."""
+        return self.send_command("state_stream", {"rate_hz": rate_hz}, bot=bot)
+
+    def state_of(self, bot_id=None):
+        """Latest known state of a bot (position, yaw, health, food, held, task...)."""
+        return self.states.get(bot_id if bot_id is not None else self.usernames[0], {})
+
+    async def enable_mirror(self, bot=None, cache_dir=WORLD_CACHE_DIR):
+        """Mirror a bot's loaded chunks into NumPy arrays (see chunk_mirror.py).
+
+        Loads the block state table, subscribes to the wrapper's chunk feed and
+        asks for a dump of the columns already loaded; later loads and block
+        changes keep the mirror current on their own. With ``cache_dir`` the
+        mirror is backed by memory-mapped region files (world_cache.py), so
+        what earlier runs saw is queryable before any chunk arrives. Needs numpy.
+        """
+        import chunk_mirror
+
+        bot_id = bot if bot is not None else self.usernames[0]
+        mirror = self.mirrors.get(bot_id)
+        if mirror is None:
+            mirror = self.mirrors[bot_id] = chunk_mirror.ChunkMirror()
+            reply = await self.send_command("block_states", {}, bot=bot_id)
+            data = reply["data"]
+            mirror.load_block_states(data)
+            self.mirror_cache_dirs[bot_id] = cache_dir
+            self.attach_world_cache(mirror, cache_dir)
+            self.subscribe("chunks")
+            self.subscribe("block_update")
+            await self.send_command("chunk_dump", {}, bot=bot_id)
+        return mirror
+
+    def attach_world_cache(self, mirror, cache_dir):
+        if not cache_dir:
+            return
+        import world_cache
+
+        mirror.attach_cache(world_cache.WorldCache(
+            os.path.join(cache_dir, f"{self.host}_{self.port}"), mirror.dimension,
+            mirror.version, mirror.min_y, mirror.height, mirror.block_states,
+        ))
+
+    def reset_mirror(self, bot_id, mirror, event):
+        """The bot changed dimension: start its mirror over on that dimension's cache."""
+        if (event["dimension"], event["min_y"], event["height"]) == (mirror.dimension, mirror.min_y, mirror.height):
+            return
+        mirror.switch_world(event["dimension"], event["min_y"], event["height"])
+        self.attach_world_cache(mirror, self.mirror_cache_dirs.get(bot_id))
+
+    def mirror_of(self, bot_id=None):
+        """The bot's ChunkMirror, or None if enable_mirror() was not called for it."""
+        return self.mirrors.get(bot_id if bot_id is not None else self.usernames[0])
+
+    def resolve_command(self, event):
+        entry = self.pending.pop(event["id"], None)
+        if entry is None:
+            return
+        futures, sent_at, queued_ms = entry
+        event["round_trip_ms"] = (time.perf_counter() - sent_at) * 1000
+        event["queued_ms"] = queued_ms
+        for future in futures:
+            if future.done():
+                continue
+            if event.get("event") == "error":
+                future.set_exception(CommandError(event))
             else:
-                print("NODE EVENT:", event)
-        except json.JSONDecodeError:
-            pass
+                future.set_result(event)
+
+    def fail_pending(self, reason):
+        entries = [futures for futures, _, _ in self.pending.values()]
+        entries += [entry["futures"] for entry in self.outbox]
+        self.pending.clear()
+        self.outbox.clear()
+        self.queued_by_key.clear()
+        for futures in entries:
+            for future in futures:
+                if not future.done():
+                    future.set_exception(CommandError({"message": reason}))
+
+    def bot(self, bot_id):
+        """Handle addressing one bot of this wrapper (None = the wrapper's default bot)."""
+        if bot_id is None:
+            return self
+        handle = self.handles.get(bot_id)
+        if handle is None:
+            handle = self.handles[bot_id] = BotHandle(self, bot_id)
+        return handle
+
+    def spawn_bot(self, bot_id, username=None, host=None, port=None):
+        """Log another bot in, hosted inside this same wrapper process."""
+        args = {"bot": bot_id, "username": username or bot_id}
+        if host is not None:
+            args["host"] = host
+        if port is not None:
+            args["port"] = port
+        return self.send_command("spawn_bot", args)
+
+    def send_command(self, command, args, bot=None):
+        """Queue a command for the wrapper and return an asyncio Future for its reply.
+
+        The Future resolves with the wrapper's ``result`` event (``data``,
+        ``elapsed_ms`` spent in Node, ``round_trip_ms`` from write to reply,
+        ``queued_ms`` spent waiting in the outbound queue) or raises
+        CommandError if the wrapper answered with an ``error`` event.
+
+        A follow/come (or subscribe for the same event) that is still queued
+        is replaced by the newer one; both Futures get the newer command's
+        reply. A subscribe only sends the options that change, so its args
+        are merged over the queued ones instead. If something else for the same bot was queued after the old
+        one, the newer command goes to the tail instead, so it still runs
+        after that (``follow A``, ``stop``, ``follow B`` sends ``stop``,
+        ``follow B``). When the queue is full the ``overflow`` policy either rejects
+        the new command or drops the oldest queued one, failing its Future
+        with QueueFull.
+
+        ``bot`` addresses one bot of a multi-bot wrapper; see bot().
+        """
+        future = asyncio.get_running_loop().create_future()
+        future.add_done_callback(lambda f: self.report_failure(command, f))
+        stats = self.queue_stats
+        key = coalesce_key(command, args, bot)
+        queued = self.queued_by_key.get(key) if key is not None else None
+        futures = [future]
+        queued_at = time.perf_counter()
+        if queued is not None:
+            stats["coalesced"] += 1
+            if command in MERGE_COMMANDS:
+                args = {**queued["message"]["args"], **args}
+            if not self.queued_after(queued, bot):
+                queued["message"]["args"] = args
+                queued["futures"].append(future)
+                return future
+            self.outbox.remove(queued)
+            self.forget_queued(queued)
+            futures = queued["futures"] + futures
+            queued_at = queued["queued_at"]
+        elif len(self.outbox) >= self.max_queue:
+            if self.overflow == "reject":
+                stats["rejected"] += 1
+                future.set_exception(QueueFull({"message": f"outbound queue full, {command} rejected"}))
+                return future
+            oldest = self.outbox.popleft()
+            self.forget_queued(oldest)
+            stats["dropped"] += 1
+            for dropped in oldest["futures"]:
+                if not dropped.done():
+                    dropped.set_exception(QueueFull({"message": "dropped from full outbound queue"}))
+        message = {"command": command, "args": args}
+        if bot is not None:
+            message["bot"] = bot
+        entry = {
+            "message": message,
+            "futures": futures,
+            "key": key,
+            "queued_at": queued_at,
+        }
+        self.outbox.append(entry)
+        if key is not None:
+            self.queued_by_key[key] = entry
+        if queued is None:
+            stats["enqueued"] += 1
+        stats["max_depth"] = max(stats["max_depth"], len(self.outbox))
+        self.outbox_ready.set()
+        return future
+
+    def queued_after(self, entry, bot):
+        """Whether a command for ``bot`` is queued behind ``entry``."""
+        for later in reversed(self.outbox):
+            if later is entry:
+                return False
+            if later["message"].get("bot") == bot:
+                return True
+        return False
+
+    def forget_queued(self, entry):
+        if entry["key"] is not None and self.queued_by_key.get(entry["key"]) is entry:
+            del self.queued_by_key[entry["key"]]
+
+    async def write_commands(self):
+        """Dedicated writer: drain the outbound queue in one write per wakeup.
+
+        ``drain()`` blocks while the wrapper is not reading, which is what
+        lets commands pile up here, where they can coalesce or overflow,
+        instead of in the pipe.
+        """
+        stats = self.queue_stats
+        while True:
+            await self.outbox_ready.wait()
+            self.outbox_ready.clear()
+            chunks = []
+            now = time.perf_counter()
+            while self.outbox:
+                entry = self.outbox.popleft()
+                self.forget_queued(entry)
+                command_id = next(self.command_ids)
+                message = dict(entry["message"], id=command_id)
+                waited = (now - entry["queued_at"]) * 1000
+                stats["wait_ms_total"] += waited
+                stats["wait_ms_max"] = max(stats["wait_ms_max"], waited)
+                stats["sent"] += 1
+                self.pending[command_id] = (entry["futures"], now, waited)
+                chunks.append(bridge.encode(message, self.framing))
+            if not chunks:
+                continue
+            try:
+                self.writer.write(b"".join(chunks))
+                await self.writer.drain()
+            except (OSError, RuntimeError) as e:
+                self.fail_pending(f"write to wrapper failed: {e}")
+                return
+
+    def metrics(self):
+        """Snapshot of outbound queue depth, coalescing/drop counters and wait times."""
+        stats = dict(self.queue_stats)
+        stats["depth"] = len(self.outbox)
+        stats["in_flight"] = len(self.pending)
+        stats["wait_ms_avg"] = stats["wait_ms_total"] / stats["sent"] if stats["sent"] else 0.0
+        return stats
+
+    def report_failure(self, command, future):
+        # fire-and-forget callers (chat handlers) never look at the result,
+        # so failures are logged here instead of vanishing
+        if not future.cancelled() and future.exception() is not None:
+            print(f"[{self.username}] command {command} failed: {future.exception()}")
+
+    def subscribe(self, event, enabled=True, senders=None, prefix=None, sample_rate=None):
+        """Turn a wrapper event type on/off and push its filters into Node.
 
-def read_error():
-    for line in proc.stderr:
-        if line:
-            print("NODE ERR:", line.strip())
+        ``senders`` (allowlist) and ``prefix`` apply to ``chat``;
+        ``sample_rate`` (0..1) thins chatty events such as ``health`` and
+        ``entity_moved``. Options left as None keep the wrapper's setting.
+        """
+        args = {"event": event, "enabled": enabled}
+        if senders is not None:
+            args["senders"] = list(senders)
+        if prefix is not None:
+            args["prefix"] = prefix
+        if sample_rate is not None:
+            args["sample_rate"] = sample_rate
+        return self.send_command("subscribe", args)
 
-def handle_chat(user, msg):
+    def send_batch(self, commands, stop_on_error=True, bot=None):
+        """Send several (command, args) pairs as one frame, run in order by the wrapper.
+
+        Returns a single Future whose result ``data`` holds ``completed``,
+        ``total`` and one entry per executed step. With ``stop_on_error`` the
+        wrapper skips the remaining steps after the first failure.
+        """
+        steps = [{"command": command, "args": args} for command, args in commands]
+        return self.send_command("batch", {"commands": steps, "stop_on_error": stop_on_error}, bot=bot)
+
+    async def wait(self):
+        """Wait until the wrapper exits (stdio) or closes our connection (socket)."""
+        await self.reader_task
+        if self.socket_path is None:
+            return await self.proc.wait()
+
+    async def stop(self):
+        """Terminate a stdio wrapper; for a socket wrapper only detach."""
+        if self.socket_path is None:
+            if self.proc and self.proc.returncode is None:
+                self.proc.terminate()
+                await self.proc.wait()
+        elif self.writer is not None:
+            self.writer.close()
+            try:
+                await self.writer.wait_closed()
+            except (ConnectionError, BrokenPipeError):
+                pass
+        for task in list(self.tasks):
+            task.cancel()
+        for mirror in self.mirrors.values():
+            if mirror.cache is not None:
+                mirror.cache.flush()
+
+class BotHandle:
+    """One bot inside a multi-bot wrapper; every command it sends is addressed to it."""
+
+    def __init__(self, process, bot_id):
+        self.process = process
+        self.bot_id = bot_id
+        self.username = bot_id
+
+    def send_command(self, command, args):
+        return self.process.send_command(command, args, bot=self.bot_id)
+
+    def send_batch(self, commands, stop_on_error=True):
+        return self.process.send_batch(commands, stop_on_error, bot=self.bot_id)
+
+    @property
+    def state(self):
+        return self.process.state_of(self.bot_id)
+
+    def enable_mirror(self):
+        return self.process.enable_mirror(self.bot_id)
+
+    @property
+    def mirror(self):
+        return self.process.mirror_of(self.bot_id)
+
+    def remove(self):
+        return self.process.send_command("remove_bot", {"bot": self.bot_id})
+
+def pick_target(bot, words):
+    """Take an ``@<bot id>`` word out of a chat command: the bot it names, else ``bot``."""
+    for word in words:
+        if word.startswith("@") and len(word) > 1:
+            words.remove(word)
+            process = getattr(bot, "process", bot)
+            known = {bot_id.lower(): bot_id for bot_id in [*process.usernames, *process.handles]}
+            return process.bot(known.get(word[1:].lower(), word[1:]))
+    return bot
+
+async def handle_chat(bot, user, msg):
     if user != ALLOWED_USER or not msg.startswith(COMMAND_PREFIX):
         return
-    cmd = msg[len(COMMAND_PREFIX):].strip().lower()
-    args = cmd.split()
+    # one bot of the crew passes the line on; "@<bot>" anywhere sends it to another
+    words = msg[len(COMMAND_PREFIX):].split()
+    bot = pick_target(bot, words)
+    args = [word.lower() for word in words]
     if not args:
         return
     command = args[0]
     
     match command:
         case "hello":
-            send_command("chat", {"message": f"Hello {user}!"})
+            bot.send_command("chat", {"message": f"Hello {user}!"})
         case "status":
-            send_command("chat", {"message": "All systems nominal."})
+            bot.send_command("chat", {"message": "All systems nominal."})
         case "time":
-            send_command("chat", {"message": f"Current time is {time.strftime('%H:%M:%S')}"})
+            bot.send_command("chat", {"message": f"Current time is {time.strftime('%H:%M:%S')}"})
         case "date":
-            send_command("chat", {"message": f"Today's date is {time.strftime('%Y-%m-%d')}"})
+            bot.send_command("chat", {"message": f"Today's date is {time.strftime('%Y-%m-%d')}"})
         case "report":
-            send_command("chat", {"message": f"Status report for {time.strftime('%Y-%m-%d %H:%M:%S')}: All systems nominal."})
+            bot.send_command("chat", {"message": f"Status report for {time.strftime('%Y-%m-%d %H:%M:%S')}: All systems nominal."})
             
         case "jump":
-            send_command("jump", {})
+            bot.send_command("jump", {})
         case "come":
-            send_command("come", {"player": user})
+            bot.send_command("come", {"player": user})
         case "respawn":
-            send_command("respawn", {})
+            bot.send_command("respawn", {})
         case "help":
-            send_command("help", {})
+            bot.send_command("help", {})
         case "chest":
-            send_command("chest", {})
+            bot.send_command("chest", {})
         case "follow":
             target = args[1] if len(args) > 1 else user
-            send_command("follow", {"player": target})
+            bot.send_command("follow", {"player": target})
         case "stop":
-            send_command("stop", {})
+            bot.send_command("stop", {})
         case "deforest":
-            send_command("deforest", {})
+            bot.send_command("deforest", {})
         case "farm":
-            send_command("farm", {})
+            bot.send_command("farm", {})
         case "stripmine":
-            if len(args) > 6:
-                send_command("stripmine", {
+            mode = args[7] if len(args) > 7 else "tunnel"
+            try:
+                if len(args) < 7 or mode not in STRIPMINE_MODES:
+                    raise ValueError(mode)
+                command = {
                     "start": {"x": int(args[1]), "y": int(args[2]), "z": int(args[3])},
-                    "end": {"x": int(args[4]), "y": int(args[5]), "z": int(args[6])}
-                })
+                    "end": {"x": int(args[4]), "y": int(args[5]), "z": int(args[6])},
+                    "mode": mode,
+                }
+                if mode == "branch":
+                    for name, value in zip(("spacing", "length"), args[8:10]):
+                        command[name] = int(value)
+                        if command[name] < 1:
+                            raise ValueError(value)
+            except ValueError:
+                bot.send_command("chat", {"message": "Usage: !stripmine x1 y1 z1 x2 y2 z2 [tunnel|branch [spacing] [length]|volume|ores]"})
             else:
-                send_command("chat", {"message": "Usage: !stripmine x1 y1 z1 x2 y2 z2"})
+                bot.send_command("stripmine", command)
         case "equip":
-            send_command("equip", {})
+            bot.send_command("equip", {})
         case "defend":
-            send_command("defend", {})
+            bot.send_command("defend", {})
         case "sethome":
-            send_command("sethome", {})
+            bot.send_command("sethome", {})
         case "home":
-            send_command("home", {})
+            bot.send_command("home", {})
         case "auto":
             if len(args) > 1:
                 if args[1] == "on":
-                    send_command("auto", {"state": True})
+                    bot.send_command("auto", {"state": True})
                 elif args[1] == "off":
-                    send_command("auto", {"state": False})
+                    bot.send_command("auto", {"state": False})
                 else:
-                    send_command("chat", {"message": "Usage: !auto <on/off>"})
+                    bot.send_command("chat", {"message": "Usage: !auto <on/off>"})
             else:
-                send_command("auto", {})
+                bot.send_command("auto", {})
         case _:
-            send_command("chat", {"message": f"Unknown command: {command}"})
+            bot.send_command("chat", {"message": f"Unknown command: {command}"})
 '''
         case "move":
             if len(args) > 1:
-                send_command("move", {"direction": args[1]})
+                bot.send_command("move", {"direction": args[1]})
             else :
-                send_command("chat", {"message": "Usage: !move <direction>"})
+                bot.send_command("chat", {"message": "Usage: !move <direction>"})
         case "pickup":
-            send_command("pickup", {})
+            bot.send_command("pickup", {})
         case "chop":
-            send_command("chop", {})
+            bot.send_command("chop", {})
         case "follow-me":
-            send_command("follow-me", {"player": user})
+            bot.send_command("follow-me", {"player": user})
 '''
 
-def send_command(command, args):
-    msg = json.dumps({"command": command, "args": args}) + "\n"
-    proc.stdin.write(msg)
-    proc.stdin.flush()
-
-threading.Thread(target=read_output, daemon=True).start()
-threading.Thread(target=read_error, daemon=True).start()
+async def main(usernames=(USERNAME,)):
+    # the whole crew shares one wrapper process (and one copy of mineflayer)
+    socket_path = os.path.join(SOCKET_DIR, f"{usernames[0]}.sock") if SOCKET_DIR else None
+    wrapper = BotProcess(usernames[0], usernames=usernames, socket_path=socket_path)
+    await wrapper.start()
+    try:
+        await wrapper.wait()
+    finally:
+        await wrapper.stop()
 
-try:
-    while proc.poll() is None:
-        time.sleep(1)
-except KeyboardInterrupt:
-    print("Stopping bot...")
-    proc.terminate()
+if __name__ == "__main__":
+    try:
+        asyncio.run(main())
+    except KeyboardInterrupt:
+        print("Stopping bot...")
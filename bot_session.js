@@ -0,0 +1,1518 @@
+// bot_session.js
+// One mineflayer bot and everything it can do. mineflayer_wrapper.js hosts any
+// number of these in one process, keyed by bot id.
+const fs = require('fs');
+const mineflayer = require('mineflayer');
+const { pathfinder, Movements, goals: { GoalBlock, GoalNear } } = require('mineflayer-pathfinder');
+const mcData = require('minecraft-data');
+const Vec3 = require('vec3');
+const { BlockIndex } = require('./block_index');
+const { blockSets } = require('./block_registry');
+const { CropLedger, plotKey } = require('./crop_ledger');
+const { VeinFinder } = require('./vein_finder');
+const { EntityIndex } = require('./entity_index');
+const { ContainerLedger } = require('./container_ledger');
+const { runBatch } = require('./command_batch');
+const { groupTrees, planTour } = require('./tree_planner');
+const { REACH, candidateSpots, bestSpot, planStep, withFallingCover } = require('./dig_planner');
+const { tunnelCells, branchCells, volumeCells, exposedBlocks } = require('./mine_layouts');
+const { BAND, fieldRectangles, serpentineStops, bandCells, fieldCells } = require('./field_planner');
+
+const MATERIAL_PRIORITY = ['netherite', 'diamond', 'iron', 'chainmail', 'gold', 'leather'];
+// what to replant each crop with
+const SEED_FOR = { wheat: 'wheat_seeds', carrots: 'carrot', potatoes: 'potato', beetroots: 'beetroot_seeds' };
+// the item every mature crop drops at least one of
+const PRODUCE_OF = { wheat: 'wheat', carrots: 'carrot', potatoes: 'potato', beetroots: 'beetroot' };
+
+// -----------------------------
+// Shared per-version data
+// -----------------------------
+// minecraft-data already caches its registry per version. Movements precomputes
+// a dozen block-id sets from it on construction; bots on the same version share
+// those sets and only get their own bot reference and per-path scratch state.
+const movementTemplates = new Map();
+
+function sharedMovements(bot) {
+    const template = movementTemplates.get(bot.version);
+    if (!template) {
+        const move = new Movements(bot, mcData(bot.version));
+        movementTemplates.set(bot.version, move);
+        return move;
+    }
+    const move = Object.assign(Object.create(Movements.prototype), template);
+    move.bot = bot;
+    move.entityIntersections = {};
+    move.exclusionAreasStep = [...(template.exclusionAreasStep || [])];
+    move.exclusionAreasBreak = [...(template.exclusionAreasBreak || [])];
+    move.exclusionAreasPlace = [...(template.exclusionAreasPlace || [])];
+    return move;
+}
+
+// -----------------------------
+// Chunk section packing (for the Python chunk mirror)
+// -----------------------------
+// A 16x16x16 section is sent as a palette of block state ids plus one index per
+// block, packed LSB-first at ceil(log2(palette size)) bits. Block order is
+// y, z, x (index = (y * 16 + z) * 16 + x), which is what numpy reshapes to.
+function packSection(column, baseY) {
+    const pos = new Vec3(0, 0, 0);
+    const ids = new Uint16Array(4096);
+    const paletteIndex = new Map();
+    const palette = [];
+    let i = 0;
+    for (let y = 0; y < 16; y++) {
+        pos.y = baseY + y;
+        for (let z = 0; z < 16; z++) {
+            pos.z = z;
+            for (let x = 0; x < 16; x++) {
+                pos.x = x;
+                const state = column.getBlockStateId(pos);
+                let index = paletteIndex.get(state);
+                if (index === undefined) {
+                    index = palette.length;
+                    paletteIndex.set(state, index);
+                    palette.push(state);
+                }
+                ids[i++] = index;
+            }
+        }
+    }
+    const bits = palette.length <= 1 ? 0 : Math.ceil(Math.log2(palette.length));
+    const data = Buffer.alloc(Math.ceil(4096 * bits / 8));
+    let bit = 0;
+    for (let j = 0; bits && j < 4096; j++) {
+        const v = ids[j];
+        for (let b = 0; b < bits; b++, bit++) {
+            if (v & (1 << b)) data[bit >> 3] |= 1 << (bit & 7);
+        }
+    }
+    return { palette, bits, data };
+}
+
+// options: { host, port, username, homeFile }
+// bridge:  { sendEvent(event), wantsEvent(name, sender, text, selfName, botId) }
+function createBotSession(id, options, bridge) {
+    // every event this bot emits is addressed with its id
+    function sendEvent(event) {
+        bridge.sendEvent(Object.assign({ bot: id }, event));
+    }
+
+    function wantsEvent(name, sender, text) {
+        return bridge.wantsEvent(name, sender, text, bot.username, id);
+    }
+
+    const HOME_FILE = options.homeFile;
+    // contents of every container this bot has opened (container_ledger.js),
+    // one file per server and dimension, opened once the dimension is known
+    const containerLedger = new ContainerLedger();
+
+    function containerFile(dimension) {
+        const world = `${options.host || 'localhost'}_${options.port || 25565}_${dimension}`.replace(/[^A-Za-z0-9_.-]/g, '_');
+        return `${HOME_FILE.replace(/\.json$/, '')}_containers_${world}.json`;
+    }
+
+    const bot = mineflayer.createBot({ host: options.host, port: options.port, username: options.username });
+    bot.loadPlugin(pathfinder);
+
+    let autoMode = false;
+    let autoInterval = null;
+
+    let defaultMove;
+    // per-version id sets (logs, ores, chests, crops, hostile mobs) from block_registry.js
+    let known;
+    bot.once('spawn', () => {
+        bot.chat('Hello world!');
+        defaultMove = sharedMovements(bot);
+        known = blockSets(bot);
+        sendEvent({ event: 'spawn', message: 'Bot spawned!' });
+        bot.inventory.on('updateSlot', () => { inventoryVersion++; });
+        loadHome();
+        bot.chat('Boot Up complete! Ready for commands!');
+    });
+
+    // -----------------------------
+    // Persistence: home chest
+    // -----------------------------
+    let homeChest = null; // {x,y,z,world?}
+
+    function saveHome() {
+        try {
+            fs.writeFileSync(HOME_FILE, JSON.stringify(homeChest || null, null, 2), 'utf8');
+            bot.chat('Home chest saved.');
+        } catch (e) {
+            bot.chat(`Failed to save home: ${e.message}`);
+        }
+    }
+
+    function loadHome() {
+        try {
+            if (fs.existsSync(HOME_FILE)) {
+                const data = JSON.parse(fs.readFileSync(HOME_FILE, 'utf8'));
+                if (data && typeof data.x === 'number') {
+                    homeChest = data;
+                    bot.chat(`Loaded home chest at ${homeChest.x}, ${homeChest.y}, ${homeChest.z}`);
+                }
+            }
+        } catch (e) {
+            bot.chat(`Error loading home: ${e.message}`);
+        }
+    }
+
+    // -----------------------------
+    // Utilities: inventory, armor, weapons
+    // -----------------------------
+    function findBestArmorItemForSlot(slot) {
+        const slotNames = {
+            head: ['helmet', 'head'],
+            torso: ['chestplate', 'chest'],
+            legs: ['leggings', 'legs'],
+            feet: ['boots', 'feet']
+        };
+        const names = slotNames[slot];
+        const candidates = bot.inventory.items().filter(it => {
+            const nm = it.name.toLowerCase();
+            return names.some(n => nm.includes(n));
+        });
+        candidates.sort((a, b) => {
+            const an = a.name.toLowerCase();
+            const bn = b.name.toLowerCase();
+            const aIndex = MATERIAL_PRIORITY.findIndex(m => an.includes(m));
+            const bIndex = MATERIAL_PRIORITY.findIndex(m => bn.includes(m));
+            return (aIndex === -1 ? 99 : aIndex) - (bIndex === -1 ? 99 : bIndex);
+        });
+        return candidates.length ? candidates[0] : null;
+    }
+
+    async function equipBestArmor() {
+        try {
+            const slotMap = [
+                { name: 'head', equipSlot: 'head' },
+                { name: 'torso', equipSlot: 'torso' },
+                { name: 'legs', equipSlot: 'legs' },
+                { name: 'feet', equipSlot: 'feet' },
+            ];
+            for (const s of slotMap) {
+                const item = findBestArmorItemForSlot(s.name);
+                if (item) {
+                    try {
+                        await bot.equip(item, s.equipSlot);
+                        bot.chat(`Equipped ${item.name} in ${s.equipSlot}`);
+                    } catch (e) {
+                        bot.chat(`Couldn't equip ${item.name}: ${e.message}`);
+                    }
+                }
+            }
+        } catch (err) {
+            bot.chat(`Error during equip: ${err.message}`);
+        }
+    }
+
+    function findBestWeapon() {
+        const items = bot.inventory.items();
+        const weaponCandidates = items.filter(it => {
+            const n = it.name.toLowerCase();
+            return n.includes('sword') || n.includes('axe') || n.includes('trident');
+        });
+        weaponCandidates.sort((a, b) => {
+            const an = a.name.toLowerCase();
+            const bn = b.name.toLowerCase();
+            const aIndex = MATERIAL_PRIORITY.findIndex(m => an.includes(m));
+            const bIndex = MATERIAL_PRIORITY.findIndex(m => bn.includes(m));
+            return (aIndex === -1 ? 99 : aIndex) - (bIndex === -1 ? 99 : bIndex);
+        });
+        return weaponCandidates.length ? weaponCandidates[0] : null;
+    }
+
+    // -----------------------------
+    // Chest deposit helpers
+    // -----------------------------
+    async function openChestAt(block) {
+        let chest;
+        try {
+            chest = await bot.openChest(block);
+        } catch (e) {
+            // sometimes openChest fails due to range/lag — try pathing closer then open
+            bot.pathfinder.setMovements(defaultMove);
+            bot.pathfinder.setGoal(new GoalNear(block.position.x, block.position.y, block.position.z, 1));
+            await bot.waitForTicks(20);
+            chest = await bot.openChest(block);
+        }
+        // every chest we open is recorded, deposits and withdrawals included
+        containerLedger.track(block, chest);
+        return chest;
+    }
+
+    // Fetch one stack of an item from whichever known chest holds the most,
+    // opening a chest only when the ledger says it has some.
+    async function withdrawFromKnownChest(itemName) {
+        for (const { pos } of containerLedger.where(itemName)) {
+            const block = bot.blockAt(pos);
+            if (!block || !known.chests.has(block.type)) {
+                containerLedger.forget(pos);
+                continue;
+            }
+            try {
+                bot.pathfinder.setMovements(defaultMove);
+                bot.pathfinder.setGoal(new GoalNear(pos.x, pos.y, pos.z, 1));
+                await bot.waitForTicks(20);
+                const chest = await openChestAt(block);
+                const stack = chest.containerItems().find(i => i.name === itemName);
+                if (stack) await chest.withdraw(stack.type, null, stack.count);
+                chest.close();
+                if (stack) return bot.inventory.items().find(i => i.name === itemName) || null;
+            } catch (e) { }
+        }
+        return null;
+    }
+
+    async function depositAllIntoBlockChest(block) {
+        try {
+            const chest = await openChestAt(block);
+            const items = bot.inventory.items().filter(i => !i.name.includes('air') && !i.name.includes('chest'));
+            if (!items.length) {
+                chest.close();
+                bot.chat('Inventory empty, nothing to deposit.');
+                return true;
+            }
+            for (const item of items) {
+                try {
+                    await chest.deposit(item.type, null, item.count);
+                } catch (err) {
+                    bot.chat(`Couldn't deposit ${item.name}: ${err.message}`);
+                }
+            }
+            chest.close();
+            bot.chat('Deposited items into chest.');
+            return true;
+        } catch (err) {
+            bot.chat(`Failed to deposit into chest: ${err.message}`);
+            return false;
+        }
+    }
+
+    // Try deposit into home chest if set and reachable
+    async function depositToHomeChestIfSet() {
+        if (!homeChest) return false;
+        const b = bot.blockAt(homeChest);
+        if (!b) {
+            bot.chat('Saved home chest not found at coordinates.');
+            return false;
+        }
+        // path to home chest then deposit
+        try {
+            bot.pathfinder.setMovements(defaultMove);
+            bot.pathfinder.setGoal(new GoalNear(b.position.x, b.position.y, b.position.z, 1));
+            await bot.waitForTicks(20);
+            return await depositAllIntoBlockChest(b);
+        } catch (e) {
+            bot.chat(`Failed to deposit to home chest: ${e.message}`);
+            return false;
+        }
+    }
+
+    // Main chest command: use chest under/near bot, otherwise try home chest if set
+    async function placeChestAndDump() {
+        const botPos = new Vec3(
+            bot.entity.position.x,
+            bot.entity.position.y,
+            bot.entity.position.z
+        );
+
+        const below = bot.blockAt(botPos.offset(0, -1, 0));
+        const chestPos = blockIndex.near('chests', botPos, 4, 1)[0];
+        const nearbyChest = chestPos ? bot.blockAt(chestPos) : null;
+
+        // Case 1: Chest directly below
+        if (below && known.chests.has(below.type)) {
+            await depositAllIntoBlockChest(below);
+            return;
+        }
+
+        // Case 2: Nearby chest
+        if (nearbyChest) {
+            bot.chat(`Going to nearby chest at ${nearbyChest.position.x},${nearbyChest.position.y},${nearbyChest.position.z}`);
+            bot.pathfinder.setMovements(defaultMove);
+            bot.pathfinder.setGoal(new GoalNear(
+                new Vec3(nearbyChest.position.x, nearbyChest.position.y, nearbyChest.position.z),
+                1
+            ));
+            await bot.waitForTicks(20);
+            await depositAllIntoBlockChest(nearbyChest);
+            return;
+        }
+
+        // Case 3: Saved home chest
+        if (homeChest) {
+            bot.chat('No chest nearby, attempting to deposit to saved home chest...');
+            const ok = await depositToHomeChestIfSet(); // Make sure this uses Vec3 as well
+            if (ok) return;
+            bot.chat('Could not deposit to saved home chest.');
+            return;
+        }
+
+        bot.chat('No chest found nearby and no accessible home chest. Place a chest or use !sethome while standing on/next to a chest.');
+    }
+
+    // -----------------------------
+    // sethome / home handlers
+    // -----------------------------
+    async function setHomeAtNearbyChest() {
+        const botPos = new Vec3(
+            bot.entity.position.x,
+            bot.entity.position.y,
+            bot.entity.position.z
+        );
+        const below = bot.blockAt(botPos.offset(0, -1, 0));
+
+        const chestPos = blockIndex.near('chests', botPos, 3, 1)[0];
+        const nearbyChest = chestPos ? bot.blockAt(chestPos) : null;
+
+        let chestBlock = null;
+        if (below && known.chests.has(below.type)) chestBlock = below;
+        else if (nearbyChest) chestBlock = nearbyChest;
+
+        if (!chestBlock) {
+            bot.chat('No chest under/near you to set as home. Stand on/next to the chest and run !sethome.');
+            return;
+        }
+
+        homeChest = new Vec3(
+            chestBlock.position.x,
+            chestBlock.position.y,
+            chestBlock.position.z
+        );
+        saveHome(); // Make sure this serializes homeChest correctly
+        bot.chat(`Home chest set at ${homeChest.x}, ${homeChest.y}, ${homeChest.z}`);
+    }
+
+    async function goHomeAndDeposit() {
+        if (!homeChest) {
+            bot.chat('No home chest set. Use !sethome while standing by a chest.');
+            return;
+        }
+        // Ensure homeChest is Vec3
+        const homePos = new Vec3(homeChest.x, homeChest.y, homeChest.z);
+        const block = bot.blockAt(homePos);
+        if (!block || !known.chests.has(block.type)) {
+            bot.chat('Saved home chest not found at those coordinates.');
+            return;
+        }
+        bot.chat('Going to home chest to deposit...');
+        bot.pathfinder.setMovements(defaultMove);
+        bot.pathfinder.setGoal(new GoalNear(block.position.x, block.position.y, block.position.z, 1));
+        await bot.waitForTicks(20);
+        await depositAllIntoBlockChest(block);
+    }
+
+    // -----------------------------
+    // follow / come already implemented
+    // -----------------------------
+    function startFollowing(targetName) {
+        if (bot.followInterval) {
+            clearInterval(bot.followInterval);
+        }
+        bot.chat(`Following ${targetName}...`);
+        bot.pathfinder.setMovements(defaultMove);
+        bot.followInterval = setInterval(() => {
+            const player = bot.players[targetName]?.entity;
+            if (!player) {
+                bot.chat(`${targetName} disappeared! Stopping follow.`);
+                bot.pathfinder.stop();
+                clearInterval(bot.followInterval);
+                bot.followInterval = null;
+                return;
+            }
+            bot.pathfinder.setGoal(new GoalNear(player.position.x, player.position.y, player.position.z, 1));
+        }, 1000);
+    }
+
+    async function comeToPlayer(targetName) {
+        const playerEntity = bot.players[targetName]?.entity;
+        if (!playerEntity) {
+            bot.chat(`Can't find ${targetName}`);
+            return;
+        }
+        bot.pathfinder.setMovements(defaultMove);
+        bot.pathfinder.setGoal(new GoalNear(playerEntity.position.x, playerEntity.position.y, playerEntity.position.z, 1));
+        bot.chat(`Coming to you, ${targetName}!`);
+    }
+
+    // -----------------------------
+    // deforest (50 block radius) - tree by tree along a planned tour
+    // -----------------------------
+    // Logs within radius of center, collected in the background as the block
+    // index streams them ring by ring (nearest rings first), so felling starts
+    // on the first rings while farther ones are still being searched.
+    function streamLogs(center, radius) {
+        const pool = { logs: [], done: false };
+        (async () => {
+            try {
+                for await (const pos of blockIndex.stream('logs', center, radius)) pool.logs.push(pos);
+            } finally {
+                pool.done = true;
+            }
+        })().catch(err => bot.chat(`Log search failed: ${err.message}`));
+        return pool;
+    }
+
+    // The tree to fell next: first stop of a fresh tour from where the bot stands,
+    // over the logs released so far that are still there and not tried yet.
+    // Waits for the next ring if nothing is plannable yet; null once all are done.
+    async function nextTree(pool, tried) {
+        while (true) {
+            const logs = pool.logs.filter(p => {
+                if (tried.has(`${p.x},${p.y},${p.z}`)) return false;
+                const block = bot.blockAt(p);
+                return !!block && known.logs.has(block.type);
+            });
+            if (logs.length) return planTour(groupTrees(logs), bot.entity.position)[0];
+            if (pool.done) return null;
+            await new Promise(resolve => setImmediate(resolve));
+        }
+    }
+
+    async function deforest(radius = 50) {
+        bot.chat(`Scanning for unstripped logs within ${radius} blocks...`);
+        const logs = streamLogs(bot.entity.position.clone(), radius);
+        const started = Date.now();
+        // logs already attempted, chopped or not; never planned again
+        const tried = new Set();
+
+        let found = 0;
+        let trees = 0;
+        let choppedCount = 0;
+        let walks = 0;
+        let tree;
+        while ((tree = await nextTree(logs, tried))) {
+            if (++trees === 1) bot.chat('Found logs. Beginning deforesting...');
+            found += tree.logs.length;
+            const felled = await fellTree(tree, tried, () => {
+                choppedCount++;
+                if (choppedCount % 10 === 0) bot.chat(`Chopped ${choppedCount} logs...`);
+            });
+            walks += felled.walks;
+            if (felled.stopped) return { chopped: choppedCount, found, trees, walks, stopped: felled.stopped };
+        }
+
+        if (!found) {
+            bot.chat('No unstripped logs found nearby.');
+            return { chopped: 0 };
+        }
+
+        const rate = perMinute(choppedCount, started);
+        bot.chat(`Finished deforesting. Total chopped: ${choppedCount} of ${found} logs found in ${trees} trees (${rate}/min, ${walks} walks).`);
+        return { chopped: choppedCount, found, trees, walks, per_minute: rate };
+    }
+
+    function perMinute(count, started) {
+        return Math.round(count / Math.max((Date.now() - started) / 60000, 1 / 60));
+    }
+
+    // Dig planner callback: solid floor with room for feet and head.
+    function standable(x, y, z) {
+        const floor = bot.blockAt(new Vec3(x, y - 1, z));
+        const feet = bot.blockAt(new Vec3(x, y, z));
+        const head = bot.blockAt(new Vec3(x, y + 1, z));
+        return !!(floor && feet && head) && floor.boundingBox === 'block' && feet.boundingBox === 'empty' && head.boundingBox === 'empty';
+    }
+
+    // Fell one tree from as few standing spots as possible: walk to the spot that
+    // reaches the most logs left and dig all of those bottom-up without moving,
+    // then repeat. Logs no spot reaches (tall trunks) are walked to one at a time.
+    // Returns { stopped, walks }; stopped is set if deforesting has to end.
+    async function fellTree(tree, tried, onChopped) {
+        let remaining = tree.logs.slice();
+        const badSpots = new Set();
+        let walks = 0;
+        while (remaining.length) {
+            // check inventory fullness
+            const freeSlots = bot.inventory.emptySlotCount();
+            if (freeSlots <= 6) { // near-full -> try deposit
+                bot.chat('Inventory low — attempting to deposit to home chest if set...');
+                const deposited = await depositToHomeChestIfSet();
+                if (!deposited) {
+                    bot.chat('No home chest available; stopping deforest to avoid losing items.');
+                    return { stopped: 'inventory_full', walks };
+                }
+            }
+
+            const spots = candidateSpots(remaining, standable).filter(s => !badSpots.has(s.toString()));
+            const plan = bestSpot(remaining, spots, bot.entity.position);
+            const batch = plan ? plan.targets : [remaining[0]];
+            remaining = remaining.filter(p => !batch.includes(p));
+
+            try {
+                bot.pathfinder.setMovements(defaultMove);
+                walks++;
+                if (plan) await bot.pathfinder.goto(new GoalBlock(plan.spot.x, plan.spot.y, plan.spot.z));
+                else await bot.pathfinder.goto(new GoalNear(batch[0].x, batch[0].y, batch[0].z, 1));
+            } catch (err) {
+                if (plan) {
+                    // try the next best spot for these logs
+                    badSpots.add(plan.spot.toString());
+                    remaining = batch.concat(remaining);
+                    continue;
+                }
+                bot.chat(`Can't reach log at ${batch[0].x},${batch[0].y},${batch[0].z}: ${err.message}`);
+                tried.add(`${batch[0].x},${batch[0].y},${batch[0].z}`);
+                continue;
+            }
+
+            for (const pos of batch) {
+                tried.add(`${pos.x},${pos.y},${pos.z}`);
+                // double-check block still exists and can be dug from here
+                const current = bot.blockAt(pos);
+                if (!current || !bot.canDigBlock(current)) continue;
+                try {
+                    await bot.dig(current);
+                    onChopped();
+                } catch (err) {
+                    bot.chat(`Error chopping at ${pos.x},${pos.y},${pos.z}: ${err.message}`);
+                    // continue with next block
+                }
+            }
+        }
+        // the logs drop around the trunk's base, usually a couple of blocks from
+        // the spot they were cut from and out of pickup range
+        await collectDrops(tree.base, 4);
+        return { stopped: null, walks };
+    }
+
+    // ------------------------------
+    // Farming
+    // ------------------------------
+    // Fields (plots that touch, as rectangles) with mature crops near center are
+    // walked stop by stop in a serpentine; see farmField.
+    async function farmCrops(radius = 16, announce = true) {
+        const center = bot.entity.position.clone();
+        const started = Date.now();
+        cropLedger.syncFromIndex(blockIndex, center, radius);
+        const due = new Set(cropLedger.due(center, radius).map(plotKey));
+
+        if (!due.size) {
+            const wait = cropLedger.nextDueIn(center, radius);
+            if (announce) bot.chat(wait === null ? 'No mature crops found nearby.' : `No mature crops yet; next expected in ~${Math.ceil(wait)}s.`);
+            return { harvested: 0, replanted: 0, next_due_s: wait };
+        }
+
+        const plots = cropLedger.tracked(center, radius);
+        const names = new Map(plots.map(p => [plotKey(p.pos), p.name]));
+        const fields = fieldRectangles(plots.map(p => p.pos))
+            .filter(field => fieldCells(field).some(p => due.has(plotKey(p))))
+            .sort((a, b) => bot.entity.position.distanceTo(new Vec3(a.x0, a.y, a.z0)) - bot.entity.position.distanceTo(new Vec3(b.x0, b.y, b.z0)));
+        if (announce) bot.chat(`Found mature crops in ${fields.length} field(s). Starting farming...`);
+
+        const stats = { harvested: 0, replanted: 0, stops: 0 };
+        for (const field of fields) {
+            // bare farmland gets the field's most common crop
+            const counts = new Map();
+            for (const p of fieldCells(field)) {
+                const name = names.get(plotKey(p));
+                if (name) counts.set(name, (counts.get(name) || 0) + 1);
+            }
+            field.crop = [...counts.entries()].sort((a, b) => b[1] - a[1])[0][0];
+            field.crops = [...counts.keys()];
+            await farmField(field, stats);
+        }
+
+        const rate = perMinute(stats.harvested, started);
+        if (announce) bot.chat(`✅ Farming complete! ${stats.harvested} harvested, ${stats.replanted} replanted (${rate}/min, ${stats.stops} stops)`);
+        return { ...stats, per_minute: rate, next_due_s: cropLedger.nextDueIn(center, radius) };
+    }
+
+    // If there is no seed for a crop in the inventory, fetch some from a chest
+    // the ledger knows has them.
+    async function stockSeed(cropName) {
+        const seedName = SEED_FOR[cropName];
+        if (!seedName || bot.inventory.items().some(i => i.name === seedName)) return;
+        await withdrawFromKnownChest(seedName);
+    }
+
+    // Hold the seed for a crop, equipping only if something else is in hand, so
+    // one equip lasts a whole row. Returns false if the inventory has none.
+    async function holdSeed(cropName) {
+        const seedName = SEED_FOR[cropName];
+        if (!seedName) return false;
+        if (bot.heldItem && bot.heldItem.name === seedName) return true;
+        const seed = bot.inventory.items().find(i => i.name === seedName);
+        if (!seed) return false;
+        await bot.equip(seed, 'hand');
+        return true;
+    }
+
+    function countItems(names) {
+        return bot.inventory.items().filter(i => names.has(i.name)).reduce((sum, i) => sum + i.count, 0);
+    }
+
+    async function goToStop(stop) {
+        bot.pathfinder.setMovements(defaultMove);
+        try {
+            await bot.pathfinder.goto(new GoalBlock(stop.x, stop.y, stop.z));
+        } catch (err) {
+            // the stop itself may be water or blocked; next to it is close enough
+            try {
+                await bot.pathfinder.goto(new GoalNear(stop.x, stop.y, stop.z, 1));
+            } catch (err2) {
+                bot.chat(`Can't reach field stop ${stop.x},${stop.y},${stop.z}: ${err2.message}`);
+                return false;
+            }
+        }
+        return true;
+    }
+
+    // From each stop: dig every mature crop of its band, walk over the drops
+    // (most land out of pickup range of the stop), then go back and replant
+    // those plots and any bare farmland. Stops with nothing to do are skipped.
+    // A crop only counts as harvested once its produce is in the inventory.
+    async function farmField(field, stats) {
+        // seeds come from chests before the first stop, never from the middle of one
+        for (const crop of field.crops) await stockSeed(crop);
+        for (const stop of serpentineStops(field)) {
+            const mature = [];
+            const toPlant = [];
+            for (const pos of bandCells(stop, field)) {
+                const block = bot.blockAt(pos);
+                if (!block) continue;
+                if (known.matureCrops.has(block.stateId)) mature.push(block);
+                else if (block.name === 'air') {
+                    const soil = bot.blockAt(pos.offset(0, -1, 0));
+                    if (soil && soil.name === 'farmland') toPlant.push({ pos, crop: field.crop });
+                }
+            }
+            if (!mature.length && !toPlant.length) continue;
+            if (!(await goToStop(stop))) continue;
+            stats.stops++;
+
+            const produce = new Set(mature.map(block => PRODUCE_OF[block.name]));
+            const before = countItems(produce);
+            let dug = 0;
+            for (const block of mature) {
+                if (!bot.canDigBlock(block)) continue;
+                try {
+                    await bot.dig(block);
+                    dug++;
+                    toPlant.push({ pos: block.position, crop: block.name });
+                } catch (err) {
+                    bot.chat(`Error farming at ${block.position.x},${block.position.y},${block.position.z}: ${err.message}`);
+                }
+            }
+            if (dug) {
+                // the band's corners are ~2.8 blocks out; drops scatter a little further
+                await collectDrops(stop, BAND / 2 + 2);
+                stats.harvested += Math.min(dug, countItems(produce) - before);
+                if (!(await goToStop(stop))) continue;
+            }
+
+            // grouped by crop so the seed stays in hand
+            toPlant.sort((a, b) => a.crop.localeCompare(b.crop));
+            for (const { pos, crop } of toPlant) {
+                const soil = bot.blockAt(pos.offset(0, -1, 0));
+                if (!soil || soil.name !== 'farmland') continue;
+                try {
+                    if (!(await holdSeed(crop))) continue;
+                    await bot.placeBlock(soil, new Vec3(0, 1, 0));
+                    stats.replanted++;
+                } catch (err) {
+                    bot.chat(`Error replanting at ${pos.x},${pos.y},${pos.z}: ${err.message}`);
+                }
+            }
+        }
+    }
+
+    // ------------------------------
+    // mining
+    // ------------------------------
+    // ticks to wait for a falling block to land in a freshly dug cell
+    const REFILL_TICKS = 20;
+
+    // Whether a block still needs digging: there, solid and breakable.
+    function digTarget(pos) {
+        const block = bot.blockAt(pos);
+        return !!block && block.diggable && block.boundingBox === 'block';
+    }
+
+    // Resolves once the block at pos changes, or after `ticks` game ticks.
+    async function blockChange(pos, ticks) {
+        const event = `blockUpdate:${pos}`;
+        let onUpdate;
+        const changed = new Promise(resolve => { onUpdate = resolve; bot.once(event, onUpdate); });
+        try {
+            await Promise.race([changed, bot.waitForTicks(ticks)]);
+        } finally {
+            bot.removeListener(event, onUpdate);
+        }
+    }
+
+    // Dig every target from standing spots the dig planner picks, digging all it
+    // can from each spot before moving on. Targets no spot can see yet (ore behind
+    // stone) are walked to one at a time, the nearest first. A cell the plan digs
+    // again (a falling block drops into it) is waited on until the block lands;
+    // each cell gets at most two steps that actually dig it. Returns { dug, walks }.
+    async function digTargets(targets) {
+        const badSpots = new Set();
+        const env = {
+            standable: (x, y, z) => !badSpots.has(`${x},${y},${z}`) && standable(x, y, z),
+            blocked: (x, y, z) => {
+                const block = bot.blockAt(new Vec3(x, y, z));
+                return !block || block.boundingBox === 'block';
+            },
+            falling: (x, y, z) => {
+                const block = bot.blockAt(new Vec3(x, y, z));
+                return !!block && known.falling.has(block.type);
+            },
+        };
+        const attempts = new Map();
+        const attempt = (pos) => attempts.set(pos.toString(), (attempts.get(pos.toString()) || 0) + 1);
+        let remaining = withFallingCover(targets, env.falling);
+        let dug = 0;
+        let walks = 0;
+        while (true) {
+            remaining = remaining.filter(p => (attempts.get(p.toString()) || 0) < 2 && digTarget(p));
+            if (!remaining.length) break;
+            const step = planStep(remaining, env, bot.entity.position);
+            bot.pathfinder.setMovements(defaultMove);
+            walks++;
+            if (step) {
+                try {
+                    await bot.pathfinder.goto(new GoalBlock(step.spot.x, step.spot.y, step.spot.z));
+                } catch (err) {
+                    badSpots.add(`${step.spot.x},${step.spot.y},${step.spot.z}`);
+                    continue;
+                }
+            }
+            const digs = step ? step.digs : [remaining.reduce((a, b) => (
+                bot.entity.position.distanceTo(a) <= bot.entity.position.distanceTo(b) ? a : b))];
+            if (!step) {
+                const pos = digs[0];
+                try {
+                    await bot.pathfinder.goto(new GoalNear(pos.x, pos.y, pos.z, 1));
+                } catch (err) {
+                    attempt(pos);
+                    bot.chat(`Can't reach ${pos.x},${pos.y},${pos.z}: ${err.message}`);
+                    continue;
+                }
+            }
+            const tried = new Set();
+            for (const pos of digs) {
+                let block = bot.blockAt(pos);
+                // a repeat entry: sand or gravel from above is still falling into the cell
+                if (tried.has(pos.toString()) && !digTarget(pos)) {
+                    await blockChange(pos, REFILL_TICKS);
+                    block = bot.blockAt(pos);
+                }
+                if (!block || !digTarget(pos) || !bot.canDigBlock(block)) continue;
+                if (!tried.has(pos.toString())) attempt(pos);
+                tried.add(pos.toString());
+                try {
+                    await bot.dig(block);
+                    dug++;
+                } catch (err) {
+                    bot.chat(`Error mining at ${pos.x},${pos.y},${pos.z}: ${err.message}`);
+                }
+            }
+            // a spot can be up to REACH from what it dug, well out of pickup range
+            if (tried.size) await collectDrops(step ? step.spot : digs[0], REACH + 1);
+        }
+        return { dug, walks };
+    }
+
+    // Mine whole veins, nearest vein first (by its closest block).
+    async function mineVeins(veins) {
+        let dug = 0;
+        let walks = 0;
+        const start = bot.entity.position.clone();
+        const distance = (vein) => Math.min(...[...vein.blocks.values()].map(p => start.distanceTo(p)));
+        veins.sort((a, b) => distance(a) - distance(b));
+        for (const vein of veins) {
+            const result = await digTargets([...vein.blocks.values()]);
+            dug += result.dug;
+            walks += result.walks;
+        }
+        return { dug, walks };
+    }
+
+    // mode: tunnel | branch (options.spacing, options.length) | volume | ores
+    async function stripMineArea(startPos, endPos, mode = 'tunnel', options = {}) {
+        const spacing = options.spacing ?? 3, length = options.length ?? 16;
+        if (!(Number.isInteger(spacing) && spacing > 0 && Number.isInteger(length) && length > 0)) {
+            bot.chat('Branch spacing and length must be positive whole numbers.');
+            throw new Error(`Invalid branch spacing/length: ${spacing}, ${length}`);
+        }
+        bot.chat(`Starting ${mode} strip mine from ${startPos.x},${startPos.y},${startPos.z} to ${endPos.x},${endPos.y},${endPos.z}`);
+        const started = Date.now();
+
+        if (mode === 'ores') {
+            // every vein with ore in the area, followed out past the area's edge
+            const veins = veinFinder.inBox(blockIndex, startPos, endPos);
+            bot.chat(`Found ${veins.length} ore veins.`);
+            const { dug, walks } = await mineVeins(veins);
+            bot.chat(`✅ Strip mining complete! ${dug} blocks (${perMinute(dug, started)}/min, ${walks} walks)`);
+            return { dug, walks, veins: veins.length, per_minute: perMinute(dug, started) };
+        }
+
+        let cells;
+        if (mode === 'tunnel') cells = tunnelCells(startPos, endPos);
+        else if (mode === 'branch') cells = branchCells(startPos, endPos, spacing, length);
+        else if (mode === 'volume') cells = volumeCells(startPos, endPos);
+        else throw new Error(`Unknown stripmine mode: ${mode}`);
+
+        let { dug, walks } = await digTargets(cells);
+        const exposed = exposedBlocks(cells, p => digTarget(p));
+
+        // tunnels and branches are there to find ore: mine out every vein they opened up
+        let veins = 0;
+        if (mode !== 'volume') {
+            const found = new Map();
+            for (const p of cells) {
+                for (const n of [p.offset(1, 0, 0), p.offset(-1, 0, 0), p.offset(0, 1, 0), p.offset(0, -1, 0), p.offset(0, 0, 1), p.offset(0, 0, -1)]) {
+                    const block = bot.blockAt(n);
+                    if (!block || !known.ores.has(block.type)) continue;
+                    const vein = veinFinder.fill(n);
+                    if (vein) found.set(vein.id, vein);
+                }
+            }
+            veins = found.size;
+            const mined = await mineVeins([...found.values()]);
+            dug += mined.dug;
+            walks += mined.walks;
+        }
+
+        const rate = perMinute(dug, started);
+        const ratio = Math.round((exposed / Math.max(cells.length, 1)) * 100) / 100;
+        bot.chat(`✅ Strip mining complete! ${dug} blocks (${rate}/min, ${walks} walks), ${exposed} exposed (${ratio} per block), ${veins} veins`);
+        return { mode, dug, walks, per_minute: rate, exposed, exposed_per_dug: ratio, veins };
+    }
+
+    // -----------------------------
+    // defend / combat improvements
+    // -----------------------------
+    function startDefending() {
+        if (bot.defendInterval) {
+            bot.chat('Already in defense mode.');
+            return;
+        }
+
+        bot.chat('Entering defense mode: I will engage nearby hostile mobs.');
+
+        // continuous loop
+        bot.defendInterval = setInterval(async () => {
+            try {
+                // Equip best armor occasionally
+                await equipBestArmor();
+
+                // nearest hostile mob, straight from the entity index
+                const mobs = entityIndex.nearest('hostile', bot.entity.position, 50, 1);
+
+                if (!mobs.length) return;
+
+                const target = mobs[0];
+                const dist = bot.entity.position.distanceTo(target.position);
+
+                // if target too far, skip
+                if (dist > 50) return;
+
+                // equip best weapon
+                const weapon = findBestWeapon();
+                if (weapon) {
+                    try { await bot.equip(weapon, 'hand'); } catch (e) { }
+                }
+
+                // approach target
+                bot.pathfinder.setMovements(defaultMove);
+                bot.pathfinder.setGoal(new GoalNear(target.position.x, target.position.y, target.position.z, 1));
+
+                // when in melee range, attack
+                if (bot.entity.position.distanceTo(target.position) <= 3.5) {
+                    try {
+                        bot.attack(target);
+                    } catch (e) {
+                        // ignore attack errors
+                    }
+                }
+
+                // If bot health low, retreat to home if available
+                if (bot.health && bot.health < 6) {
+                    bot.chat('Low health — attempting to retreat.');
+                    if (homeChest) {
+                        const block = bot.blockAt(homeChest);
+                        if (block) {
+                            bot.pathfinder.setGoal(new GoalNear(block.position.x, block.position.y, block.position.z, 1));
+                            await bot.waitForTicks(40);
+                        }
+                    } else {
+                        // try to run away — move backward for a bit
+                        bot.setControlState('back', true);
+                        await new Promise(r => setTimeout(r, 2000));
+                        bot.setControlState('back', false);
+                    }
+                }
+            } catch (err) {
+                // ignore per-iteration issues
+            }
+        }, 700);
+    }
+
+    function stopAllIntervals() {
+        if (bot.followInterval) {
+            clearInterval(bot.followInterval);
+            bot.followInterval = null;
+        }
+        if (bot.defendInterval) {
+            clearInterval(bot.defendInterval);
+            bot.defendInterval = null;
+        }
+        bot.pathfinder.stop();
+        bot.chat('Stopped active behaviors.');
+    }
+
+    // automated stuff
+    async function depositAllExceptTools() {
+        if (!homeChest) {
+            bot.chat("No home chest set! Use !sethome while standing on a chest.");
+            return;
+        }
+        const homePos = new Vec3(homeChest.x, homeChest.y, homeChest.z);
+        const chestBlock = bot.blockAt(homePos);
+        if (!chestBlock || !known.chests.has(chestBlock.type)) {
+            bot.chat("Home chest not found at saved location.");
+            return;
+        }
+
+        bot.pathfinder.setMovements(defaultMove);
+        bot.pathfinder.setGoal(new GoalNear(homePos.x, homePos.y, homePos.z, 1));
+        await bot.waitForTicks(20);
+
+        try {
+            const chest = await openChestAt(chestBlock);
+            const items = bot.inventory.items().filter(
+                i => !i.name.includes('pickaxe') && !i.name.includes('axe') && !i.name.includes('hoe')
+            );
+
+            for (const item of items) {
+                try { await chest.deposit(item.type, null, item.count); } catch (e) { }
+            }
+            chest.close();
+            bot.chat("Deposited all non-tool items to home chest ✅");
+        } catch (err) {
+            bot.chat(`Error depositing to home chest: ${err.message}`);
+        }
+    }
+
+    // -------------------
+    // AUTO MODE TASKS
+    // -------------------
+    async function autoTasks() {
+        while (autoMode) {
+            try {
+                // 1️⃣ Chop Trees
+                const logs = streamLogs(bot.entity.position.clone(), 50);
+                const tried = new Set();
+                let tree;
+                while (autoMode && (tree = await nextTree(logs, tried))) {
+                    let full = false;
+                    const felled = await fellTree(tree, tried, () => {
+                        full = full || bot.inventory.items().length > 28;
+                    });
+                    if (full) await depositAllExceptTools();
+                    if (felled.stopped) break;
+                }
+
+                // 2️⃣ Farm crops
+                // only fields the ledger says have due plots; growing ones are left until they mature
+                const farmed = await farmCrops(20, false);
+                if (farmed.harvested) bot.chat(`Farmed ${farmed.harvested} crops.`);
+                if (bot.inventory.items().length > 28) await depositAllExceptTools();
+
+                // 3️⃣ Strip Mine Ores
+                const mineStart = bot.entity.position.offset(-5, -1, -5);
+                const mineEnd = bot.entity.position.offset(5, -5, 5);
+                await stripMineArea(mineStart, mineEnd, 'ores');
+                await depositAllExceptTools();
+
+                // Wait a few ticks before repeating
+                await new Promise(r => setTimeout(r, 2000));
+
+            } catch (err) {
+                bot.chat(`Auto mode error: ${err.message}`);
+            }
+        }
+    }
+
+    // -------------------
+    // Command toggle
+    // -------------------
+    function toggleAutoMode(enable) {
+        if (enable) {
+            if (autoMode) return bot.chat("Auto mode already running.");
+            autoMode = true;
+            bot.chat("Auto mode enabled ✅");
+            autoTasks(); // start async loop
+        } else {
+            autoMode = false;
+            bot.chat("Auto mode disabled ❌");
+        }
+    }
+
+
+    // -----------------------------
+    // Chat bridge -> send to Python
+    // -----------------------------
+    bot.on('chat', (username, message) => {
+        if (!wantsEvent('chat', username, message)) return;
+        sendEvent({ event: 'chat', user: username, message });
+    });
+
+    bot.on('health', () => {
+        if (!wantsEvent('health')) return;
+        sendEvent({ event: 'health', health: bot.health, food: bot.food, saturation: bot.foodSaturation });
+    });
+
+    bot.on('entityMoved', (entity) => {
+        if (entity === bot.entity || !wantsEvent('entity_moved')) return;
+        const p = entity.position;
+        sendEvent({ event: 'entity_moved', id: entity.id, name: entity.name || entity.username, x: p.x, y: p.y, z: p.z });
+    });
+
+    // -----------------------------
+    // Entity index (spatial hash for combat / item pickup)
+    // -----------------------------
+    let entityIndex = null;
+
+    bot.on('spawn', () => {
+        entityIndex = new EntityIndex(bot);
+        for (const entity of Object.values(bot.entities)) entityIndex.track(entity);
+    });
+
+    bot.on('entitySpawn', (entity) => { if (entityIndex) entityIndex.track(entity); });
+    bot.on('entityMoved', (entity) => { if (entityIndex) entityIndex.track(entity); });
+    bot.on('entityGone', (entity) => { if (entityIndex) entityIndex.remove(entity); });
+
+    // Walk over every item entity within radius of center (of the bot, as it
+    // moves, if no center is given), nearest first; a player only picks up items
+    // within about a block. Returns the stacks picked up.
+    async function collectDrops(center = null, radius = 16) {
+        let collected = 0;
+        const skipped = new Set();
+        while (entityIndex) {
+            const item = entityIndex.nearest('item', center || bot.entity.position, radius, 1, e => !skipped.has(e.id))[0];
+            if (!item) break;
+            skipped.add(item.id);
+            bot.pathfinder.setMovements(defaultMove);
+            try {
+                await bot.pathfinder.goto(new GoalNear(item.position.x, item.position.y, item.position.z, 1));
+            } catch (err) {
+                continue;
+            }
+            // fresh drops cannot be picked up for their first 10 ticks
+            for (let tick = 0; tick < 10 && bot.entities[item.id]; tick++) await bot.waitForTicks(1);
+            if (!bot.entities[item.id]) collected++;
+        }
+        return collected;
+    }
+
+    async function pickupItems(radius = 16) {
+        const collected = await collectDrops(null, radius);
+        bot.chat(collected ? `Picked up ${collected} item stacks.` : 'No items nearby.');
+        return { collected };
+    }
+
+    // -----------------------------
+    // Chunk feed (chunk sections + block changes for the Python mirror)
+    // -----------------------------
+    // Off until the controller subscribes to 'chunks'. Columns are packed one per
+    // setImmediate so a burst of chunk loads never starves packet handling.
+    const chunkQueue = [];
+    let chunkPumpScheduled = false;
+
+    function worldMinY() {
+        return bot.game && typeof bot.game.minY === 'number' ? bot.game.minY : 0;
+    }
+
+    function worldHeight() {
+        return bot.game && typeof bot.game.height === 'number' ? bot.game.height : 256;
+    }
+
+    function queueColumn(chunkX, chunkZ) {
+        chunkQueue.push({ chunkX, chunkZ });
+        if (chunkPumpScheduled) return;
+        chunkPumpScheduled = true;
+        setImmediate(pumpChunks);
+    }
+
+    function pumpChunks() {
+        chunkPumpScheduled = false;
+        const next = chunkQueue.shift();
+        if (!next) return;
+        sendColumn(next.chunkX, next.chunkZ);
+        if (chunkQueue.length) {
+            chunkPumpScheduled = true;
+            setImmediate(pumpChunks);
+        }
+    }
+
+    function sendColumn(chunkX, chunkZ) {
+        const column = bot.world.getColumn(chunkX, chunkZ);
+        if (!column) return;
+        const minY = worldMinY();
+        const sections = worldHeight() >> 4;
+        for (let s = 0; s < sections; s++) {
+            const baseY = minY + s * 16;
+            const packed = packSection(column, baseY);
+            sendEvent({ event: 'chunk_section', x: chunkX, y: baseY >> 4, z: chunkZ, palette: packed.palette, bits: packed.bits, data: packed.data });
+        }
+    }
+
+    function dumpLoadedChunks() {
+        let count = 0;
+        for (const { chunkX, chunkZ } of bot.world.getColumns()) {
+            queueColumn(Number(chunkX), Number(chunkZ));
+            count++;
+        }
+        return { columns: count, min_y: worldMinY(), height: worldHeight() };
+    }
+
+    function blockStateTable() {
+        const blocks = {};
+        for (const b of bot.registry.blocksArray) blocks[b.name] = [b.minStateId, b.maxStateId];
+        return { min_y: worldMinY(), height: worldHeight(), dimension: String(bot.game.dimension), version: bot.version, blocks };
+    }
+
+    bot.on('chunkColumnLoad', (point) => {
+        if (!wantsEvent('chunks')) return;
+        queueColumn(Math.floor(point.x / 16), Math.floor(point.z / 16));
+    });
+
+    bot.on('chunkColumnUnload', (point) => {
+        if (!wantsEvent('chunks')) return;
+        sendEvent({ event: 'chunk_unload', x: Math.floor(point.x / 16), z: Math.floor(point.z / 16) });
+    });
+
+    // 'game' fires for the respawn packet of a dimension change, before the new
+    // dimension's columns load; the mirror drops its sections and re-keys its cache.
+    let feedDimension = null;
+    bot.on('game', () => {
+        const dimension = String(bot.game.dimension);
+        containerLedger.open(containerFile(dimension));
+        if (dimension === feedDimension) return;
+        feedDimension = dimension;
+        if (!wantsEvent('chunks')) return;
+        chunkQueue.length = 0;
+        sendEvent({ event: 'world_reset', dimension, min_y: worldMinY(), height: worldHeight() });
+    });
+
+    // -----------------------------
+    // Block index (logs / ores / crops / chests in loaded chunks)
+    // -----------------------------
+    // Rebuilt on every spawn (respawn and dimension changes swap the world);
+    // chunks that loaded before it are picked up from bot.world.
+    let blockIndex = null;
+    let cropLedger = null;
+    let veinFinder = null;
+
+    bot.on('spawn', () => {
+        blockIndex = new BlockIndex(bot);
+        cropLedger = new CropLedger(bot);
+        veinFinder = new VeinFinder(bot);
+        for (const { chunkX, chunkZ } of bot.world.getColumns()) blockIndex.queueColumn(Number(chunkX), Number(chunkZ));
+    });
+
+    bot.on('chunkColumnLoad', (point) => {
+        if (blockIndex) blockIndex.queueColumn(Math.floor(point.x / 16), Math.floor(point.z / 16));
+    });
+
+    bot.on('chunkColumnUnload', (point) => {
+        if (blockIndex) blockIndex.dropColumn(Math.floor(point.x / 16), Math.floor(point.z / 16));
+        if (cropLedger) cropLedger.dropColumn(Math.floor(point.x / 16), Math.floor(point.z / 16));
+    });
+
+    bot.on('blockUpdate', (oldBlock, newBlock) => {
+        if (blockIndex) blockIndex.update(oldBlock, newBlock);
+        if (oldBlock && newBlock && known && known.chests.has(oldBlock.type) && !known.chests.has(newBlock.type)) {
+            containerLedger.forget(newBlock.position);
+        }
+        if (cropLedger) cropLedger.update(oldBlock, newBlock);
+        if (veinFinder) veinFinder.update(oldBlock, newBlock);
+    });
+
+    bot.on('blockUpdate', (oldBlock, newBlock) => {
+        if (!newBlock || !wantsEvent('block_update')) return;
+        const p = newBlock.position;
+        sendEvent({ event: 'block_update', x: p.x, y: p.y, z: p.z, state: newBlock.stateId });
+    });
+
+    // -----------------------------
+    // State stream (delta frames)
+    // -----------------------------
+    // At the requested rate the bot publishes one 'state' event holding only the
+    // fields that changed since the previous frame (the first frame after a rate
+    // change is full). Frames with nothing new are skipped, so a bot standing
+    // still costs nothing. seq only counts frames actually sent; on a gap the
+    // controller can ask for a full frame with the 'state' command.
+    const TASK_COMMANDS = new Set(['deforest', 'farm', 'stripmine', 'chest', 'home', 'sethome', 'equip', 'pickup', 'batch']);
+    // commands run concurrently: every running task by a per-call id, in start order
+    const runningTasks = new Map();
+    let taskSeq = 0;
+    let inventoryVersion = 0;
+    let stateTimer = null;
+    let lastState = {};
+    let stateSeq = 0;
+
+    function round2(v) {
+        return Math.round(v * 100) / 100;
+    }
+
+    function currentTask() {
+        if (runningTasks.size) return [...runningTasks.values()].pop();
+        if (autoMode) return 'auto';
+        if (bot.followInterval) return 'follow';
+        if (bot.defendInterval) return 'defend';
+        return null;
+    }
+
+    function snapshotState() {
+        const e = bot.entity;
+        const held = bot.heldItem;
+        return {
+            x: e ? round2(e.position.x) : null,
+            y: e ? round2(e.position.y) : null,
+            z: e ? round2(e.position.z) : null,
+            yaw: e ? round2(e.yaw) : null,
+            health: bot.health === undefined ? null : bot.health,
+            food: bot.food === undefined ? null : bot.food,
+            held: held ? held.name : null,
+            inventory_version: inventoryVersion,
+            task: currentTask()
+        };
+    }
+
+    function publishState(full = false) {
+        const now = snapshotState();
+        const frame = { event: 'state' };
+        let changed = false;
+        for (const k in now) {
+            if (full || now[k] !== lastState[k]) {
+                frame[k] = now[k];
+                changed = true;
+            }
+        }
+        lastState = now;
+        if (!changed) return;
+        frame.seq = ++stateSeq;
+        if (full) frame.full = true;
+        sendEvent(frame);
+    }
+
+    function setStateRate(hz) {
+        if (stateTimer) clearInterval(stateTimer);
+        stateTimer = null;
+        hz = Math.max(0, Math.min(20, Number(hz) || 0)); // no point going faster than the 20 Hz tick
+        if (hz > 0) {
+            publishState(true);
+            stateTimer = setInterval(() => publishState(), 1000 / hz);
+        }
+        return { rate_hz: hz };
+    }
+
+    // -----------------------------
+    // Command dispatch (routed here by mineflayer_wrapper.js)
+    // -----------------------------
+    // Long-running commands are recorded as running tasks for the state stream;
+    // the most recently started one that is still running is the current task.
+    async function handleCommand(msg) {
+        if (!TASK_COMMANDS.has(msg.command)) return await dispatchCommand(msg);
+        const id = ++taskSeq;
+        runningTasks.set(id, msg.command);
+        try {
+            return await dispatchCommand(msg);
+        } finally {
+            runningTasks.delete(id);
+        }
+    }
+
+    async function dispatchCommand(msg) {
+        switch (msg.command) {
+            case 'chat':
+                if (msg.args.message) bot.chat(msg.args.message);
+                break;
+
+            case 'come':
+                if (msg.args.player && defaultMove) await comeToPlayer(msg.args.player);
+                break;
+
+            case 'jump':
+                bot.setControlState('jump', true);
+                setTimeout(() => bot.setControlState('jump', false), 500);
+                bot.chat('Jumped!');
+                break;
+
+            case 'help':
+                bot.chat('Commands: !hello, !status, !time, !date, !report, !auto <on/off>, !jump, !come, !respawn, !chest, !follow <player>, !follow, !stop, !deforest, !farm, !stripmine x1 y1 z1 x2 y2 z2 [tunnel|branch|volume|ores], !equip, !defend, !sethome, !home');
+                break;
+
+            case 'auto':
+                if (msg.args.state === true) toggleAutoMode(true);
+                else if (msg.args.state === false) toggleAutoMode(false);
+                else toggleAutoMode(!autoMode); // toggle if no args
+                break;
+
+            case 'respawn':
+                if (bot.health === 0) {
+                    bot.chat('Respawning...');
+                    bot.emit('respawn');
+                } else {
+                    bot.chat('I am still alive!');
+                }
+                break;
+
+            case 'chest':
+                await placeChestAndDump();
+                break;
+
+            case 'sethome':
+                await setHomeAtNearbyChest();
+                break;
+
+            case 'home':
+                await goHomeAndDeposit();
+                break;
+
+            case 'follow':
+                if (msg.args.player) startFollowing(msg.args.player);
+                break;
+
+            case 'stop':
+                stopAllIntervals();
+                break;
+
+            case 'deforest':
+                return await deforest(50); // default 50 block radius
+
+            case 'farm':
+                return await farmCrops(20);
+
+            case 'stripmine':
+                const start = msg.args.start;
+                const end = msg.args.end;
+                if (start && end) {
+                    return await stripMineArea(
+                        new Vec3(start.x, start.y, start.z).floored(),
+                        new Vec3(end.x, end.y, end.z).floored(),
+                        msg.args.mode || (msg.args.onlyOres ? 'ores' : 'tunnel'),
+                        { spacing: msg.args.spacing, length: msg.args.length }
+                    );
+                }
+                bot.chat('Usage: !stripmine x1 y1 z1 x2 y2 z2 [tunnel|branch [spacing] [length]|volume|ores]');
+                throw new Error('stripmine needs start and end');
+
+            case 'equip':
+                await equipBestArmor();
+                break;
+
+            case 'defend':
+                startDefending();
+                break;
+
+            case 'batch':
+                // several commands in one frame, run strictly in order, one aggregated result
+                return await runBatch(handleCommand, msg.args.commands || [], msg.args.stop_on_error !== false);
+
+            case 'state_stream':
+                return setStateRate(msg.args.rate_hz);
+
+            case 'block_states':
+                return blockStateTable();
+
+            case 'chunk_dump':
+                return dumpLoadedChunks();
+
+            case 'block_index':
+                return blockIndex ? blockIndex.counts() : null;
+
+            case 'surface': {
+                if (!blockIndex) return null;
+                const x = msg.args.x ?? bot.entity.position.x, z = msg.args.z ?? bot.entity.position.z;
+                return { x: Math.floor(x), z: Math.floor(z), height: blockIndex.surface.heightAt(x, z), ground: blockIndex.surface.groundAt(x, z) };
+            }
+
+            case 'pickup':
+                return pickupItems(msg.args.radius || 16);
+
+            case 'entities':
+                return entityIndex ? entityIndex.counts() : null;
+
+            case 'veins': {
+                const radius = msg.args.radius || 32;
+                return veinFinder.discover(blockIndex, bot.entity.position, radius, msg.args.exposed_only !== false)
+                    .map(vein => veinFinder.describe(vein, bot.entity.position));
+            }
+
+            case 'stock':
+                if (msg.args.item) return { item: msg.args.item, total: containerLedger.total(msg.args.item), where: containerLedger.where(msg.args.item) };
+                return containerLedger.summary();
+
+            case 'crops':
+                return cropLedger ? cropLedger.summary(bot.entity.position, msg.args.radius || 64) : null;
+
+            case 'state':
+                // full snapshot on demand (resync after a missed delta); lastState
+                // is the baseline every sink's deltas build on, so it stays as is
+                return Object.assign({ seq: stateSeq }, snapshotState());
+
+            /*
+                        case 'move': {
+                            const dir = msg.args.direction;
+                            const controls = ['forward', 'back', 'left', 'right'];
+                            if (controls.includes(dir)) {
+                                bot.setControlState(dir, true);
+                                setTimeout(() => bot.setControlState(dir, false), 1000);
+                                bot.chat(`Moved ${dir}`);
+                            }
+                            break;
+                        }
+
+                        case 'pickup': {
+                            const item = bot.nearestEntity(e => e.type === 'object' && e.objectType === 'item');
+                            if (item) {
+                                bot.pathfinder.setGoal(new GoalNear(item.position.x, item.position.y, item.position.z, 1));
+                                bot.chat(`Going to pick up item`);
+                            } else {
+                                bot.chat('No items nearby.');
+                            }
+                            break;
+                        }
+
+                        case 'chop': {
+                            const block = bot.findBlock({ matching: b => b.name.includes('log'), maxDistance: 16 });
+                            if (block) {
+                                await bot.dig(block);
+                                bot.chat('Chopped a tree!');
+                            } else {
+                                bot.chat('No trees nearby.');
+                            }
+                            break;
+                        }
+            */
+            default:
+                bot.chat(`Unknown command: ${msg.command}`);
+                throw new Error(`Unknown command: ${msg.command}`);
+        }
+    }
+
+    // Error handling
+    bot.on('error', (err) => sendEvent({ event: 'error', message: err.toString() }));
+    bot.on('end', () => {
+        setStateRate(0);
+        sendEvent({ event: 'end', message: 'Bot disconnected' });
+    });
+
+    function quit() {
+        autoMode = false;
+        setStateRate(0);
+        stopAllIntervals();
+        bot.quit();
+    }
+
+    return { id, bot, handleCommand, quit };
+}
+
+module.exports = { createBotSession };
@@ -0,0 +1,89 @@
+"""Wire framing for the Python <-> Node stdio bridge.
+
+Two framings are supported:
+
+* ``json``    - one JSON object per line (the original protocol, always available)
+* ``msgpack`` - uint32 big-endian length + MessagePack payload per message
+
+The controller asks for a framing through the ``BRIDGE_FRAMING`` environment
+variable when it spawns the wrapper; the wrapper always answers with a single
+JSON ``hello`` line naming the framing it will actually use, and both sides
+switch to it after that line. ``msgpack`` needs the optional ``msgpack``
+package; without it the controller falls back to JSON lines.
+"""
+import asyncio
+import json
+import struct
+
+try:
+    import msgpack
+except ImportError:  # optional: binary framing is only offered when installed
+    msgpack = None
+
+FRAMINGS = ("json", "msgpack")
+HEADER = struct.Struct(">I")
+# asyncio StreamReader line limit; block lists and entity tables exceed the 64 KiB default
+STREAM_LIMIT = 16 * 1024 * 1024
+
+
+class HandshakeRejected(Exception):
+    """The wrapper refused the connection (e.g. a controller is already attached)."""
+
+
+def preferred_framing():
+    return "msgpack" if msgpack is not None else "json"
+
+
+def encode(message, framing):
+    if framing == "msgpack":
+        payload = msgpack.packb(message, use_bin_type=True)
+        return HEADER.pack(len(payload)) + payload
+    return (json.dumps(message) + "\n").encode("utf-8")
+
+
+async def read_handshake(reader):
+    """Read lines until the wrapper's ``hello``; return (framing, skipped events)."""
+    skipped = []
+    while True:
+        line = await reader.readline()
+        if not line:
+            raise EOFError("wrapper exited before the bridge handshake")
+        try:
+            event = json.loads(line)
+        except json.JSONDecodeError:
+            skipped.append({"event": "log", "message": line.decode("utf-8", "replace").strip()})
+            continue
+        if event.get("event") == "hello":
+            if event.get("error"):
+                raise HandshakeRejected(event["error"])
+            return event.get("framing", "json"), skipped
+        skipped.append(event)
+
+
+async def iter_messages(reader, framing):
+    """Yield decoded messages from an asyncio StreamReader until EOF.
+
+    Non-JSON lines in ``json`` framing come through as ``log`` events so
+    stray console output from Node is still visible.
+    """
+    if framing == "msgpack":
+        while True:
+            try:
+                header = await reader.readexactly(HEADER.size)
+                (length,) = HEADER.unpack(header)
+                payload = await reader.readexactly(length)
+            except asyncio.IncompleteReadError:
+                return
+            yield msgpack.unpackb(payload, raw=False)
+    else:
+        while True:
+            line = await reader.readline()
+            if not line:
+                return
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError:
+                yield {"event": "log", "message": line.decode("utf-8", "replace")}
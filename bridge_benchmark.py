@@ -0,0 +1,141 @@
+"""Bridge latency/throughput benchmark, no Minecraft server needed.
+
+Starts ``mineflayer_wrapper.js`` in stub mode (``BRIDGE_STUB=1``: no
+mineflayer, commands are acknowledged/echoed) and drives it through the
+real BotProcess send_command/read_output paths, once per framing:
+
+* ``rtt``       - one command at a time; p50/p99 round trip
+* ``pipelined`` - all commands in flight at once; sustained commands/sec
+* ``batched``   - the same commands packed into batch envelopes
+* ``events``    - wrapper -> controller event stream; events/sec
+
+Usage::
+
+    python bridge_benchmark.py                      # print results
+    python bridge_benchmark.py --save bench.json    # keep a baseline
+    python bridge_benchmark.py --compare bench.json # exit 1 on a >25% drop
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+
+import bridge
+import bot_controller
+
+# a state-ish command payload: a position, a couple of scalars and a short list
+PAYLOAD = {"x": 12.5, "y": 64, "z": -301.25, "yaw": 1.57, "tags": ["oak_log", "birch_log", "stone"]}
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    index = min(len(ordered) - 1, round(pct / 100 * (len(ordered) - 1)))
+    return ordered[index]
+
+
+async def run_framing(framing, commands, batch_size, events):
+    os.environ["BRIDGE_STUB"] = "1"
+    os.environ["BRIDGE_FRAMING"] = framing
+    received = []
+    done = asyncio.Event()
+
+    def on_event(_, event):
+        if event.get("event") == "bench":
+            received.append(time.perf_counter())
+            if len(received) >= events:
+                done.set()
+
+    wrapper = bot_controller.BotProcess(
+        "bench", role="controller", on_event=on_event, max_queue=max(commands, 1024)
+    )
+    await wrapper.start()
+    results = {"framing": wrapper.framing}
+    try:
+        # warm up the JIT and both codecs before measuring anything
+        await asyncio.gather(*(wrapper.send_command("echo", PAYLOAD) for _ in range(500)))
+
+        rtts = []
+        for _ in range(min(commands, 2000)):
+            reply = await wrapper.send_command("echo", PAYLOAD)
+            rtts.append(reply["round_trip_ms"])
+        results["rtt_p50_ms"] = percentile(rtts, 50)
+        results["rtt_p99_ms"] = percentile(rtts, 99)
+
+        started = time.perf_counter()
+        replies = await asyncio.gather(*(wrapper.send_command("echo", PAYLOAD) for _ in range(commands)))
+        elapsed = time.perf_counter() - started
+        results["pipelined_per_sec"] = commands / elapsed
+        results["pipelined_p99_ms"] = percentile([r["round_trip_ms"] for r in replies], 99)
+
+        steps = [("echo", PAYLOAD)] * batch_size
+        batches = max(1, commands // batch_size)
+        started = time.perf_counter()
+        replies = await asyncio.gather(*(wrapper.send_batch(steps) for _ in range(batches)))
+        elapsed = time.perf_counter() - started
+        results["batched_per_sec"] = batches * batch_size / elapsed
+        results["batch_p99_ms"] = percentile([r["round_trip_ms"] for r in replies], 99)
+
+        started = time.perf_counter()
+        await wrapper.send_command("flood", {"count": events, "payload": PAYLOAD})
+        await asyncio.wait_for(done.wait(), timeout=120)
+        results["events_per_sec"] = events / (received[-1] - started)
+    finally:
+        await wrapper.stop()
+    return results
+
+
+def print_table(all_results):
+    columns = [
+        ("framing", "{}"), ("rtt_p50_ms", "{:.3f}"), ("rtt_p99_ms", "{:.3f}"),
+        ("pipelined_per_sec", "{:,.0f}"), ("batched_per_sec", "{:,.0f}"), ("events_per_sec", "{:,.0f}"),
+    ]
+    print(" | ".join(name for name, _ in columns))
+    for result in all_results:
+        print(" | ".join(fmt.format(result[name]) for name, fmt in columns))
+
+
+def compare(all_results, baseline_path, tolerance):
+    with open(baseline_path) as f:
+        baseline = {r["framing"]: r for r in json.load(f)}
+    failures = []
+    for result in all_results:
+        base = baseline.get(result["framing"])
+        if base is None:
+            continue
+        for key in ("pipelined_per_sec", "batched_per_sec", "events_per_sec"):
+            if result[key] < base[key] * (1 - tolerance):
+                failures.append(f"{result['framing']} {key}: {result[key]:,.0f} < baseline {base[key]:,.0f}")
+    for failure in failures:
+        print("REGRESSION:", failure)
+    return not failures
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--commands", type=int, default=20000)
+    parser.add_argument("--batch-size", type=int, default=32)
+    parser.add_argument("--events", type=int, default=100000)
+    parser.add_argument("--framing", choices=bridge.FRAMINGS, action="append")
+    parser.add_argument("--save", help="write results as JSON (a baseline for --compare)")
+    parser.add_argument("--compare", help="baseline JSON; exit 1 if a rate dropped by more than --tolerance")
+    parser.add_argument("--tolerance", type=float, default=0.25)
+    opts = parser.parse_args()
+
+    framings = opts.framing or [f for f in bridge.FRAMINGS if f == "json" or bridge.msgpack is not None]
+    all_results = []
+    for framing in framings:
+        all_results.append(await run_framing(framing, opts.commands, opts.batch_size, opts.events))
+    print_table(all_results)
+    if opts.save:
+        with open(opts.save, "w") as f:
+            json.dump(all_results, f, indent=2)
+    if opts.compare and not compare(all_results, opts.compare, opts.tolerance):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,283 @@
+// bridge_codec.js
+// Minimal MessagePack encoder/decoder plus 4-byte length-prefixed framing for
+// the binary mode of the Python <-> Node stdio bridge. Only the types the
+// bridge actually carries are supported: nil, bool, numbers, strings,
+// Buffers (bin), arrays and plain objects.
+
+const keyCache = new Map();
+
+class Encoder {
+    constructor(size = 1024) {
+        this.buf = Buffer.allocUnsafe(size);
+        this.pos = 0;
+    }
+
+    ensure(n) {
+        if (this.pos + n <= this.buf.length) return;
+        let size = this.buf.length * 2;
+        while (size < this.pos + n) size *= 2;
+        const next = Buffer.allocUnsafe(size);
+        this.buf.copy(next, 0, 0, this.pos);
+        this.buf = next;
+    }
+
+    u8(v) { this.ensure(1); this.buf[this.pos++] = v; }
+    u16(v) { this.ensure(2); this.buf.writeUInt16BE(v, this.pos); this.pos += 2; }
+    u32(v) { this.ensure(4); this.buf.writeUInt32BE(v, this.pos); this.pos += 4; }
+
+    write(value) {
+        if (value === null || value === undefined) return this.u8(0xc0);
+        switch (typeof value) {
+            case 'boolean': return this.u8(value ? 0xc3 : 0xc2);
+            case 'number': return this.number(value);
+            case 'string': return this.string(value);
+            case 'bigint': return this.number(Number(value));
+            case 'object': break;
+            default: return this.u8(0xc0);
+        }
+        if (Array.isArray(value)) {
+            this.header(value.length, 0x90, 0xdc);
+            for (const v of value) this.write(v);
+            return;
+        }
+        if (Buffer.isBuffer(value) || value instanceof Uint8Array) return this.binary(value);
+        if (typeof value.toJSON === 'function') return this.write(value.toJSON());
+        // like JSON.stringify, keys holding undefined/functions are dropped
+        let count = 0;
+        for (const k in value) {
+            const v = value[k];
+            if (v !== undefined && typeof v !== 'function' && Object.prototype.hasOwnProperty.call(value, k)) count++;
+        }
+        this.header(count, 0x80, 0xde);
+        for (const k in value) {
+            const v = value[k];
+            if (v === undefined || typeof v === 'function' || !Object.prototype.hasOwnProperty.call(value, k)) continue;
+            this.key(k);
+            this.write(v);
+        }
+    }
+
+    // Object keys repeat in every event, so their encoded bytes are cached.
+    key(k) {
+        let bytes = keyCache.get(k);
+        if (bytes === undefined) {
+            const enc = new Encoder(64);
+            enc.string(k);
+            bytes = Buffer.from(enc.buf.subarray(0, enc.pos));
+            if (keyCache.size < 4096) keyCache.set(k, bytes);
+        }
+        this.ensure(bytes.length);
+        bytes.copy(this.buf, this.pos);
+        this.pos += bytes.length;
+    }
+
+    header(length, fix, base16) {
+        if (length < 16) this.u8(fix | length);
+        else if (length < 0x10000) { this.u8(base16); this.u16(length); }
+        else { this.u8(base16 + 1); this.u32(length); }
+    }
+
+    number(n) {
+        if (Number.isInteger(n) && Math.abs(n) <= 0xffffffff) {
+            if (n >= 0) {
+                if (n < 128) return this.u8(n);
+                if (n < 0x100) { this.u8(0xcc); return this.u8(n); }
+                if (n < 0x10000) { this.u8(0xcd); return this.u16(n); }
+                this.u8(0xce); return this.u32(n);
+            }
+            if (n >= -32) return this.u8(n & 0xff);
+            if (n >= -0x80) { this.ensure(2); this.buf[this.pos++] = 0xd0; this.buf.writeInt8(n, this.pos); this.pos += 1; return; }
+            if (n >= -0x8000) { this.ensure(3); this.buf[this.pos++] = 0xd1; this.buf.writeInt16BE(n, this.pos); this.pos += 2; return; }
+            if (n >= -0x80000000) { this.ensure(5); this.buf[this.pos++] = 0xd2; this.buf.writeInt32BE(n, this.pos); this.pos += 4; return; }
+        }
+        this.ensure(9);
+        this.buf[this.pos++] = 0xcb;
+        this.buf.writeDoubleBE(n, this.pos);
+        this.pos += 8;
+    }
+
+    string(s) {
+        // short ASCII strings (names, event types) are copied byte by byte
+        if (s.length < 32) {
+            this.ensure(s.length + 1);
+            const start = this.pos;
+            this.buf[this.pos++] = 0xa0 | s.length;
+            let i = 0;
+            for (; i < s.length; i++) {
+                const c = s.charCodeAt(i);
+                if (c >= 0x80) break;
+                this.buf[this.pos++] = c;
+            }
+            if (i === s.length) return;
+            this.pos = start;
+        }
+        const len = Buffer.byteLength(s);
+        if (len < 32) this.u8(0xa0 | len);
+        else if (len < 0x100) { this.u8(0xd9); this.u8(len); }
+        else if (len < 0x10000) { this.u8(0xda); this.u16(len); }
+        else { this.u8(0xdb); this.u32(len); }
+        this.ensure(len);
+        this.buf.write(s, this.pos, len, 'utf8');
+        this.pos += len;
+    }
+
+    binary(b) {
+        const len = b.length;
+        if (len < 0x100) { this.u8(0xc4); this.u8(len); }
+        else if (len < 0x10000) { this.u8(0xc5); this.u16(len); }
+        else { this.u8(0xc6); this.u32(len); }
+        this.ensure(len);
+        this.buf.set(b, this.pos);
+        this.pos += len;
+    }
+}
+
+function decodeAt(buf, state) {
+    const t = buf[state.pos++];
+    if (t < 0x80) return t;
+    if (t < 0x90) return decodeMap(buf, state, t & 0x0f);
+    if (t < 0xa0) return decodeArray(buf, state, t & 0x0f);
+    if (t < 0xc0) return decodeString(buf, state, t & 0x1f);
+    if (t >= 0xe0) return t - 0x100;
+    let v;
+    switch (t) {
+        case 0xc0: return null;
+        case 0xc2: return false;
+        case 0xc3: return true;
+        case 0xc4: v = buf[state.pos]; state.pos += 1; return decodeBinary(buf, state, v);
+        case 0xc5: v = buf.readUInt16BE(state.pos); state.pos += 2; return decodeBinary(buf, state, v);
+        case 0xc6: v = buf.readUInt32BE(state.pos); state.pos += 4; return decodeBinary(buf, state, v);
+        case 0xca: v = buf.readFloatBE(state.pos); state.pos += 4; return v;
+        case 0xcb: v = buf.readDoubleBE(state.pos); state.pos += 8; return v;
+        case 0xcc: return buf[state.pos++];
+        case 0xcd: v = buf.readUInt16BE(state.pos); state.pos += 2; return v;
+        case 0xce: v = buf.readUInt32BE(state.pos); state.pos += 4; return v;
+        case 0xcf: v = Number(buf.readBigUInt64BE(state.pos)); state.pos += 8; return v;
+        case 0xd0: v = buf.readInt8(state.pos); state.pos += 1; return v;
+        case 0xd1: v = buf.readInt16BE(state.pos); state.pos += 2; return v;
+        case 0xd2: v = buf.readInt32BE(state.pos); state.pos += 4; return v;
+        case 0xd3: v = Number(buf.readBigInt64BE(state.pos)); state.pos += 8; return v;
+        case 0xd9: v = buf[state.pos]; state.pos += 1; return decodeString(buf, state, v);
+        case 0xda: v = buf.readUInt16BE(state.pos); state.pos += 2; return decodeString(buf, state, v);
+        case 0xdb: v = buf.readUInt32BE(state.pos); state.pos += 4; return decodeString(buf, state, v);
+        case 0xdc: v = buf.readUInt16BE(state.pos); state.pos += 2; return decodeArray(buf, state, v);
+        case 0xdd: v = buf.readUInt32BE(state.pos); state.pos += 4; return decodeArray(buf, state, v);
+        case 0xde: v = buf.readUInt16BE(state.pos); state.pos += 2; return decodeMap(buf, state, v);
+        case 0xdf: v = buf.readUInt32BE(state.pos); state.pos += 4; return decodeMap(buf, state, v);
+        default: throw new Error(`Unsupported msgpack type 0x${t.toString(16)}`);
+    }
+}
+
+function decodeString(buf, state, len) {
+    const s = buf.toString('utf8', state.pos, state.pos + len);
+    state.pos += len;
+    return s;
+}
+
+function decodeBinary(buf, state, len) {
+    const b = buf.subarray(state.pos, state.pos + len);
+    state.pos += len;
+    return b;
+}
+
+function decodeArray(buf, state, len) {
+    const arr = new Array(len);
+    for (let i = 0; i < len; i++) arr[i] = decodeAt(buf, state);
+    return arr;
+}
+
+function decodeMap(buf, state, len) {
+    const obj = {};
+    for (let i = 0; i < len; i++) {
+        const k = decodeAt(buf, state);
+        obj[k] = decodeAt(buf, state);
+    }
+    return obj;
+}
+
+// Node is single threaded, so one scratch encoder is reused for every message
+// and only the finished bytes are copied out.
+const scratch = new Encoder(64 * 1024);
+
+function encode(value) {
+    scratch.pos = 0;
+    scratch.write(value);
+    return Buffer.from(scratch.buf.subarray(0, scratch.pos));
+}
+
+function decode(buf) {
+    return decodeAt(buf, { pos: 0 });
+}
+
+// One frame = uint32 big-endian payload length + msgpack payload.
+function frame(value) {
+    scratch.pos = 4;
+    scratch.write(value);
+    scratch.buf.writeUInt32BE(scratch.pos - 4, 0);
+    return Buffer.from(scratch.buf.subarray(0, scratch.pos));
+}
+
+// Accumulates stdin chunks and returns every complete frame decoded.
+class FrameDecoder {
+    constructor() {
+        this.pending = Buffer.alloc(0);
+    }
+
+    push(chunk) {
+        this.pending = this.pending.length ? Buffer.concat([this.pending, chunk]) : chunk;
+        const out = [];
+        let offset = 0;
+        while (this.pending.length - offset >= 4) {
+            const len = this.pending.readUInt32BE(offset);
+            if (this.pending.length - offset - 4 < len) break;
+            out.push(decode(this.pending.subarray(offset + 4, offset + 4 + len)));
+            offset += 4 + len;
+        }
+        this.pending = this.pending.subarray(offset);
+        return out;
+    }
+}
+
+// JSON-lines counterpart of FrameDecoder; lines that fail to parse come back
+// as Error objects so the caller can report them.
+class LineDecoder {
+    constructor() {
+        this.pending = Buffer.alloc(0);
+    }
+
+    push(chunk) {
+        this.pending = this.pending.length ? Buffer.concat([this.pending, chunk]) : chunk;
+        const out = [];
+        let start = 0;
+        let nl;
+        while ((nl = this.pending.indexOf(10, start)) !== -1) {
+            const line = this.pending.toString('utf8', start, nl).trim();
+            start = nl + 1;
+            if (!line) continue;
+            try {
+                out.push(JSON.parse(line));
+            } catch (err) {
+                out.push(err);
+            }
+        }
+        this.pending = this.pending.subarray(start);
+        return out;
+    }
+
+    // hand over whatever followed the last complete line (used after a handshake line)
+    rest() {
+        const rest = this.pending;
+        this.pending = Buffer.alloc(0);
+        return rest;
+    }
+}
+
+function decoderFor(framing) {
+    return framing === 'msgpack' ? new FrameDecoder() : new LineDecoder();
+}
+
+function encodeFor(framing, value) {
+    return framing === 'msgpack' ? frame(value) : JSON.stringify(value) + '\n';
+}
+
+module.exports = { encode, decode, frame, FrameDecoder, LineDecoder, decoderFor, encodeFor };
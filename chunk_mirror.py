@@ -0,0 +1,214 @@
+"""NumPy mirror of the chunks a bot has loaded, fed by the wrapper's chunk events.
+
+The wrapper sends every 16x16x16 section once when its column loads
+(``chunk_section``: palette of block state ids + indices packed LSB-first at
+``bits`` per block, in y, z, x order) and then only single-block changes
+(``block_update``). Here each section becomes a ``uint16`` array of state ids
+shaped ``(16, 16, 16)`` and indexed ``[y, z, x]``, so "where are the nearest
+logs / ores / air pockets" is a handful of vectorized compares instead of one
+bridge round trip per block.
+
+With a ``world_cache.WorldCache`` attached, sections are views into
+memory-mapped region files: they survive controller restarts, load lazily
+when a query reaches them, and are checked against live data as chunks
+stream in again.
+
+Needs ``numpy``; the controller only imports this module when a mirror is
+enabled.
+"""
+import math
+
+import numpy as np
+
+SECTION_SHAPE = (16, 16, 16)
+AIR_STATES = ("air", "cave_air", "void_air")
+
+
+def section_key(x, y, z):
+    """Section coordinates (chunk x, section y, chunk z) holding a block position."""
+    # floor, not int(): -0.5 is in block -1, section -1
+    return (math.floor(x) >> 4, math.floor(y) >> 4, math.floor(z) >> 4)
+
+
+def section_index(x, y, z):
+    """Index ``[y, z, x]`` of a block position within its section."""
+    return (math.floor(y) & 15, math.floor(z) & 15, math.floor(x) & 15)
+
+
+def as_bytes(data):
+    # JSON framing serializes a Node Buffer as {"type": "Buffer", "data": [...]}
+    if isinstance(data, dict):
+        return bytes(data.get("data", ()))
+    return bytes(data or b"")
+
+
+def unpack_section(palette, bits, data):
+    """Palette + packed indices -> (16, 16, 16) uint16 array of block state ids."""
+    palette = np.asarray(palette, dtype=np.uint16)
+    if bits == 0 or len(palette) == 1:
+        return np.full(SECTION_SHAPE, palette[0] if len(palette) else 0, dtype=np.uint16)
+    raw = np.frombuffer(as_bytes(data), dtype=np.uint8)
+    flat = np.unpackbits(raw, bitorder="little")[: 4096 * bits].reshape(4096, bits)
+    indices = flat.astype(np.uint16) @ (1 << np.arange(bits, dtype=np.uint16))
+    return palette[indices].reshape(SECTION_SHAPE)
+
+
+class ChunkMirror:
+    """Block state ids of one bot's loaded world, one array per section."""
+
+    def __init__(self):
+        self.sections = {}
+        self.cache = None
+        # block name -> (min state id, max state id), from the wrapper's block_states reply
+        self.block_states = {}
+        self.dimension = None
+        self.version = None
+        self.min_y = 0
+        self.height = 256
+        self.updates = 0
+
+    def load_block_states(self, data):
+        self.block_states = {name: tuple(span) for name, span in data["blocks"].items()}
+        self.dimension = data.get("dimension", self.dimension)
+        self.version = data.get("version", self.version)
+        self.min_y = data.get("min_y", self.min_y)
+        self.height = data.get("height", self.height)
+
+    def switch_world(self, dimension, min_y, height):
+        """The bot moved to another dimension: forget its sections and detach the
+        cache, which belongs to the old dimension."""
+        if self.cache is not None:
+            self.cache.flush()
+        self.sections = {}
+        self.cache = None
+        self.dimension = dimension
+        self.min_y = min_y
+        self.height = height
+
+    def attach_cache(self, cache):
+        """Back this mirror with a WorldCache (see world_cache.py)."""
+        self.cache = cache
+
+    def load_cached(self, lo, hi, category=None):
+        """Pull cached sections between two section keys into the mirror."""
+        if self.cache is None:
+            return
+        for key in self.cache.keys_in(lo, hi, category):
+            if key not in self.sections:
+                self.sections[key] = self.cache.get(key)
+
+    def apply(self, event):
+        kind = event.get("event")
+        if kind == "chunk_section":
+            key = (event["x"], event["y"], event["z"])
+            section = unpack_section(event["palette"], event["bits"], event["data"])
+            self.sections[key] = self.cache.put(key, section) if self.cache is not None else section
+        elif kind == "block_update":
+            self.set_block(event["x"], event["y"], event["z"], event["state"])
+        elif kind == "chunk_unload":
+            # a cached section stays on disk and is reloaded when a query needs it
+            for key in [k for k in self.sections if k[0] == event["x"] and k[2] == event["z"]]:
+                del self.sections[key]
+
+    def set_block(self, x, y, z, state):
+        key = section_key(x, y, z)
+        section = self.sections.get(key)
+        if section is None:
+            return
+        index = section_index(x, y, z)
+        if self.cache is not None:
+            self.cache.note_change(key, int(section[index]), state)
+        section[index] = state
+        self.updates += 1
+
+    def block_at(self, x, y, z):
+        """State id at a block position, or None if its section is not loaded."""
+        section = self.sections.get(section_key(x, y, z))
+        if section is None:
+            return None
+        return int(section[section_index(x, y, z)])
+
+    def name_of(self, state):
+        for name, (low, high) in self.block_states.items():
+            if low <= state <= high:
+                return name
+        return None
+
+    def ids_for(self, names):
+        """All state ids of the given block names (any property combination)."""
+        ids = []
+        for name in names:
+            span = self.block_states.get(name)
+            if span is not None:
+                ids.extend(range(span[0], span[1] + 1))
+        return np.asarray(sorted(ids), dtype=np.uint16)
+
+    def ids_matching(self, predicate):
+        """State ids of every block whose name satisfies ``predicate`` (e.g. endswith "_log")."""
+        return self.ids_for([name for name in self.block_states if predicate(name)])
+
+    def find(self, ids, center, radius, limit=None, category=None):
+        """Positions of blocks whose state is in ``ids`` within ``radius`` of ``center``.
+
+        Sorted nearest first; returns an (n, 3) int array of x, y, z.
+        ``category`` limits which cached sections get loaded (see interesting()).
+        """
+        ids = np.asarray(ids, dtype=np.uint16)
+        cx, cy, cz = (float(c) for c in center)
+        r = float(radius)
+        lo = section_key(cx - r, cy - r, cz - r)
+        hi = section_key(cx + r, cy + r, cz + r)
+        self.load_cached(lo, hi, category)
+        hits = []
+        for key, section in self.sections.items():
+            if not all(lo[i] <= key[i] <= hi[i] for i in range(3)):
+                continue
+            ys, zs, xs = np.nonzero(np.isin(section, ids))
+            if len(xs):
+                hits.append(np.stack([xs + key[0] * 16, ys + key[1] * 16, zs + key[2] * 16], axis=1))
+        if not hits:
+            return np.empty((0, 3), dtype=np.int64)
+        points = np.concatenate(hits)
+        # block centres, as the bot measures distance
+        dist2 = ((points + 0.5 - (cx, cy, cz)) ** 2).sum(axis=1)
+        keep = dist2 <= r * r
+        points, dist2 = points[keep], dist2[keep]
+        order = np.argsort(dist2, kind="stable")
+        if limit is not None:
+            order = order[:limit]
+        return points[order]
+
+    def find_in_volume(self, ids, lo, hi):
+        """Positions in the inclusive box ``lo``..``hi`` whose state is in ``ids``."""
+        ids = np.asarray(ids, dtype=np.uint16)
+        lo, hi = np.minimum(lo, hi).astype(int), np.maximum(lo, hi).astype(int)
+        slo, shi = section_key(*lo), section_key(*hi)
+        self.load_cached(slo, shi)
+        hits = []
+        for key, section in self.sections.items():
+            if not all(slo[i] <= key[i] <= shi[i] for i in range(3)):
+                continue
+            base = np.array([key[0] * 16, key[1] * 16, key[2] * 16])
+            a = np.clip(lo - base, 0, 15)
+            b = np.clip(hi - base, 0, 15)
+            # section arrays are [y, z, x]
+            sub = section[a[1]:b[1] + 1, a[2]:b[2] + 1, a[0]:b[0] + 1]
+            ys, zs, xs = np.nonzero(np.isin(sub, ids))
+            if len(xs):
+                hits.append(np.stack([xs + a[0], ys + a[1], zs + a[2]], axis=1) + base)
+        if not hits:
+            return np.empty((0, 3), dtype=np.int64)
+        return np.concatenate(hits)
+
+    def air_pockets(self, lo, hi):
+        """Air blocks inside a box, e.g. to check a strip-mine area before digging."""
+        return self.find_in_volume(self.ids_for(AIR_STATES), lo, hi)
+
+    def interesting(self, category, center, radius, limit=None):
+        """Nearest blocks of a world_cache category ("logs", "ores", "crops",
+        "chests"). With a cache, sections whose saved summary has none are
+        never loaded or scanned."""
+        from world_cache import CATEGORY_RULES
+
+        ids = self.ids_matching(CATEGORY_RULES[category])
+        return self.find(ids, center, radius, limit, category=category)
@@ -0,0 +1,27 @@
+// command_batch.js
+// Runs the steps of a 'batch' command one after another through a session's
+// own command handler. Shared by real and stub sessions, so a batch costs the
+// same per-step dispatch in both.
+
+// -> { completed, total, results: [{ command, ok, elapsed_ms, data | message }] }
+async function runBatch(handleCommand, commands, stopOnError = true) {
+    const results = [];
+    for (const step of commands) {
+        const started = Date.now();
+        try {
+            if (!step || !step.command || step.command === 'batch') throw new Error('Invalid batch step');
+            const data = await handleCommand({ command: step.command, args: step.args || {} });
+            results.push({ command: step.command, ok: true, elapsed_ms: Date.now() - started, data: data === undefined ? null : data });
+        } catch (err) {
+            results.push({ command: step && step.command, ok: false, elapsed_ms: Date.now() - started, message: err.toString() });
+            if (stopOnError) break;
+        }
+    }
+    return {
+        completed: results.filter(r => r.ok).length,
+        total: commands.length,
+        results
+    };
+}
+
+module.exports = { runBatch };
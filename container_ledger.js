@@ -0,0 +1,139 @@
+// container_ledger.js
+// What is in every container the bot has opened, plus an item -> container
+// index, so "where are the wheat seeds?" and "how much oak_log do we have?"
+// are answered from memory and chests are only opened to move items.
+// Contents are recorded when a container opens and on every slot update while
+// it is open (deposits and withdrawals included), and saved to a JSON file so
+// they survive restarts. Positions only mean something within one world, so
+// each server and dimension gets its own file; open() switches between them.
+const fs = require('fs');
+const Vec3 = require('vec3');
+
+function containerKey(p) {
+    return `${p.x},${p.y},${p.z}`;
+}
+
+class ContainerLedger {
+    constructor(file = null) {
+        this.file = null;
+        // "x,y,z" -> { pos, name, items: Map(item name -> count), seenAt }
+        this.containers = new Map();
+        // item name -> Map("x,y,z" -> count)
+        this.byItem = new Map();
+        this.saveTimer = null;
+        if (file) this.open(file);
+    }
+
+    // Save what we have to the current file, then start over from `file`.
+    open(file) {
+        if (file === this.file) return;
+        if (this.saveTimer) {
+            clearTimeout(this.saveTimer);
+            this.saveTimer = null;
+            this.save();
+        }
+        this.containers = new Map();
+        this.byItem = new Map();
+        this.file = file;
+        this.load();
+    }
+
+    // Replace what we know about one container with its current contents.
+    record(block, items) {
+        const key = containerKey(block.position);
+        this.unindex(key);
+        const counts = new Map();
+        for (const item of items) counts.set(item.name, (counts.get(item.name) || 0) + item.count);
+        this.containers.set(key, { pos: block.position.clone(), name: block.name, items: counts, seenAt: Date.now() });
+        for (const [name, count] of counts) {
+            let where = this.byItem.get(name);
+            if (!where) this.byItem.set(name, where = new Map());
+            where.set(key, count);
+        }
+        this.scheduleSave();
+    }
+
+    // Watch an open container window so deposits/withdrawals are recorded too.
+    track(block, window) {
+        this.record(block, window.containerItems());
+        window.on('updateSlot', () => this.record(block, window.containerItems()));
+    }
+
+    forget(position) {
+        const key = containerKey(position);
+        if (!this.containers.has(key)) return;
+        this.unindex(key);
+        this.containers.delete(key);
+        this.scheduleSave();
+    }
+
+    unindex(key) {
+        const known = this.containers.get(key);
+        if (!known) return;
+        for (const name of known.items.keys()) {
+            const where = this.byItem.get(name);
+            if (!where) continue;
+            where.delete(key);
+            if (!where.size) this.byItem.delete(name);
+        }
+    }
+
+    // Containers holding an item, most first: [{ pos, count }]
+    where(itemName) {
+        const where = this.byItem.get(itemName);
+        if (!where) return [];
+        return [...where.entries()]
+            .map(([key, count]) => ({ pos: this.containers.get(key).pos, count }))
+            .sort((a, b) => b.count - a.count);
+    }
+
+    total(itemName) {
+        let total = 0;
+        for (const count of (this.byItem.get(itemName) || new Map()).values()) total += count;
+        return total;
+    }
+
+    summary() {
+        const totals = {};
+        for (const name of this.byItem.keys()) totals[name] = this.total(name);
+        return { containers: this.containers.size, items: totals };
+    }
+
+    scheduleSave() {
+        if (this.saveTimer || !this.file) return;
+        this.saveTimer = setTimeout(() => {
+            this.saveTimer = null;
+            this.save();
+        }, 1000);
+    }
+
+    save() {
+        const data = [...this.containers.values()].map(c => ({
+            x: c.pos.x, y: c.pos.y, z: c.pos.z, name: c.name, seenAt: c.seenAt, items: Object.fromEntries(c.items),
+        }));
+        try {
+            fs.writeFileSync(this.file, JSON.stringify(data));
+        } catch (err) {
+            console.error('Failed to save container ledger:', err);
+        }
+    }
+
+    load() {
+        if (!this.file || !fs.existsSync(this.file)) return;
+        const file = this.file;
+        this.file = null; // nothing new to write back while loading
+        try {
+            for (const c of JSON.parse(fs.readFileSync(file, 'utf8'))) {
+                const block = { position: new Vec3(c.x, c.y, c.z), name: c.name };
+                this.record(block, Object.entries(c.items).map(([name, count]) => ({ name, count })));
+                this.containers.get(containerKey(block.position)).seenAt = c.seenAt;
+            }
+        } catch (err) {
+            console.error('Failed to load container ledger:', err);
+        } finally {
+            this.file = file;
+        }
+    }
+}
+
+module.exports = { ContainerLedger };
@@ -0,0 +1,154 @@
+// crop_ledger.js
+// Per-bot ledger of crop plots: age, when that age was first seen and an
+// estimate of when the plot matures. It is fed by blockUpdate (the server
+// sends one for every growth stage while the chunk is loaded) and seeded from
+// the block index, so the farming tasks ask "which plots are due?" instead of
+// rescanning the field, and know how long to wait for the next one. Plots are
+// dropped with their chunk: growth while unloaded is never sent, so they are
+// re-seeded from the index when the chunk comes back.
+const Vec3 = require('vec3');
+const { blockSets, cropAge } = require('./block_registry');
+
+// Random-tick growth on hydrated farmland is roughly one stage every 3-8
+// minutes; the ledger starts from this and learns the real rate per crop.
+const DEFAULT_SECONDS_PER_STAGE = 300;
+const RATE_SMOOTHING = 0.2;
+
+function plotKey(p) {
+    return `${p.x},${p.y},${p.z}`;
+}
+
+class CropLedger {
+    constructor(bot) {
+        this.bot = bot;
+        this.known = blockSets(bot);
+        // "x,y,z" -> { pos, name, age, maxAge, ageSince, watched, seenAt, plantedAt };
+        // watched: ageSince is when the stage began, not just when it was first seen
+        this.plots = new Map();
+        // crop name -> learned seconds per growth stage
+        this.secondsPerStage = new Map();
+    }
+
+    isCrop(block) {
+        return !!block && this.known.crops.has(block.type);
+    }
+
+    // Record the current state of a block position (crop or not).
+    observe(block, now = Date.now()) {
+        const key = plotKey(block.position);
+        const prev = this.plots.get(key);
+        if (!this.isCrop(block)) {
+            this.plots.delete(key);
+            return;
+        }
+        const age = cropAge(this.bot.registry, block);
+        const maxAge = this.known.cropMaxAge.get(block.type);
+        if (prev && prev.name === block.name && prev.age === age) {
+            prev.seenAt = now;
+            return;
+        }
+        if (prev && prev.watched && prev.name === block.name && age > prev.age) {
+            // a whole stage we watched from its start: learn how fast this crop grows here
+            const perStage = (now - prev.ageSince) / 1000 / (age - prev.age);
+            const current = this.secondsPerStage.get(block.name) || DEFAULT_SECONDS_PER_STAGE;
+            this.secondsPerStage.set(block.name, current + RATE_SMOOTHING * (perStage - current));
+        }
+        const replanted = !prev || prev.name !== block.name || age < prev.age;
+        this.plots.set(key, {
+            pos: block.position.clone(),
+            name: block.name,
+            age,
+            maxAge,
+            ageSince: now,
+            // a first sighting may be well into the stage
+            watched: !!prev,
+            seenAt: now,
+            plantedAt: replanted ? (age === 0 ? now : null) : prev.plantedAt,
+        });
+    }
+
+    update(oldBlock, newBlock) {
+        if (!newBlock) return;
+        if (this.isCrop(newBlock) || this.plots.has(plotKey(newBlock.position))) this.observe(newBlock);
+    }
+
+    // Start tracking crops the block index knows about but the ledger does not,
+    // and re-read tracked plots whose maturity the index disagrees with.
+    syncFromIndex(blockIndex, center, radius) {
+        for (const category of ['crops_mature', 'crops_growing']) {
+            const mature = category === 'crops_mature';
+            for (const pos of blockIndex.near(category, center, radius)) {
+                const plot = this.plots.get(plotKey(pos));
+                if (plot && (plot.age >= plot.maxAge) === mature) continue;
+                const block = this.bot.blockAt(pos);
+                if (block) this.observe(block);
+            }
+        }
+    }
+
+    dropColumn(chunkX, chunkZ) {
+        for (const [key, plot] of this.plots) {
+            if (plot.pos.x >> 4 === chunkX && plot.pos.z >> 4 === chunkZ) this.plots.delete(key);
+        }
+    }
+
+    matureAt(plot) {
+        if (plot.age >= plot.maxAge) return plot.ageSince;
+        const perStage = this.secondsPerStage.get(plot.name) || DEFAULT_SECONDS_PER_STAGE;
+        return plot.ageSince + (plot.maxAge - plot.age) * perStage * 1000;
+    }
+
+    inRange(plot, center, radius) {
+        return !center || plot.pos.distanceTo(center) <= radius;
+    }
+
+    // Mature plots near center, nearest first, at most `limit` of them.
+    due(center, radius, limit = Infinity, skip = null) {
+        const out = [];
+        for (const [key, plot] of this.plots) {
+            if (plot.age < plot.maxAge || (skip && skip.has(key)) || !this.inRange(plot, center, radius)) continue;
+            out.push(plot);
+        }
+        if (center) out.sort((a, b) => a.pos.distanceTo(center) - b.pos.distanceTo(center));
+        if (out.length > limit) out.length = limit;
+        return out.map(plot => new Vec3(plot.pos.x, plot.pos.y, plot.pos.z));
+    }
+
+    // Every tracked plot near center, mature or not: { pos, name }.
+    tracked(center, radius) {
+        const out = [];
+        for (const plot of this.plots.values()) {
+            if (this.inRange(plot, center, radius)) out.push({ pos: plot.pos.clone(), name: plot.name });
+        }
+        return out;
+    }
+
+    // Seconds until the next plot in range should mature (0 if one is due, null if none tracked).
+    nextDueIn(center, radius, now = Date.now()) {
+        let next = null;
+        for (const plot of this.plots.values()) {
+            if (!this.inRange(plot, center, radius)) continue;
+            const at = this.matureAt(plot);
+            if (next === null || at < next) next = at;
+        }
+        return next === null ? null : Math.max(0, (next - now) / 1000);
+    }
+
+    summary(center = null, radius = Infinity) {
+        let mature = 0;
+        let tracked = 0;
+        for (const plot of this.plots.values()) {
+            if (!this.inRange(plot, center, radius)) continue;
+            tracked++;
+            if (plot.age >= plot.maxAge) mature++;
+        }
+        return {
+            tracked,
+            mature,
+            next_due_s: this.nextDueIn(center, radius),
+            seconds_per_stage: Object.fromEntries(this.secondsPerStage),
+        };
+    }
+}
+
+module.exports = { CropLedger, plotKey };
@@ -0,0 +1,149 @@
+// dig_planner.js
+// Where to stand to dig a set of blocks. A block is in reach of a standing spot
+// when its centre is within REACH of the bot's eyes; spots are picked greedily,
+// each time the one that reaches the most blocks still left, so a whole trunk
+// is usually cleared from one or two places instead of walking to every log.
+// For excavation (planStep) a block also has to be visible from the eyes once
+// the blocks dug before it are gone, and digs go top-down, so sand or gravel
+// only ever falls into the cell being dug (and is dug again there), never
+// through into space that was already cleared.
+const Vec3 = require('vec3');
+
+const REACH = 4.5;
+const EYE_HEIGHT = 1.62;
+// targets nearest the bot that one excavation step plans over
+const MAX_FRONTIER = 128;
+// best-reaching spots whose dig order is actually simulated
+const SIMULATED_SPOTS = 8;
+
+function posKey(x, y, z) {
+    return `${x},${y},${z}`;
+}
+
+// stand and target are block positions (feet block, block to dig)
+function inReach(stand, target, reach = REACH) {
+    const dx = target.x - stand.x;
+    const dy = target.y + 0.5 - (stand.y + EYE_HEIGHT);
+    const dz = target.z - stand.z;
+    return dx * dx + dy * dy + dz * dz <= reach * reach;
+}
+
+// Spots near the targets the bot could stand on: x/z up to `margin` outside the
+// targets' footprint, feet from `below` under the lowest target to `above` over it.
+function candidateSpots(targets, standable, { margin = 3, below = 3, above = 2 } = {}) {
+    const xs = targets.map(p => p.x), ys = targets.map(p => p.y), zs = targets.map(p => p.z);
+    const taken = new Set(targets.map(p => `${p.x},${p.y},${p.z}`));
+    const spots = [];
+    const lowest = Math.min(...ys);
+    for (let x = Math.min(...xs) - margin; x <= Math.max(...xs) + margin; x++) {
+        for (let z = Math.min(...zs) - margin; z <= Math.max(...zs) + margin; z++) {
+            for (let y = lowest - below; y <= lowest + above; y++) {
+                // never stand on (or inside) something that is about to be dug
+                if (taken.has(`${x},${y - 1},${z}`) || taken.has(`${x},${y},${z}`) || taken.has(`${x},${y + 1},${z}`)) continue;
+                if (standable(x, y, z)) spots.push(new Vec3(x, y, z));
+            }
+        }
+    }
+    return spots;
+}
+
+// The spot reaching the most targets (closest to `from` on ties), with those
+// targets in their original order; null if no spot reaches any.
+function bestSpot(targets, spots, from) {
+    let best = null;
+    for (const spot of spots) {
+        const reached = targets.filter(t => inReach(spot, t));
+        if (!reached.length) continue;
+        const d = from ? spot.distanceTo(from) : 0;
+        if (!best || reached.length > best.targets.length || (reached.length === best.targets.length && d < best.d)) {
+            best = { spot, targets: reached, d };
+        }
+    }
+    return best && { spot: best.spot, targets: best.targets };
+}
+
+// Whether the ray from the eyes at stand to the centre of target crosses no
+// blocked cell before it enters the target's own cell.
+function visible(stand, target, blocked) {
+    const ex = stand.x + 0.5, ey = stand.y + EYE_HEIGHT, ez = stand.z + 0.5;
+    const dx = target.x + 0.5 - ex, dy = target.y + 0.5 - ey, dz = target.z + 0.5 - ez;
+    const steps = Math.ceil(Math.sqrt(dx * dx + dy * dy + dz * dz) * 4);
+    for (let i = 1; i < steps; i++) {
+        const t = i / steps;
+        const x = Math.floor(ex + dx * t), y = Math.floor(ey + dy * t), z = Math.floor(ez + dz * t);
+        if (x === target.x && y === target.y && z === target.z) return true;
+        if (y === stand.y + 1 && x === stand.x && z === stand.z) continue; // own head
+        if (blocked(x, y, z)) return false;
+    }
+    return true;
+}
+
+// Targets plus any falling blocks stacked on top of them, which would otherwise
+// drop into the cleared space.
+function withFallingCover(targets, falling) {
+    const keys = new Set(targets.map(p => posKey(p.x, p.y, p.z)));
+    const out = [...targets];
+    for (const p of targets) {
+        for (let y = p.y + 1; falling(p.x, y, p.z) && !keys.has(posKey(p.x, y, p.z)); y++) {
+            keys.add(posKey(p.x, y, p.z));
+            out.push(new Vec3(p.x, y, p.z));
+        }
+    }
+    return out;
+}
+
+// Dig order from one spot over the targets it reaches: repeatedly every target
+// that is visible with the earlier digs gone, highest first. A target under a
+// stack of falling blocks is listed once more per block in the stack (each one
+// drops into it), and only while the cell below it is still solid.
+function digOrder(spot, reached, env) {
+    const cleared = new Set();
+    const blocked = (x, y, z) => !cleared.has(posKey(x, y, z)) && env.blocked(x, y, z);
+    const left = new Map(reached.map(t => [posKey(t.x, t.y, t.z), t]));
+    const order = [];
+    let progress = true;
+    while (progress && left.size) {
+        progress = false;
+        const ready = [...left.values()]
+            .filter(t => visible(spot, t, blocked))
+            .sort((a, b) => b.y - a.y);
+        for (const t of ready) {
+            const key = posKey(t.x, t.y, t.z);
+            if (!left.has(key)) continue; // already fell into a cell below
+            let top = t.y;
+            while (env.falling(t.x, top + 1, t.z) && !cleared.has(posKey(t.x, top + 1, t.z))) top++;
+            if (top > t.y && !blocked(t.x, t.y - 1, t.z)) continue;
+            for (let y = t.y; y <= top; y++) {
+                order.push(t);
+                cleared.add(posKey(t.x, y, t.z));
+                left.delete(posKey(t.x, y, t.z));
+            }
+            progress = true;
+        }
+    }
+    return order;
+}
+
+// Next excavation step: { spot, digs } for the standing spot that can dig the
+// most of the targets nearest `from`, or null if no spot sees any of them.
+// env: standable(x, y, z), blocked(x, y, z) (solid now), falling(x, y, z).
+function planStep(targets, env, from) {
+    if (!targets.length) return null;
+    const frontier = [...targets].sort((a, b) => a.distanceTo(from) - b.distanceTo(from)).slice(0, MAX_FRONTIER);
+    const ys = frontier.map(p => p.y);
+    // feet up to 6 below the lowest target still reach it (eyes at +1.62, reach 4.5)
+    const spots = candidateSpots(frontier, env.standable, { below: 6, above: Math.max(...ys) - Math.min(...ys) + 2 });
+    const ranked = spots
+        .map(spot => ({ spot, reached: frontier.filter(t => inReach(spot, t)), d: spot.distanceTo(from) }))
+        .filter(r => r.reached.length)
+        .sort((a, b) => b.reached.length - a.reached.length || a.d - b.d)
+        .slice(0, SIMULATED_SPOTS);
+    let best = null;
+    for (const { spot, reached } of ranked) {
+        const digs = digOrder(spot, reached, env);
+        if (digs.length && (!best || digs.length > best.digs.length)) best = { spot, digs };
+    }
+    return best;
+}
+
+module.exports = { REACH, EYE_HEIGHT, inReach, candidateSpots, bestSpot, visible, withFallingCover, planStep };
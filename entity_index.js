@@ -0,0 +1,108 @@
+// entity_index.js
+// Spatial hash of the entities around one bot, kept current from entitySpawn /
+// entityMoved / entityGone. Entities are bucketed by kind (hostile, item,
+// player, other) into CELL-sized x/z cells, so "nearest hostiles within r"
+// looks at the cells around the bot instead of every loaded entity.
+const { blockSets } = require('./block_registry');
+
+const CELL = 8;
+const KINDS = ['hostile', 'item', 'player', 'other'];
+
+function cellKey(cx, cz) {
+    return `${cx},${cz}`;
+}
+
+class EntityIndex {
+    constructor(bot) {
+        this.bot = bot;
+        this.known = blockSets(bot);
+        // kind -> Map(cell key -> Set of entities)
+        this.cells = Object.fromEntries(KINDS.map(kind => [kind, new Map()]));
+        // entity id -> { kind, cell }
+        this.placed = new Map();
+    }
+
+    kindOf(entity) {
+        if (entity.type === 'player') return 'player';
+        if (entity.name === 'item' || entity.objectType === 'Item' || entity.objectType === 'item') return 'item';
+        if (this.known.hostileMobs.has(entity.name)) return 'hostile';
+        return 'other';
+    }
+
+    // Insert or move an entity; cheap when it stays in the same cell.
+    track(entity) {
+        if (!entity || !entity.position || entity === this.bot.entity) return;
+        const cell = cellKey(Math.floor(entity.position.x / CELL), Math.floor(entity.position.z / CELL));
+        const placed = this.placed.get(entity.id);
+        if (placed && placed.cell === cell) return;
+        if (placed) this.remove(entity);
+        const kind = this.kindOf(entity);
+        const cells = this.cells[kind];
+        let bucket = cells.get(cell);
+        if (!bucket) cells.set(cell, bucket = new Set());
+        bucket.add(entity);
+        this.placed.set(entity.id, { kind, cell });
+    }
+
+    remove(entity) {
+        const placed = this.placed.get(entity.id);
+        if (!placed) return;
+        const cells = this.cells[placed.kind];
+        const bucket = cells.get(placed.cell);
+        if (bucket) {
+            bucket.delete(entity);
+            if (!bucket.size) cells.delete(placed.cell);
+        }
+        this.placed.delete(entity.id);
+    }
+
+    // Up to k entities of a kind within r of point, nearest first. Cells are
+    // visited in rings around point and the search stops once a ring cannot
+    // hold anything closer than the k-th hit.
+    nearest(kind, point, r, k = Infinity, filter = null) {
+        const cells = this.cells[kind];
+        if (!cells) throw new Error(`Unknown entity kind: ${kind}`);
+        const cx = Math.floor(point.x / CELL);
+        const cz = Math.floor(point.z / CELL);
+        const rings = Math.ceil(r / CELL);
+        const hits = [];
+        for (let ring = 0; ring <= rings; ring++) {
+            for (let dx = -ring; dx <= ring; dx++) {
+                for (let dz = -ring; dz <= ring; dz++) {
+                    if (Math.max(Math.abs(dx), Math.abs(dz)) !== ring) continue;
+                    const bucket = cells.get(cellKey(cx + dx, cz + dz));
+                    if (!bucket) continue;
+                    for (const entity of bucket) {
+                        if (entity.isValid === false) continue;
+                        const d = entity.position.distanceTo(point);
+                        if (d <= r && (!filter || filter(entity))) hits.push({ d, entity });
+                    }
+                }
+            }
+            // anything in ring + 1 is at least ring * CELL away horizontally
+            if (hits.length >= k) {
+                hits.sort((a, b) => a.d - b.d);
+                if (hits[k - 1].d <= ring * CELL) break;
+            }
+        }
+        hits.sort((a, b) => a.d - b.d);
+        if (hits.length > k) hits.length = k;
+        return hits.map(h => h.entity);
+    }
+
+    within(kind, point, r) {
+        return this.nearest(kind, point, r);
+    }
+
+    counts() {
+        const out = { cells: 0 };
+        for (const kind of KINDS) {
+            out[kind] = 0;
+            for (const bucket of this.cells[kind].values()) out[kind] += bucket.size;
+            out.cells += this.cells[kind].size;
+        }
+        return out;
+    }
+}
+
+module.exports = { EntityIndex, KINDS };
@@ -0,0 +1,82 @@
+// field_planner.js
+// Turns crop plots into fields and fields into a walk. Plots on the same level
+// that touch (diagonals included, so the water hole in a 9x9 farm does not split
+// it) form a field, worked as its bounding rectangle. The rectangle is cut into
+// BAND x BAND cells; the bot stops once at the middle of each cell, walking the
+// rows in a serpentine, and handles every plot of the cell from there.
+const Vec3 = require('vec3');
+
+// plots handled from one stop; a corner of the cell is ~4.4 blocks from the eyes
+const BAND = 5;
+
+// [{ y, x0, z0, x1, z1, plots }] from plot positions
+function fieldRectangles(plots) {
+    const byKey = new Map(plots.map(p => [`${p.x},${p.y},${p.z}`, p]));
+    const seen = new Set();
+    const fields = [];
+    for (const start of plots) {
+        const startKey = `${start.x},${start.y},${start.z}`;
+        if (seen.has(startKey)) continue;
+        seen.add(startKey);
+        const field = { y: start.y, x0: start.x, z0: start.z, x1: start.x, z1: start.z, plots: 0 };
+        const stack = [start];
+        while (stack.length) {
+            const p = stack.pop();
+            field.plots++;
+            field.x0 = Math.min(field.x0, p.x); field.x1 = Math.max(field.x1, p.x);
+            field.z0 = Math.min(field.z0, p.z); field.z1 = Math.max(field.z1, p.z);
+            for (let dx = -1; dx <= 1; dx++) {
+                for (let dz = -1; dz <= 1; dz++) {
+                    const key = `${p.x + dx},${p.y},${p.z + dz}`;
+                    if (seen.has(key) || !byKey.has(key)) continue;
+                    seen.add(key);
+                    stack.push(byKey.get(key));
+                }
+            }
+        }
+        fields.push(field);
+    }
+    return fields;
+}
+
+// middle of each BAND-wide segment of lo..hi
+function segmentCentres(lo, hi, band = BAND) {
+    const out = [];
+    for (let start = lo; start <= hi; start += band) out.push(Math.floor((start + Math.min(start + band - 1, hi)) / 2));
+    return out;
+}
+
+// Stops along rows that run with the field's longer side, alternating direction.
+function serpentineStops(field, band = BAND) {
+    const alongX = field.x1 - field.x0 >= field.z1 - field.z0;
+    const lanes = alongX ? segmentCentres(field.z0, field.z1, band) : segmentCentres(field.x0, field.x1, band);
+    const steps = alongX ? segmentCentres(field.x0, field.x1, band) : segmentCentres(field.z0, field.z1, band);
+    const stops = [];
+    lanes.forEach((lane, i) => {
+        const row = i % 2 ? [...steps].reverse() : steps;
+        for (const step of row) stops.push(alongX ? new Vec3(step, field.y, lane) : new Vec3(lane, field.y, step));
+    });
+    return stops;
+}
+
+function fieldCells(field) {
+    const cells = [];
+    for (let x = field.x0; x <= field.x1; x++) {
+        for (let z = field.z0; z <= field.z1; z++) cells.push(new Vec3(x, field.y, z));
+    }
+    return cells;
+}
+
+// Plot positions of the field within half a band of a stop.
+function bandCells(stop, field, band = BAND) {
+    const half = Math.floor(band / 2);
+    const cells = [];
+    for (let x = Math.max(field.x0, stop.x - half); x <= Math.min(field.x1, stop.x + half); x++) {
+        for (let z = Math.max(field.z0, stop.z - half); z <= Math.min(field.z1, stop.z + half); z++) {
+            cells.push(new Vec3(x, field.y, z));
+        }
+    }
+    return cells;
+}
+
+module.exports = { BAND, fieldRectangles, serpentineStops, bandCells, fieldCells };
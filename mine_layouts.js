@@ -0,0 +1,73 @@
+// mine_layouts.js
+// The cells each !stripmine mode digs, from the start and end corners:
+//   tunnel  - 1 wide, 2 tall, along x then z at the start's height
+//   branch  - a tunnel along the longer axis with 1x2 branches off both sides
+//             every `spacing` blocks, `length` long; spacing 3 leaves two-block
+//             walls, so every wall block is exposed on at least one face
+//   volume  - every block in the box
+// Cells come in digging order from the start, so tunnels advance from the bot.
+const Vec3 = require('vec3');
+
+const MAX_VOLUME = 32768;
+
+function tunnelCells(start, end) {
+    const cells = [];
+    const dx = Math.sign(end.x - start.x), dz = Math.sign(end.z - start.z);
+    const pos = start.clone();
+    while (true) {
+        cells.push(pos.clone(), pos.offset(0, 1, 0));
+        if (pos.x !== end.x) pos.x += dx;
+        else if (pos.z !== end.z) pos.z += dz;
+        else break;
+    }
+    return cells;
+}
+
+function branchCells(start, end, spacing = 3, length = 16) {
+    const alongX = Math.abs(end.x - start.x) >= Math.abs(end.z - start.z);
+    const mainEnd = alongX ? new Vec3(end.x, start.y, start.z) : new Vec3(start.x, start.y, end.z);
+    const cells = [];
+    const main = tunnelCells(start, mainEnd);
+    for (let i = 0; i < main.length; i += 2) {
+        cells.push(main[i], main[i + 1]);
+        if ((i / 2) % spacing || i === 0) continue;
+        const at = main[i];
+        for (const side of [1, -1]) {
+            const branchEnd = alongX ? at.offset(0, 0, side * length) : at.offset(side * length, 0, 0);
+            // skip the branch's first cell, which is the main tunnel itself
+            cells.push(...tunnelCells(at, branchEnd).slice(2));
+        }
+    }
+    return cells;
+}
+
+function volumeCells(a, b) {
+    const lo = new Vec3(Math.min(a.x, b.x), Math.min(a.y, b.y), Math.min(a.z, b.z));
+    const hi = new Vec3(Math.max(a.x, b.x), Math.max(a.y, b.y), Math.max(a.z, b.z));
+    const size = (hi.x - lo.x + 1) * (hi.y - lo.y + 1) * (hi.z - lo.z + 1);
+    if (size > MAX_VOLUME) throw new Error(`Volume of ${size} blocks is over the ${MAX_VOLUME} block limit`);
+    const cells = [];
+    // top layer first, so nothing is left overhanging a cleared layer
+    for (let y = hi.y; y >= lo.y; y--) {
+        for (let x = lo.x; x <= hi.x; x++) {
+            for (let z = lo.z; z <= hi.z; z++) cells.push(new Vec3(x, y, z));
+        }
+    }
+    return cells;
+}
+
+// Solid blocks left with an open face after digging `cells`: what the dig
+// exposed, the thing that decides how much ore a mining pattern finds.
+function exposedBlocks(cells, isSolid) {
+    const dug = new Set(cells.map(p => p.toString()));
+    const exposed = new Set();
+    for (const p of cells) {
+        for (const [dx, dy, dz] of [[1, 0, 0], [-1, 0, 0], [0, 1, 0], [0, -1, 0], [0, 0, 1], [0, 0, -1]]) {
+            const n = p.offset(dx, dy, dz);
+            if (!dug.has(n.toString()) && isSolid(n)) exposed.add(n.toString());
+        }
+    }
+    return exposed.size;
+}
+
+module.exports = { MAX_VOLUME, tunnelCells, branchCells, volumeCells, exposedBlocks };
@@ -1,872 +1,342 @@
 // mineflayer_wrapper.js
 const fs = require('fs');
 const path = require('path');
-const mineflayer = require('mineflayer');
-const { pathfinder, Movements, goals: { GoalBlock, GoalNear } } = require('mineflayer-pathfinder');
-const readline = require('readline');
-const mcData = require('minecraft-data');
-const Vec3 = require('vec3');
+const net = require('net');
+const { EventEmitter } = require('events');
+const codec = require('./bridge_codec');
+const { runBatch } = require('./command_batch');
 
 const HOME_FILE = path.join(__dirname, 'bot_home.json');
 
 const HOST = process.env.HOST || 'localhost';
 const PORT = parseInt(process.env.PORT) || 25565;
 const USERNAME = process.env.USERNAME || 'PythonBot';
+// USERNAMES=a,b,c starts several bots in this one process (bot id = username)
+const USERNAMES = (process.env.USERNAMES || USERNAME).split(',').map(s => s.trim()).filter(Boolean);
 
-const bot = mineflayer.createBot({ host: HOST, port: PORT, username: USERNAME });
-bot.loadPlugin(pathfinder);
+// BRIDGE_STUB=1 runs the bridge without mineflayer or a server: bots are stubs
+// that acknowledge/echo commands. Used by bridge_benchmark.py.
+const STUB = process.env.BRIDGE_STUB === '1';
+const { createBotSession } = STUB ? {} : require('./bot_session');
 
-let autoMode = false;
-let autoInterval = null;
-
-let defaultMove;
-bot.once('spawn', () => {
-    const data = mcData(bot.version);
-    bot.chat('Hello world!');
-    defaultMove = new Movements(bot, data);
-    sendEvent({ event: 'spawn', message: 'Bot spawned!' });
-    loadHome();
-    bot.chat('Boot Up complete! Ready for commands!');
-});
-
-function sendEvent(event) {
-    console.log(JSON.stringify(event));
-}
+// When set, the bridge listens on this Unix socket instead of stdin/stdout so
+// controllers can attach, detach and reattach while the bot stays logged in.
+const SOCKET_PATH = process.env.BRIDGE_SOCKET || null;
 
 // -----------------------------
-// Persistence: home chest
+// Bridge framing handshake
 // -----------------------------
-let homeChest = null; // {x,y,z,world?}
-
-function saveHome() {
-    try {
-        fs.writeFileSync(HOME_FILE, JSON.stringify(homeChest || null, null, 2), 'utf8');
-        bot.chat('Home chest saved.');
-    } catch (e) {
-        bot.chat(`Failed to save home: ${e.message}`);
+// The controller asks for a framing via BRIDGE_FRAMING; we always answer with one
+// JSON hello line and then switch both directions to the announced framing.
+const FRAMING = process.env.BRIDGE_FRAMING === 'msgpack' ? 'msgpack' : 'json';
+if (!SOCKET_PATH) {
+    process.stdout.write(JSON.stringify({ event: 'hello', framing: FRAMING, protocol: 1 }) + '\n');
+    if (FRAMING === 'msgpack') {
+        // stray console.log output would corrupt binary frames, keep it on stderr
+        console.log = console.error;
     }
 }
 
-function loadHome() {
-    try {
-        if (fs.existsSync(HOME_FILE)) {
-            const data = JSON.parse(fs.readFileSync(HOME_FILE, 'utf8'));
-            if (data && typeof data.x === 'number') {
-                homeChest = data;
-                bot.chat(`Loaded home chest at ${homeChest.x}, ${homeChest.y}, ${homeChest.z}`);
-            }
-        }
-    } catch (e) {
-        bot.chat(`Error loading home: ${e.message}`);
-    }
-}
+// Every attached peer (stdio controller or socket client) is a sink; events are
+// encoded at most once per framing and broadcast to all of them.
+const sinks = new Set();
+const OBSERVER_MAX_BUFFER = 8 * 1024 * 1024;
 
-// -----------------------------
-// Utilities: inventory, armor, weapons
-// -----------------------------
-const MATERIAL_PRIORITY = ['netherite', 'diamond', 'iron', 'chainmail', 'gold', 'leather'];
-
-function findBestArmorItemForSlot(slot) {
-    const slotNames = {
-        head: ['helmet', 'head'],
-        torso: ['chestplate', 'chest'],
-        legs: ['leggings', 'legs'],
-        feet: ['boots', 'feet']
-    };
-    const names = slotNames[slot];
-    const candidates = bot.inventory.items().filter(it => {
-        const nm = it.name.toLowerCase();
-        return names.some(n => nm.includes(n));
-    });
-    candidates.sort((a, b) => {
-        const an = a.name.toLowerCase();
-        const bn = b.name.toLowerCase();
-        const aIndex = MATERIAL_PRIORITY.findIndex(m => an.includes(m));
-        const bIndex = MATERIAL_PRIORITY.findIndex(m => bn.includes(m));
-        return (aIndex === -1 ? 99 : aIndex) - (bIndex === -1 ? 99 : bIndex);
-    });
-    return candidates.length ? candidates[0] : null;
-}
-
-async function equipBestArmor() {
-    try {
-        const slotMap = [
-            { name: 'head', equipSlot: 'head' },
-            { name: 'torso', equipSlot: 'torso' },
-            { name: 'legs', equipSlot: 'legs' },
-            { name: 'feet', equipSlot: 'feet' },
-        ];
-        for (const s of slotMap) {
-            const item = findBestArmorItemForSlot(s.name);
-            if (item) {
-                try {
-                    await bot.equip(item, s.equipSlot);
-                    bot.chat(`Equipped ${item.name} in ${s.equipSlot}`);
-                } catch (e) {
-                    bot.chat(`Couldn't equip ${item.name}: ${e.message}`);
-                }
-            }
-        }
-    } catch (err) {
-        bot.chat(`Error during equip: ${err.message}`);
+function sendEvent(event) {
+    const encoded = {};
+    for (const sink of sinks) {
+        // a stalled read-only client loses events rather than growing our memory
+        if (sink.role === 'observer' && sink.stream.writableLength > OBSERVER_MAX_BUFFER) continue;
+        sink.stream.write(encoded[sink.framing] || (encoded[sink.framing] = codec.encodeFor(sink.framing, event)));
     }
 }
 
-function findBestWeapon() {
-    const items = bot.inventory.items();
-    const weaponCandidates = items.filter(it => {
-        const n = it.name.toLowerCase();
-        return n.includes('sword') || n.includes('axe') || n.includes('trident');
-    });
-    weaponCandidates.sort((a, b) => {
-        const an = a.name.toLowerCase();
-        const bn = b.name.toLowerCase();
-        const aIndex = MATERIAL_PRIORITY.findIndex(m => an.includes(m));
-        const bIndex = MATERIAL_PRIORITY.findIndex(m => bn.includes(m));
-        return (aIndex === -1 ? 99 : aIndex) - (bIndex === -1 ? 99 : bIndex);
-    });
-    return weaponCandidates.length ? weaponCandidates[0] : null;
+function sendTo(sink, event) {
+    if (sinks.has(sink)) sink.stream.write(codec.encodeFor(sink.framing, event));
 }
 
 // -----------------------------
-// Chest deposit helpers
+// Event subscriptions (filters pushed down from Python)
 // -----------------------------
-async function openChestAt(block) {
-    try {
-        return await bot.openChest(block);
-    } catch (e) {
-        // sometimes openChest fails due to range/lag — try pathing closer then open
-        try {
-            bot.pathfinder.setMovements(defaultMove);
-            bot.pathfinder.setGoal(new GoalNear(block.position.x, block.position.y, block.position.z, 1));
-            await bot.waitForTicks(20);
-            return await bot.openChest(block);
-        } catch (err) {
-            throw err;
-        }
-    }
+// Events nobody handles are dropped here, before they cost serialization and
+// pipe bandwidth. Chatty events stay off until the controller subscribes.
+// spawn/end/error/result are not subscribable and always get forwarded.
+const subscriptions = {
+    chat: { enabled: true, senders: null, prefix: null, ignoreSelf: true, sampleRate: 1 },
+    health: { enabled: false, sampleRate: 1 },
+    entity_moved: { enabled: false, sampleRate: 1 },
+    // chunk sections and block changes feeding the Python chunk mirror
+    chunks: { enabled: false, sampleRate: 1 },
+    block_update: { enabled: false, sampleRate: 1 },
+};
+const sampleCredit = {};
+
+function describeSubscription(name) {
+    const sub = subscriptions[name];
+    return {
+        event: name,
+        enabled: sub.enabled,
+        senders: sub.senders ? [...sub.senders] : null,
+        prefix: sub.prefix || null,
+        sample_rate: sub.sampleRate
+    };
 }
 
-async function depositAllIntoBlockChest(block) {
-    try {
-        const chest = await openChestAt(block);
-        const items = bot.inventory.items().filter(i => !i.name.includes('air') && !i.name.includes('chest'));
-        if (!items.length) {
-            chest.close();
-            bot.chat('Inventory empty, nothing to deposit.');
-            return true;
-        }
-        for (const item of items) {
-            try {
-                await chest.deposit(item.type, null, item.count);
-            } catch (err) {
-                bot.chat(`Couldn't deposit ${item.name}: ${err.message}`);
-            }
-        }
-        chest.close();
-        bot.chat('Deposited items into chest.');
-        return true;
-    } catch (err) {
-        bot.chat(`Failed to deposit into chest: ${err.message}`);
-        return false;
-    }
+function subscribe(args) {
+    if (!args.event) return Object.keys(subscriptions).map(describeSubscription);
+    const sub = subscriptions[args.event];
+    if (!sub) throw new Error(`Unknown event type: ${args.event}`);
+    if (args.enabled !== undefined) sub.enabled = !!args.enabled;
+    if (args.senders !== undefined) sub.senders = args.senders ? new Set(args.senders) : null;
+    if (args.prefix !== undefined) sub.prefix = args.prefix || null;
+    if (args.ignore_self !== undefined) sub.ignoreSelf = !!args.ignore_self;
+    if (args.sample_rate !== undefined) sub.sampleRate = Math.min(1, Math.max(0, Number(args.sample_rate)));
+    sampleCredit[args.event] = 0;
+    return describeSubscription(args.event);
 }
 
-// Try deposit into home chest if set and reachable
-async function depositToHomeChestIfSet() {
-    if (!homeChest) return false;
-    const b = bot.blockAt(homeChest);
-    if (!b) {
-        bot.chat('Saved home chest not found at coordinates.');
-        return false;
-    }
-    // path to home chest then deposit
-    try {
-        bot.pathfinder.setMovements(defaultMove);
-        bot.pathfinder.setGoal(new GoalNear(b.position.x, b.position.y, b.position.z, 1));
-        await bot.waitForTicks(20);
-        return await depositAllIntoBlockChest(b);
-    } catch (e) {
-        bot.chat(`Failed to deposit to home chest: ${e.message}`);
-        return false;
-    }
+// sample_rate 0.25 forwards exactly every 4th event instead of a random quarter
+function sampled(name) {
+    const rate = subscriptions[name].sampleRate;
+    if (rate >= 1) return true;
+    sampleCredit[name] = (sampleCredit[name] || 0) + rate;
+    if (sampleCredit[name] < 1) return false;
+    sampleCredit[name] -= 1;
+    return true;
 }
 
-// Main chest command: use chest under/near bot, otherwise try home chest if set
-async function placeChestAndDump() {
-    const botPos = new Vec3(
-        bot.entity.position.x,
-        bot.entity.position.y,
-        bot.entity.position.z
-    );
-
-    const below = bot.blockAt(botPos.offset(0, -1, 0));
-    const nearbyChest = bot.findBlock({
-        matching: block => block && block.name && block.name.includes('chest'),
-        maxDistance: 4
-    });
-
-    // Case 1: Chest directly below
-    if (below && below.name.includes('chest')) {
-        await depositAllIntoBlockChest(below);
-        return;
-    }
-
-    // Case 2: Nearby chest
-    if (nearbyChest) {
-        bot.chat(`Going to nearby chest at ${nearbyChest.position.x},${nearbyChest.position.y},${nearbyChest.position.z}`);
-        bot.pathfinder.setMovements(defaultMove);
-        bot.pathfinder.setGoal(new GoalNear(
-            new Vec3(nearbyChest.position.x, nearbyChest.position.y, nearbyChest.position.z),
-            1
-        ));
-        await bot.waitForTicks(20);
-        await depositAllIntoBlockChest(nearbyChest);
-        return;
+// Every bot on a server hears the same chat line; only one of them (the first
+// spawned bot on that server) passes it on, so a command runs once.
+function hearsChat(botId) {
+    const session = sessions.get(botId);
+    if (!session) return true;
+    for (const other of sessions.values()) {
+        if (other.server === session.server && other.bot.entity) return other === session;
     }
-
-    // Case 3: Saved home chest
-    if (homeChest) {
-        bot.chat('No chest nearby, attempting to deposit to saved home chest...');
-        const ok = await depositToHomeChestIfSet(); // Make sure this uses Vec3 as well
-        if (ok) return;
-        bot.chat('Could not deposit to saved home chest.');
-        return;
-    }
-
-    bot.chat('No chest found nearby and no accessible home chest. Place a chest or use !sethome while standing on/next to a chest.');
+    return true;
 }
 
-// -----------------------------
-// sethome / home handlers
-// -----------------------------
-async function setHomeAtNearbyChest() {
-    const botPos = new Vec3(
-        bot.entity.position.x,
-        bot.entity.position.y,
-        bot.entity.position.z
-    );
-    const below = bot.blockAt(botPos.offset(0, -1, 0));
-
-    const nearbyChest = bot.findBlock({
-        matching: b => b && b.name && b.name.includes('chest'),
-        maxDistance: 3
-    });
-
-    let chestBlock = null;
-    if (below && below.name.includes('chest')) chestBlock = below;
-    else if (nearbyChest) chestBlock = nearbyChest;
-
-    if (!chestBlock) {
-        bot.chat('No chest under/near you to set as home. Stand on/next to the chest and run !sethome.');
-        return;
+function isOwnBot(name) {
+    for (const session of sessions.values()) {
+        if (session.id === name || session.bot.username === name) return true;
     }
-
-    homeChest = new Vec3(
-        chestBlock.position.x,
-        chestBlock.position.y,
-        chestBlock.position.z
-    );
-    saveHome(); // Make sure this serializes homeChest correctly
-    bot.chat(`Home chest set at ${homeChest.x}, ${homeChest.y}, ${homeChest.z}`);
+    return false;
 }
 
-async function goHomeAndDeposit() {
-    if (!homeChest) {
-        bot.chat('No home chest set. Use !sethome while standing by a chest.');
-        return;
+function wantsEvent(name, sender, text, selfName, botId) {
+    if (name === 'chat' && botId !== undefined && !hearsChat(botId)) return false;
+    const sub = subscriptions[name];
+    if (!sub) return true;
+    if (!sub.enabled) return false;
+    if (sender !== undefined) {
+        if (sub.ignoreSelf && (sender === selfName || isOwnBot(sender))) return false;
+        if (sub.senders && !sub.senders.has(sender)) return false;
     }
-    // Ensure homeChest is Vec3
-    const homePos = new Vec3(homeChest.x, homeChest.y, homeChest.z);
-    const block = bot.blockAt(homePos);
-    if (!block || !block.name.includes('chest')) {
-        bot.chat('Saved home chest not found at those coordinates.');
-        return;
-    }
-    bot.chat('Going to home chest to deposit...');
-    bot.pathfinder.setMovements(defaultMove);
-    bot.pathfinder.setGoal(new GoalNear(block.position.x, block.position.y, block.position.z, 1));
-    await bot.waitForTicks(20);
-    await depositAllIntoBlockChest(block);
+    if (text !== undefined && sub.prefix && !text.startsWith(sub.prefix)) return false;
+    return sampled(name);
 }
 
 // -----------------------------
-// follow / come already implemented
+// Offline stub mode
 // -----------------------------
-function startFollowing(targetName) {
-    if (bot.followInterval) {
-        clearInterval(bot.followInterval);
-    }
-    bot.chat(`Following ${targetName}...`);
-    bot.pathfinder.setMovements(defaultMove);
-    bot.followInterval = setInterval(() => {
-        const player = bot.players[targetName]?.entity;
-        if (!player) {
-            bot.chat(`${targetName} disappeared! Stopping follow.`);
-            bot.pathfinder.stop();
-            clearInterval(bot.followInterval);
-            bot.followInterval = null;
-            return;
+// Same session interface as bot_session.js, but nothing connects anywhere:
+// every command is acknowledged with its args echoed back, batches run through
+// the same per-step path, and 'flood' emits a burst of events for throughput runs.
+function createStubSession(id, options, bridge) {
+    const bot = new EventEmitter();
+    bot.username = options.username;
+    bot.entity = null;
+
+    async function handleCommand(msg) {
+        switch (msg.command) {
+            case 'batch':
+                return await runBatch(handleCommand, msg.args.commands || [], msg.args.stop_on_error !== false);
+            case 'flood': {
+                const count = msg.args.count || 1000;
+                const payload = msg.args.payload || null;
+                for (let seq = 0; seq < count; seq++) bridge.sendEvent({ event: 'bench', bot: id, seq, payload });
+                return { sent: count };
+            }
+            case 'fail':
+                throw new Error('stub failure');
+            default:
+                return msg.args;
         }
-        bot.pathfinder.setGoal(new GoalNear(player.position.x, player.position.y, player.position.z, 1));
-    }, 1000);
-}
-
-async function comeToPlayer(targetName) {
-    const playerEntity = bot.players[targetName]?.entity;
-    if (!playerEntity) {
-        bot.chat(`Can't find ${targetName}`);
-        return;
     }
-    bot.pathfinder.setMovements(defaultMove);
-    bot.pathfinder.setGoal(new GoalNear(playerEntity.position.x, playerEntity.position.y, playerEntity.position.z, 1));
-    bot.chat(`Coming to you, ${targetName}!`);
+
+    return { id, bot, handleCommand, quit() { bot.emit('end'); } };
 }
 
 // -----------------------------
-// deforest (50 block radius) - walk through all found logs
+// Bot sessions (many bots, one process)
 // -----------------------------
-async function deforest(radius = 50) {
-    bot.chat(`Scanning for unstripped logs within ${radius} blocks...`);
-    // findBlocks returns array of Vec3 positions
-    const logs = bot.findBlocks({
-        matching: (block) => block && block.name && block.name.includes('log') && !block.name.includes('stripped'),
-        maxDistance: radius,
-        count: 2000
-    });
-
-    if (!logs || !logs.length) {
-        bot.chat('No unstripped logs found nearby.');
-        return;
-    }
-
-    // Sort by distance (closest first)
-    logs.sort((a, b) => {
-        const da = bot.entity.position.distanceTo(a);
-        const db = bot.entity.position.distanceTo(b);
-        return da - db;
+// Every command may carry a `bot` id; without one it goes to the default bot
+// (the first one started). Events from a bot carry its id the same way.
+const sessions = new Map();
+let defaultBotId = null;
+
+function spawnBot(args) {
+    const id = args.bot || args.username;
+    if (!id) throw new Error('spawn_bot needs a bot id or username');
+    if (sessions.has(id)) throw new Error(`Bot ${id} already exists`);
+    const session = (STUB ? createStubSession : createBotSession)(id, {
+        host: args.host || HOST,
+        port: args.port || PORT,
+        username: args.username || id,
+        // the first bot keeps the original home file, the rest get their own
+        homeFile: sessions.size === 0 ? HOME_FILE : path.join(__dirname, `bot_home_${id}.json`)
+    }, { sendEvent, wantsEvent });
+    session.server = `${args.host || HOST}:${args.port || PORT}`;
+    sessions.set(id, session);
+    if (defaultBotId === null) defaultBotId = id;
+    session.bot.on('end', () => {
+        if (sessions.get(id) !== session) return;
+        sessions.delete(id);
+        if (defaultBotId === id) defaultBotId = sessions.size ? sessions.keys().next().value : null;
     });
-
-    bot.chat(`Found ${logs.length} log blocks. Beginning deforesting...`);
-
-    let choppedCount = 0;
-    const inventoryLimit = 27; // conservative "full" threshold (hotbar+inventory check)
-    for (const pos of logs) {
-        // check inventory fullness
-        const freeSlots = bot.inventory.emptySlotCount();
-        if (freeSlots <= 6) { // near-full -> try deposit
-            bot.chat('Inventory low — attempting to deposit to home chest if set...');
-            const deposited = await depositToHomeChestIfSet();
-            if (!deposited) {
-                bot.chat('No home chest available; stopping deforest to avoid losing items.');
-                return;
-            }
-        }
-
-        const block = bot.blockAt(pos);
-        if (!block) continue;
-        if (!bot.canDigBlock(block)) continue;
-
-        try {
-            bot.pathfinder.setMovements(defaultMove);
-            bot.pathfinder.setGoal(new GoalNear(pos.x, pos.y, pos.z, 1));
-            // wait to get there
-            await bot.waitForTicks(20);
-            // double-check block still exists and can be dug
-            const current = bot.blockAt(pos);
-            if (!current || !bot.canDigBlock(current)) continue;
-            await bot.dig(current);
-            choppedCount++;
-            if (choppedCount % 10 === 0) bot.chat(`Chopped ${choppedCount} logs...`);
-            // small delay
-            await new Promise(r => setTimeout(r, 200));
-        } catch (err) {
-            bot.chat(`Error chopping at ${pos.x},${pos.y},${pos.z}: ${err.message}`);
-            // continue with next block
-        }
-    }
-
-    bot.chat(`Finished deforesting. Total chopped: ${choppedCount}`);
+    return { bot: id };
 }
 
-// ------------------------------
-// Farming
-// ------------------------------
-async function farmCrops(radius = 16) {
-    const crops = bot.findBlocks({
-        matching: block => {
-            if (!block) return false;
-            const name = block.name.toLowerCase();
-            // only mature crops
-            return (
-                (name.includes('wheat') && block.metadata === 7) ||
-                (name.includes('carrot') && block.metadata === 7) ||
-                (name.includes('potato') && block.metadata === 7) ||
-                (name.includes('beetroot') && block.metadata === 7)
-            );
-        },
-        maxDistance: radius,
-        count: 999
-    });
-
-    if (!crops.length) {
-        bot.chat('No mature crops found nearby.');
-        return;
-    }
-
-    bot.chat(`Found ${crops.length} mature crops. Starting farming...`);
-
-    for (const pos of crops) {
-        const block = bot.blockAt(pos);
-        if (!block) continue;
-
-        try {
-            // Move close
-            bot.pathfinder.setGoal(new GoalNear(pos.x, pos.y, pos.z, 1));
-            await bot.waitForTicks(10);
-            await bot.dig(block);
-
-            // Attempt to replant
-            let seedItem = null;
-            if (block.name.includes('wheat')) seedItem = bot.inventory.items().find(i => i.name.includes('wheat_seeds'));
-            if (block.name.includes('carrot')) seedItem = bot.inventory.items().find(i => i.name.includes('carrot'));
-            if (block.name.includes('potato')) seedItem = bot.inventory.items().find(i => i.name.includes('potato'));
-            if (block.name.includes('beetroot')) seedItem = bot.inventory.items().find(i => i.name.includes('beetroot'));
-
-            if (seedItem) {
-                await bot.equip(seedItem, 'hand');
-                await bot.placeBlock(bot.blockAt(pos.offset(0, -1, 0)), Vec3(0, 1, 0)); // plant on soil
-            }
-
-        } catch (err) {
-            bot.chat(`Error farming at ${pos.x},${pos.y},${pos.z}: ${err.message}`);
-        }
-    }
-
-    bot.chat('✅ Farming complete!');
+function removeBot(args) {
+    const session = sessionFor(args.bot);
+    sessions.delete(session.id);
+    if (defaultBotId === session.id) defaultBotId = sessions.size ? sessions.keys().next().value : null;
+    session.quit();
+    return { bot: session.id };
 }
 
-// ------------------------------
-// mining
-// ------------------------------
-async function stripMineArea(startPos, endPos, onlyOres = false) {
-    bot.chat(`Starting strip mine from ${startPos.x},${startPos.y},${startPos.z} to ${endPos.x},${endPos.y},${endPos.z}`);
-
-    const dx = Math.sign(endPos.x - startPos.x);
-    const dy = Math.sign(endPos.y - startPos.y);
-    const dz = Math.sign(endPos.z - startPos.z);
-
-    let pos = startPos.clone();
-
-    while (true) {
-        const block = bot.blockAt(pos);
-        if (block && bot.canDigBlock(block)) {
-            if (!onlyOres || (onlyOres && block.name.includes('ore'))) {
-                try {
-                    bot.pathfinder.setGoal(new GoalNear(pos.x, pos.y, pos.z, 1));
-                    await bot.waitForTicks(5);
-                    await bot.dig(block);
-                } catch (err) {
-                    bot.chat(`Error mining at ${pos.x},${pos.y},${pos.z}: ${err.message}`);
-                }
-            }
-        }
-
-        // Move pos
-        if (pos.x !== endPos.x) pos.x += dx;
-        else if (pos.y !== endPos.y) pos.y += dy;
-        else if (pos.z !== endPos.z) pos.z += dz;
-        else break; // done
-    }
-
-    bot.chat('✅ Strip mining complete!');
+function listBots() {
+    return [...sessions.values()].map(s => ({
+        bot: s.id,
+        username: s.bot.username,
+        spawned: !!s.bot.entity,
+        default: s.id === defaultBotId
+    }));
 }
 
-// -----------------------------
-// defend / combat improvements
-// -----------------------------
-function isHostileEntity(entity) {
-    if (!entity || !entity.mobType) return false;
-    const hostileNames = [
-        'zombie', 'skeleton', 'creeper', 'spider', 'husk', 'drowned',
-        'wither_skeleton', 'stray', 'witch', 'enderman', 'pillager',
-        'vindicator', 'evoker', 'vex', 'slime', 'magmacube', 'blaze', 'ghast'
-    ];
-    const name = (entity.mobType || '').toString().toLowerCase();
-    return hostileNames.some(h => name.includes(h));
+function sessionFor(id) {
+    const session = sessions.get(id === undefined || id === null ? defaultBotId : id);
+    if (!session) throw new Error(id ? `Unknown bot: ${id}` : 'No bot running');
+    return session;
 }
 
-function startDefending() {
-    if (bot.defendInterval) {
-        bot.chat('Already in defense mode.');
-        return;
+// Every command may carry an `id`; the wrapper answers it with a matching
+// `result` (or `error`) event once the handler has finished, so the
+// controller can await completion instead of guessing with sleeps.
+async function handleCommand(msg) {
+    switch (msg.command) {
+        case 'subscribe':
+            return subscribe(msg.args);
+        case 'spawn_bot':
+            return spawnBot(msg.args);
+        case 'remove_bot':
+            return removeBot(msg.args);
+        case 'list_bots':
+            return listBots();
+        default:
+            return await sessionFor(msg.bot).handleCommand(msg);
     }
-
-    bot.chat('Entering defense mode: I will engage nearby hostile mobs.');
-
-    // continuous loop
-    bot.defendInterval = setInterval(async () => {
-        try {
-            // Equip best armor occasionally
-            await equipBestArmor();
-
-            // collect hostile mobs within 40 blocks
-            const mobs = Object.values(bot.entities)
-                .filter(e => e && e.type === 'mob' && e.position && isHostileEntity(e))
-                .map(e => e)
-                .sort((a, b) => bot.entity.position.distanceTo(a.position) - bot.entity.position.distanceTo(b.position));
-
-            if (!mobs.length) return;
-
-            const target = mobs[0];
-            const dist = bot.entity.position.distanceTo(target.position);
-
-            // if target too far, skip
-            if (dist > 50) return;
-
-            // equip best weapon
-            const weapon = findBestWeapon();
-            if (weapon) {
-                try { await bot.equip(weapon, 'hand'); } catch (e) { }
-            }
-
-            // approach target
-            bot.pathfinder.setMovements(defaultMove);
-            bot.pathfinder.setGoal(new GoalNear(target.position.x, target.position.y, target.position.z, 1));
-
-            // when in melee range, attack
-            if (bot.entity.position.distanceTo(target.position) <= 3.5) {
-                try {
-                    bot.attack(target);
-                } catch (e) {
-                    // ignore attack errors
-                }
-            }
-
-            // If bot health low, retreat to home if available
-            if (bot.health && bot.health < 6) {
-                bot.chat('Low health — attempting to retreat.');
-                if (homeChest) {
-                    const block = bot.blockAt(homeChest);
-                    if (block) {
-                        bot.pathfinder.setGoal(new GoalNear(block.position.x, block.position.y, block.position.z, 1));
-                        await bot.waitForTicks(40);
-                    }
-                } else {
-                    // try to run away — move backward for a bit
-                    bot.setControlState('back', true);
-                    await new Promise(r => setTimeout(r, 2000));
-                    bot.setControlState('back', false);
-                }
-            }
-        } catch (err) {
-            // ignore per-iteration issues
-        }
-    }, 700);
 }
 
-function stopAllIntervals() {
-    if (bot.followInterval) {
-        clearInterval(bot.followInterval);
-        bot.followInterval = null;
-    }
-    if (bot.defendInterval) {
-        clearInterval(bot.defendInterval);
-        bot.defendInterval = null;
+// Replies go only to the peer that sent the command: ids are per connection, so
+// a reattached controller must never see answers meant for its predecessor.
+async function runCommand(msg, sink) {
+    const started = Date.now();
+    msg.args = msg.args || {};
+    try {
+        const data = await handleCommand(msg);
+        if (msg.id !== undefined) {
+            sendTo(sink, { event: 'result', id: msg.id, bot: msg.bot, command: msg.command, elapsed_ms: Date.now() - started, data: data === undefined ? null : data });
+        }
+    } catch (err) {
+        sendTo(sink, { event: 'error', id: msg.id, bot: msg.bot, command: msg.command, elapsed_ms: Date.now() - started, message: err.toString() });
     }
-    bot.pathfinder.stop();
-    bot.chat('Stopped active behaviors.');
 }
 
-// automated stuff
-async function depositAllExceptTools() {
-    if (!homeChest) {
-        bot.chat("No home chest set! Use !sethome while standing on a chest.");
+function onMessage(msg, sink) {
+    if (msg instanceof Error) {
+        sendTo(sink, { event: 'error', message: msg.toString() });
         return;
     }
-    const homePos = new Vec3(homeChest.x, homeChest.y, homeChest.z);
-    const chestBlock = bot.blockAt(homePos);
-    if (!chestBlock || !chestBlock.name.includes('chest')) {
-        bot.chat("Home chest not found at saved location.");
+    if (!msg || !msg.command) return;
+    if (sink.role !== 'controller') {
+        sendTo(sink, { event: 'error', id: msg.id, command: msg.command, message: 'Read-only client cannot send commands' });
         return;
     }
-
-    bot.pathfinder.setMovements(defaultMove);
-    bot.pathfinder.setGoal(new GoalNear(homePos.x, homePos.y, homePos.z, 1));
-    await bot.waitForTicks(20);
-
-    try {
-        const chest = await bot.openChest(chestBlock);
-        const items = bot.inventory.items().filter(
-            i => !i.name.includes('pickaxe') && !i.name.includes('axe') && !i.name.includes('hoe')
-        );
-
-        for (const item of items) {
-            try { await chest.deposit(item.type, null, item.count); } catch (e) { }
-        }
-        chest.close();
-        bot.chat("Deposited all non-tool items to home chest ✅");
-    } catch (err) {
-        bot.chat(`Error depositing to home chest: ${err.message}`);
-    }
+    runCommand(msg, sink);
 }
 
-// -------------------
-// AUTO MODE TASKS
-// -------------------
-async function autoTasks() {
-    while (autoMode) {
+function readMessages(stream, sink, initial) {
+    const decoder = codec.decoderFor(sink.framing);
+    const feed = (chunk) => {
+        let messages;
         try {
-            // 1️⃣ Chop Trees
-            const logs = bot.findBlocks({
-                matching: b => b && b.name.includes('log') && !b.name.includes('stripped'),
-                maxDistance: 50,
-                count: 999
-            });
-            if (logs.length) {
-                bot.chat(`Chopping ${logs.length} logs...`);
-                for (const pos of logs) {
-                    const block = bot.blockAt(pos);
-                    if (!block || !bot.canDigBlock(block)) continue;
-                    bot.pathfinder.setGoal(new GoalNear(pos.x, pos.y, pos.z, 1));
-                    await bot.waitForTicks(10);
-                    await bot.dig(block);
-                    if (bot.inventory.items().length > 28) {
-                        await depositAllExceptTools();
-                    }
-                }
-            }
-
-            // 2️⃣ Farm crops
-            const crops = bot.findBlocks({
-                matching: b => {
-                    if (!b) return false;
-                    const name = b.name.toLowerCase();
-                    return (
-                        (name.includes('wheat') && b.metadata === 7) ||
-                        (name.includes('carrot') && b.metadata === 7) ||
-                        (name.includes('potato') && b.metadata === 7) ||
-                        (name.includes('beetroot') && b.metadata === 7)
-                    );
-                },
-                maxDistance: 20,
-                count: 999
-            });
-            if (crops.length) {
-                bot.chat(`Farming ${crops.length} crops...`);
-                for (const pos of crops) {
-                    const block = bot.blockAt(pos);
-                    if (!block) continue;
-                    bot.pathfinder.setGoal(new GoalNear(pos.x, pos.y, pos.z, 1));
-                    await bot.waitForTicks(5);
-                    await bot.dig(block);
-
-                    // Try to replant from inventory
-                    let seedItem = null;
-                    if (block.name.includes('wheat')) seedItem = bot.inventory.items().find(i => i.name.includes('wheat_seeds'));
-                    if (block.name.includes('carrot')) seedItem = bot.inventory.items().find(i => i.name.includes('carrot'));
-                    if (block.name.includes('potato')) seedItem = bot.inventory.items().find(i => i.name.includes('potato'));
-                    if (block.name.includes('beetroot')) seedItem = bot.inventory.items().find(i => i.name.includes('beetroot'));
-
-                    // If no seed in inventory, check home chest
-                    if (!seedItem && homeChest) {
-                        const homePos = new Vec3(homeChest.x, homeChest.y, homeChest.z);
-                        const chestBlock = bot.blockAt(homePos);
-                        if (chestBlock && chestBlock.name.includes('chest')) {
-                            try {
-                                const chest = await bot.openChest(chestBlock);
-                                const chestItem = chest.containerItems().find(i => i.name.includes(block.name.split('_')[0]));
-                                if (chestItem) seedItem = chestItem;
-                                chest.close();
-                            } catch (e) { }
-                        }
-                    }
-
-                    if (seedItem) {
-                        await bot.equip(seedItem, 'hand');
-                        const soilBlock = bot.blockAt(pos.offset(0, -1, 0));
-                        if (soilBlock) await bot.placeBlock(soilBlock, Vec3(0, 1, 0));
-                    }
-
-                    if (bot.inventory.items().length > 28) await depositAllExceptTools();
-                }
-            }
-
-            // 3️⃣ Strip Mine Ores
-            const mineStart = bot.entity.position.offset(-5, -1, -5);
-            const mineEnd = bot.entity.position.offset(5, -5, 5);
-            await stripMineArea(mineStart, mineEnd, true); // ores only
-            await depositAllExceptTools();
-
-            // Wait a few ticks before repeating
-            await new Promise(r => setTimeout(r, 2000));
-
+            messages = decoder.push(chunk);
         } catch (err) {
-            bot.chat(`Auto mode error: ${err.message}`);
+            sendTo(sink, { event: 'error', message: err.toString() });
+            return;
         }
-    }
-}
-
-// -------------------
-// Command toggle
-// -------------------
-function toggleAutoMode(enable) {
-    if (enable) {
-        if (autoMode) return bot.chat("Auto mode already running.");
-        autoMode = true;
-        bot.chat("Auto mode enabled ✅");
-        autoTasks(); // start async loop
-    } else {
-        autoMode = false;
-        bot.chat("Auto mode disabled ❌");
-    }
+        for (const msg of messages) onMessage(msg, sink);
+    };
+    if (initial && initial.length) feed(initial);
+    stream.on('data', feed);
 }
 
-
-// -----------------------------
-// Chat bridge -> send to Python
-// -----------------------------
-bot.on('chat', (username, message) => {
-    sendEvent({ event: 'chat', user: username, message });
-});
-
 // -----------------------------
-// Command reader (from Python stdin)
+// Unix socket bridge (attach / detach)
 // -----------------------------
-const rl = readline.createInterface({ input: process.stdin });
-
-rl.on('line', async (line) => {
-    try {
-        const msg = JSON.parse(line);
-        if (!msg.command) return;
-
-        switch (msg.command) {
-            case 'chat':
-                if (msg.args.message) bot.chat(msg.args.message);
-                break;
-
-            case 'come':
-                if (msg.args.player && defaultMove) await comeToPlayer(msg.args.player);
-                break;
-
-            case 'jump':
-                bot.setControlState('jump', true);
-                setTimeout(() => bot.setControlState('jump', false), 500);
-                bot.chat('Jumped!');
-                break;
-
-            case 'help':
-                bot.chat('Commands: !hello, !status, !time, !date, !report, !auto <on/off>, !jump, !come, !respawn, !chest, !follow <player>, !follow, !stop, !deforest, !farm, !stripmine x1 y1 z1 x2 y2 z2, !equip, !defend, !sethome, !home');
-                break;
-
-            case 'auto':
-                if (msg.args.state === true) toggleAutoMode(true);
-                else if (msg.args.state === false) toggleAutoMode(false);
-                else toggleAutoMode(!autoMode); // toggle if no args
-                break;
-
-            case 'respawn':
-                if (bot.health === 0) {
-                    bot.chat('Respawning...');
-                    bot.emit('respawn');
-                } else {
-                    bot.chat('I am still alive!');
-                }
-                break;
-
-            case 'chest':
-                await placeChestAndDump();
-                break;
-
-            case 'sethome':
-                await setHomeAtNearbyChest();
-                break;
-
-            case 'home':
-                await goHomeAndDeposit();
-                break;
-
-            case 'follow':
-                if (msg.args.player) startFollowing(msg.args.player);
-                break;
-
-            case 'stop':
-                stopAllIntervals();
-                break;
-
-            case 'deforest':
-                await deforest(50); // default 50 block radius
-                break;
-
-            case 'farm':
-                await farmCrops(20);
-                break;
-
-            case 'stripmine':
-                const start = msg.args.start;
-                const end = msg.args.end;
-                if (start && end) {
-                    await stripMineArea(
-                        new Vec3(start.x, start.y, start.z),
-                        new Vec3(end.x, end.y, end.z),
-                        msg.args.onlyOres || false
-                    );
-                } else {
-                    bot.chat('Usage: !stripmine x1 y1 z1 x2 y2 z2 [onlyOres]');
-                }
-                break;
-
-            case 'equip':
-                await equipBestArmor();
-                break;
-
-            case 'defend':
-                startDefending();
-                break;
+// A client opens with one JSON line {"command":"hello","framing":...,"role":...}
+// and gets a JSON hello line back before switching to its framing. Only one
+// 'controller' may be attached at a time; any number of read-only 'observer'
+// clients (metrics, dashboards) can watch the event stream alongside it.
+function controllerAttached() {
+    for (const sink of sinks) if (sink.role === 'controller') return true;
+    return false;
+}
 
-            /*
-                        case 'move': {
-                            const dir = msg.args.direction;
-                            const controls = ['forward', 'back', 'left', 'right'];
-                            if (controls.includes(dir)) {
-                                bot.setControlState(dir, true);
-                                setTimeout(() => bot.setControlState(dir, false), 1000);
-                                bot.chat(`Moved ${dir}`);
-                            }
-                            break;
-                        }
-                        
-                        case 'pickup': {
-                            const item = bot.nearestEntity(e => e.type === 'object' && e.objectType === 'item');
-                            if (item) {
-                                bot.pathfinder.setGoal(new GoalNear(item.position.x, item.position.y, item.position.z, 1));
-                                bot.chat(`Going to pick up item`);
-                            } else {
-                                bot.chat('No items nearby.');
-                            }
-                            break;
-                        }
-                        
-                        case 'chop': {
-                            const block = bot.findBlock({ matching: b => b.name.includes('log'), maxDistance: 16 });
-                            if (block) {
-                                await bot.dig(block);
-                                bot.chat('Chopped a tree!');
-                            } else {
-                                bot.chat('No trees nearby.');
-                            }
-                            break;
-                        }
-            */
-            default:
-                bot.chat(`Unknown command: ${msg.command}`);
+function acceptClient(socket) {
+    const hello = new codec.LineDecoder();
+    const onHello = (chunk) => {
+        const lines = hello.push(chunk);
+        if (!lines.length) return;
+        socket.removeListener('data', onHello);
+        const req = lines[0] instanceof Error ? {} : lines[0];
+        const framing = req.framing === 'msgpack' ? 'msgpack' : 'json';
+        const role = req.role === 'observer' ? 'observer' : 'controller';
+        if (req.command !== 'hello') {
+            socket.end(JSON.stringify({ event: 'hello', error: 'Expected hello' }) + '\n');
+            return;
         }
+        if (role === 'controller' && controllerAttached()) {
+            socket.end(JSON.stringify({ event: 'hello', error: 'A controller is already attached' }) + '\n');
+            return;
+        }
+        socket.write(JSON.stringify({ event: 'hello', framing, role, protocol: 1, bots: [...sessions.keys()] }) + '\n');
+        const sink = { framing, role, stream: socket };
+        sinks.add(sink);
+        socket.on('close', () => sinks.delete(sink));
+        readMessages(socket, sink, hello.rest());
+    };
+    socket.on('data', onHello);
+    socket.on('error', () => socket.destroy());
+}
 
-    } catch (err) {
-        sendEvent({ event: 'error', message: err.toString() });
-    }
-});
+if (SOCKET_PATH) {
+    if (fs.existsSync(SOCKET_PATH)) fs.unlinkSync(SOCKET_PATH); // stale socket from a previous run
+    const server = net.createServer(acceptClient);
+    server.listen(SOCKET_PATH, () => {
+        fs.chmodSync(SOCKET_PATH, 0o600);
+        console.log(`Bridge listening on ${SOCKET_PATH}`);
+    });
+    process.on('exit', () => {
+        try { fs.unlinkSync(SOCKET_PATH); } catch (e) { }
+    });
+    // 'exit' does not run for signals unless we exit ourselves
+    for (const signal of ['SIGTERM', 'SIGINT', 'SIGHUP']) process.on(signal, () => process.exit(0));
+} else {
+    const stdioSink = { framing: FRAMING, role: 'controller', stream: process.stdout };
+    sinks.add(stdioSink);
+    readMessages(process.stdin, stdioSink);
+}
 
-// Error handling
-bot.on('error', (err) => sendEvent({ event: 'error', message: err.toString() }));
-bot.on('end', () => sendEvent({ event: 'end', message: 'Bot disconnected' }));
+for (const name of USERNAMES) spawnBot({ bot: name, username: name });
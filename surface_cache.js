@@ -0,0 +1,137 @@
+// surface_cache.js
+// Per-column heightmaps: for every x/z, the highest non-air block (height)
+// and the highest terrain block under it (ground: a full block that is not a
+// log or leaves). Trees, crops and most chests live in the band between the
+// two, so surface searches read a few blocks per column instead of walking
+// the whole column down through the stone. Built from chunk data on load and
+// kept current from blockUpdate.
+const Vec3 = require('vec3');
+const { blockSets } = require('./block_registry');
+
+// The distinct states a chunk section can hold, or null if that is unknown
+// (direct/global palette) and the section has to be walked.
+function sectionStates(section) {
+    if (!section) return [];
+    if (Array.isArray(section.palette)) return section.palette;
+    if (section.data && typeof section.data.value === 'number') return [section.data.value];
+    return null;
+}
+
+class SurfaceCache {
+    constructor(bot) {
+        this.bot = bot;
+        this.known = blockSets(bot);
+        // "cx,cz" -> { minY, height: Int16Array(256), ground: Int16Array(256) }, indexed z * 16 + x
+        this.columns = new Map();
+        this.probe = new Vec3(0, 0, 0);
+    }
+
+    isAir(state) {
+        return state < this.known.air.length && this.known.air[state] === 1;
+    }
+
+    isGround(state) {
+        return state < this.known.ground.length && this.known.ground[state] === 1;
+    }
+
+    build(chunkX, chunkZ, column) {
+        if (!column) return null;
+        const minY = typeof column.minY === 'number' ? column.minY : 0;
+        const sections = column.sections || [];
+        // highest section holding anything but air; everything above it is skipped
+        let top = sections.length - 1;
+        while (top >= 0) {
+            const states = sectionStates(sections[top]);
+            if (!states || states.some(s => !this.isAir(s))) break;
+            top--;
+        }
+        const entry = { minY, height: new Int16Array(256).fill(minY - 1), ground: new Int16Array(256).fill(minY - 1) };
+        const startY = minY + (top + 1) * 16 - 1;
+        for (let z = 0; z < 16; z++) {
+            for (let x = 0; x < 16; x++) this.scanColumn(column, entry, x, z, startY);
+        }
+        this.columns.set(`${chunkX},${chunkZ}`, entry);
+        return entry;
+    }
+
+    scanColumn(column, entry, x, z, startY) {
+        const p = this.probe;
+        p.x = x; p.z = z;
+        let height = entry.minY - 1;
+        let y = startY;
+        for (; y >= entry.minY; y--) {
+            p.y = y;
+            if (!this.isAir(column.getBlockStateId(p))) { height = y; break; }
+        }
+        let ground = entry.minY - 1;
+        for (; y >= entry.minY; y--) {
+            p.y = y;
+            if (this.isGround(column.getBlockStateId(p))) { ground = y; break; }
+        }
+        entry.height[z * 16 + x] = height;
+        entry.ground[z * 16 + x] = ground;
+    }
+
+    drop(chunkX, chunkZ) {
+        this.columns.delete(`${chunkX},${chunkZ}`);
+    }
+
+    entryAt(x, z) {
+        return this.columns.get(`${Math.floor(x) >> 4},${Math.floor(z) >> 4}`);
+    }
+
+    heightAt(x, z) {
+        const entry = this.entryAt(x, z);
+        return entry ? entry.height[(Math.floor(z) & 15) * 16 + (Math.floor(x) & 15)] : null;
+    }
+
+    groundAt(x, z) {
+        const entry = this.entryAt(x, z);
+        return entry ? entry.ground[(Math.floor(z) & 15) * 16 + (Math.floor(x) & 15)] : null;
+    }
+
+    // A change at or above the ground can move either mark; rescan that x/z from just above the old height.
+    update(oldBlock, newBlock) {
+        const block = newBlock || oldBlock;
+        if (!block) return;
+        const p = block.position;
+        const entry = this.entryAt(p.x, p.z);
+        if (!entry) return;
+        const i = (p.z & 15) * 16 + (p.x & 15);
+        if (p.y < entry.ground[i]) return;
+        const column = this.bot.world.getColumn(p.x >> 4, p.z >> 4);
+        if (column) this.scanColumn(column, entry, p.x & 15, p.z & 15, Math.max(entry.height[i], p.y));
+    }
+
+    // Blocks in the surface band (above ground, up to height) of one column whose
+    // state passes `wanted(state)`: calls found(x, y, z, state) in world coordinates.
+    scanBand(chunkX, chunkZ, wanted, found) {
+        const entry = this.columns.get(`${chunkX},${chunkZ}`);
+        const column = this.bot.world.getColumn(chunkX, chunkZ);
+        if (!entry || !column) return;
+        const p = this.probe;
+        for (let z = 0; z < 16; z++) {
+            p.z = z;
+            for (let x = 0; x < 16; x++) {
+                p.x = x;
+                const i = z * 16 + x;
+                // the ground block itself too: crops sit on farmland, chests can be flush with it
+                for (let y = entry.height[i]; y >= entry.ground[i] && y >= entry.minY; y--) {
+                    p.y = y;
+                    const state = column.getBlockStateId(p);
+                    if (wanted(state)) found(chunkX * 16 + x, y, chunkZ * 16 + z, state);
+                }
+            }
+        }
+    }
+
+    counts() {
+        let band = 0;
+        for (const entry of this.columns.values()) {
+            for (let i = 0; i < 256; i++) band += Math.max(0, entry.height[i] - entry.ground[i] + 1);
+        }
+        return { columns: this.columns.size, band_blocks: band };
+    }
+}
+
+module.exports = { SurfaceCache, sectionStates };
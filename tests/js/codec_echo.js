@@ -0,0 +1,15 @@
+// Decodes length-prefixed MessagePack frames from stdin with bridge_codec.js
+// and writes each value back re-encoded; tests/test_bridge_codec.py compares
+// the round trip with Python's msgpack. Input arrives in small chunks so
+// frames split across reads are exercised too.
+const codec = require('../../bridge_codec');
+
+const decoder = new codec.FrameDecoder();
+const input = [];
+process.stdin.on('data', chunk => input.push(chunk));
+process.stdin.on('end', () => {
+    const all = Buffer.concat(input);
+    for (let i = 0; i < all.length; i += 7) {
+        for (const value of decoder.push(all.subarray(i, i + 7))) process.stdout.write(codec.frame(value));
+    }
+});
@@ -0,0 +1,194 @@
+// Runs the pure planners (dig_planner, mine_layouts, field_planner,
+// tree_planner) against small generated worlds and prints what they did as
+// JSON; tests/test_planners.py checks the numbers. Run it directly to see them:
+//   node tests/js/planners.js
+const Vec3 = require('vec3');
+const { inReach, candidateSpots, bestSpot, withFallingCover, planStep } = require('../../dig_planner');
+const { tunnelCells, branchCells, volumeCells, exposedBlocks } = require('../../mine_layouts');
+const { fieldRectangles, serpentineStops, bandCells } = require('../../field_planner');
+const { groupTrees, planTour } = require('../../tree_planner');
+
+const GROUND = 64;
+const key = (x, y, z) => `${x},${y},${z}`;
+
+// Stone below GROUND, air above, plus `blocks` ("x,y,z" -> 'stone' | 'gravel' | 'log').
+class World {
+    constructor(blocks = new Map()) {
+        this.blocks = blocks;
+    }
+
+    at(x, y, z) {
+        const k = key(x, y, z);
+        if (this.blocks.has(k)) return this.blocks.get(k);
+        return y < GROUND ? 'stone' : 'air';
+    }
+
+    set(x, y, z, type) {
+        this.blocks.set(key(x, y, z), type);
+    }
+
+    solid(x, y, z) {
+        return this.at(x, y, z) !== 'air';
+    }
+
+    standable(x, y, z) {
+        return this.solid(x, y - 1, z) && !this.solid(x, y, z) && !this.solid(x, y + 1, z);
+    }
+
+    // dig a block; gravel above it falls down into the hole
+    dig(p) {
+        this.set(p.x, p.y, p.z, 'air');
+        for (let y = p.y; this.at(p.x, y + 1, p.z) === 'gravel'; y++) {
+            this.set(p.x, y, p.z, 'gravel');
+            this.set(p.x, y + 1, p.z, 'air');
+        }
+    }
+
+    env() {
+        return {
+            standable: (x, y, z) => this.standable(x, y, z),
+            blocked: (x, y, z) => this.solid(x, y, z),
+            falling: (x, y, z) => this.at(x, y, z) === 'gravel',
+        };
+    }
+}
+
+// A stone hill (x 0..lx-1, z z0..z1, GROUND..top) to dig into from x = -2.
+function hill(lx, z0, z1, top) {
+    const world = new World();
+    for (let x = 0; x < lx; x++) {
+        for (let z = z0; z <= z1; z++) {
+            for (let y = GROUND; y <= top; y++) world.set(x, y, z, 'stone');
+        }
+    }
+    return world;
+}
+
+// The digTargets loop without the walking: plan a step, stand there, dig.
+function excavate(world, targets, start) {
+    const env = world.env();
+    let remaining = withFallingCover(targets, env.falling);
+    let at = start;
+    let spots = 0;
+    let digs = 0;
+    while (spots < 1000) {
+        remaining = remaining.filter(p => world.solid(p.x, p.y, p.z));
+        if (!remaining.length) break;
+        const step = planStep(remaining, env, at);
+        if (!step) break;
+        at = step.spot;
+        spots++;
+        for (const p of step.digs) {
+            if (!inReach(step.spot, p)) throw new Error(`dig out of reach: ${p} from ${step.spot}`);
+            if (world.solid(p.x, p.y, p.z)) { world.dig(p); digs++; }
+        }
+    }
+    const left = targets.filter(p => world.solid(p.x, p.y, p.z)).length;
+    return { targets: targets.length, spots, digs, left };
+}
+
+function tunnel() {
+    const world = hill(30, -3, 3, GROUND + 4);
+    return excavate(world, tunnelCells(new Vec3(0, GROUND, 0), new Vec3(19, GROUND, 0)), new Vec3(-2, GROUND, 0));
+}
+
+function volume() {
+    const world = hill(11, 0, 10, GROUND + 4);
+    return excavate(world, volumeCells(new Vec3(0, GROUND, 0), new Vec3(10, GROUND + 4, 10)), new Vec3(-2, GROUND, 5));
+}
+
+// a tunnel under a two-high gravel stack: the gravel drops into it and is dug again
+function gravel() {
+    const world = hill(12, -3, 3, GROUND + 4);
+    world.set(5, GROUND + 2, 0, 'gravel');
+    world.set(5, GROUND + 3, 0, 'gravel');
+    const result = excavate(world, tunnelCells(new Vec3(0, GROUND, 0), new Vec3(9, GROUND, 0)), new Vec3(-2, GROUND, 0));
+    result.gravel_left = [...world.blocks.values()].filter(type => type === 'gravel').length;
+    return result;
+}
+
+// a 6-log trunk on flat ground
+function trunk() {
+    const world = new World();
+    const logs = [];
+    for (let y = GROUND; y < GROUND + 6; y++) {
+        world.set(0, y, 0, 'log');
+        logs.push(new Vec3(0, y, 0));
+    }
+    const spots = candidateSpots(logs, (x, y, z) => world.standable(x, y, z));
+    const plan = bestSpot(logs, spots, new Vec3(5, GROUND, 5));
+    return { logs: logs.length, reached: plan ? plan.targets.length : 0 };
+}
+
+// exposed blocks per block dug, with solid stone all around
+function exposure() {
+    const ratio = cells => Math.round(exposedBlocks(cells, () => true) / cells.length * 100) / 100;
+    const a = new Vec3(0, 0, 0);
+    return {
+        tunnel: ratio(tunnelCells(a, new Vec3(63, 0, 0))),
+        branch: ratio(branchCells(a, new Vec3(63, 0, 0), 3, 16)),
+        volume: ratio(volumeCells(a, new Vec3(7, 1, 7))),
+    };
+}
+
+// 9x9 farm with the water source in the middle
+function farm() {
+    const plots = [];
+    for (let x = 0; x < 9; x++) {
+        for (let z = 0; z < 9; z++) if (x !== 4 || z !== 4) plots.push(new Vec3(x, GROUND, z));
+    }
+    const fields = fieldRectangles(plots);
+    const stops = serpentineStops(fields[0]);
+    const covered = new Set();
+    let outOfReach = 0;
+    for (const stop of stops) {
+        for (const cell of bandCells(stop, fields[0])) {
+            covered.add(cell.toString());
+            if (!inReach(stop, cell)) outOfReach++;
+        }
+    }
+    const uncovered = plots.filter(p => !covered.has(p.toString())).length;
+    return { plots: plots.length, fields: fields.length, stops: stops.length, uncovered, out_of_reach: outOfReach };
+}
+
+// deterministic pseudo-random numbers (LCG), so every run plans the same forest
+function random(seed) {
+    let s = seed;
+    return () => (s = (s * 1103515245 + 12345) % 2147483648) / 2147483648;
+}
+
+// 40 trees in a 100x100 area: walked distance when logs are visited in one
+// distance sort from the start (the old deforest) vs felling tree by tree,
+// re-planning the tour from wherever the bot is after each one
+function forest() {
+    const rand = random(1);
+    const logs = [];
+    for (let i = 0; i < 40; i++) {
+        const x = Math.floor(rand() * 100) - 50, z = Math.floor(rand() * 100) - 50;
+        const height = 4 + Math.floor(rand() * 4);
+        for (let y = GROUND; y < GROUND + height; y++) logs.push(new Vec3(x, y, z));
+    }
+    const start = new Vec3(0, GROUND, 0);
+    let sorted = 0;
+    let at = start;
+    for (const log of [...logs].sort((a, b) => a.distanceTo(start) - b.distanceTo(start))) {
+        sorted += at.distanceTo(log);
+        at = log;
+    }
+    const began = Date.now();
+    let trees = groupTrees(logs);
+    const count = trees.length;
+    let replanned = 0;
+    at = start;
+    while (trees.length) {
+        const next = planTour(trees, at)[0];
+        replanned += at.distanceTo(next.base);
+        at = next.base;
+        trees = trees.filter(t => t !== next);
+    }
+    return { trees: count, sorted_walk: Math.round(sorted), tour_walk: Math.round(replanned), plan_ms: Date.now() - began };
+}
+
+console.log(JSON.stringify({
+    tunnel: tunnel(), volume: volume(), gravel: gravel(), trunk: trunk(), exposure: exposure(), farm: farm(), forest: forest(),
+}, null, 2));
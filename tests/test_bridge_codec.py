@@ -0,0 +1,40 @@
+"""Round trip through bridge_codec.js against Python's msgpack (bridge.py)."""
+import os
+import shutil
+import subprocess
+
+import pytest
+
+import bridge
+
+msgpack = pytest.importorskip("msgpack")
+pytestmark = pytest.mark.skipif(shutil.which("node") is None, reason="needs node")
+
+SCRIPT = os.path.join(os.path.dirname(__file__), "js", "codec_echo.js")
+
+INTS = [0, 1, 127, 128, 255, 256, 65535, 65536, 2**32 - 1, 2**32, 2**40, 2**53 - 1,
+        -1, -32, -33, -128, -129, -32768, -32769, -2**31, -2**31 - 1, -2**40]
+VALUES = [
+    None, True, False, 1.5, -0.25, 1e300,
+    "", "a" * 31, "a" * 32, "b" * 255, "c" * 256, "d" * 70000, "ünïcødé ✓", "日本語" * 20,
+    b"", b"\x00\xff" * 10, b"x" * 300, b"y" * 70000,
+    [], list(range(15)), list(range(16)), list(range(70000)),
+    {}, {f"k{i}": i for i in range(15)}, {f"k{i}": i for i in range(16)},
+    {"event": "chunk_section", "x": -3, "y": 4, "z": 12, "palette": [0, 10, 70000], "bits": 2,
+     "data": [1, 2, 3], "nested": {"list": [{"a": None}, [True, False]], "f": -1.5}},
+] + INTS
+
+
+def echo(values):
+    payload = b"".join(bridge.encode(value, "msgpack") for value in values)
+    out = subprocess.run(["node", SCRIPT], input=payload, capture_output=True, check=True, timeout=60).stdout
+    decoded = []
+    while out:
+        length = int.from_bytes(out[:4], "big")
+        decoded.append(msgpack.unpackb(out[4:4 + length], raw=False))
+        out = out[4 + length:]
+    return decoded
+
+
+def test_values_survive_a_round_trip_through_node():
+    assert echo(VALUES) == VALUES
@@ -0,0 +1,41 @@
+import asyncio
+
+import bot_controller
+
+
+class RecordingBot:
+    def __init__(self):
+        self.sent = []
+
+    def send_command(self, command, args):
+        self.sent.append((command, args))
+
+
+def chat(message):
+    bot = RecordingBot()
+    asyncio.run(bot_controller.handle_chat(bot, bot_controller.ALLOWED_USER, message))
+    return bot.sent
+
+
+def test_stripmine_branch_options():
+    assert chat("!stripmine 0 0 0 9 0 0 branch 4 8") == [("stripmine", {
+        "start": {"x": 0, "y": 0, "z": 0}, "end": {"x": 9, "y": 0, "z": 0},
+        "mode": "branch", "spacing": 4, "length": 8})]
+
+
+def test_stripmine_bad_numbers_get_the_usage_line():
+    for message in ("!stripmine 0 0 0 9 0 0 branch wide", "!stripmine 0 0 zero 9 0 0",
+                    "!stripmine 0 0 0 9 0 0 branch 0", "!stripmine 0 0 0 9 0 0 branch 3 -1",
+                    "!stripmine 0 0 0 9 0 0 spiral", "!stripmine 0 0 0"):
+        [(command, args)] = chat(message)
+        assert command == "chat" and args["message"].startswith("Usage: !stripmine"), message
+
+
+def test_at_bot_sends_the_command_to_that_bot():
+    async def run():
+        process = bot_controller.BotProcess(username="Main", usernames=["Main", "Miner2"])
+        await bot_controller.handle_chat(process, bot_controller.ALLOWED_USER, "!deforest @miner2")
+        await bot_controller.handle_chat(process, bot_controller.ALLOWED_USER, "!farm")
+        return [entry["message"] for entry in process.outbox]
+    assert asyncio.run(run()) == [{"command": "deforest", "args": {}, "bot": "Miner2"},
+                                  {"command": "farm", "args": {}}]
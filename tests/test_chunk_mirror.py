@@ -0,0 +1,19 @@
+import numpy as np
+
+import chunk_mirror
+
+
+def test_negative_float_positions_floor_into_their_section():
+    assert chunk_mirror.section_key(-0.5, 63.9, -16.0) == (-1, 3, -1)
+    assert chunk_mirror.section_key(-16.5, -0.1, 15.9) == (-2, -1, 0)
+    assert chunk_mirror.section_index(-0.5, -0.1, -16.5) == (15, 15, 15)
+
+
+def test_block_at_negative_float_position():
+    mirror = chunk_mirror.ChunkMirror()
+    section = np.zeros(chunk_mirror.SECTION_SHAPE, dtype=np.uint16)
+    section[15, 15, 15] = 7
+    mirror.sections[(-1, -1, -1)] = section
+    assert mirror.block_at(-0.5, -0.5, -0.5) == 7
+    mirror.set_block(-0.2, -0.2, -0.2, 9)
+    assert mirror.block_at(-1, -1, -1) == 9
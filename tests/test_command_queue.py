@@ -0,0 +1,52 @@
+import asyncio
+
+import bot_controller
+
+
+def queued(process):
+    return [(entry["message"]["command"], entry["message"]["args"]) for entry in process.outbox]
+
+
+def test_retarget_coalesces_in_place_when_last():
+    async def run():
+        process = bot_controller.BotProcess(username="bot")
+        first = process.send_command("follow", {"player": "A"})
+        second = process.send_command("follow", {"player": "B"})
+        assert queued(process) == [("follow", {"player": "B"})]
+        assert process.outbox[0]["futures"] == [first, second]
+        assert process.metrics()["coalesced"] == 1
+    asyncio.run(run())
+
+
+def test_retarget_moves_behind_later_commands():
+    async def run():
+        process = bot_controller.BotProcess(username="bot")
+        first = process.send_command("follow", {"player": "A"})
+        process.send_command("stop", {})
+        second = process.send_command("follow", {"player": "B"})
+        assert queued(process) == [("stop", {}), ("follow", {"player": "B"})]
+        assert process.outbox[1]["futures"] == [first, second]
+        assert process.queued_by_key[("follow", None)] is process.outbox[1]
+        assert process.metrics()["enqueued"] == 2
+    asyncio.run(run())
+
+
+def test_other_bots_commands_do_not_block_coalescing():
+    async def run():
+        process = bot_controller.BotProcess(username="bot")
+        process.send_command("follow", {"player": "A"}, bot="a")
+        process.send_command("stop", {}, bot="b")
+        process.send_command("follow", {"player": "B"}, bot="a")
+        assert queued(process) == [("follow", {"player": "B"}), ("stop", {})]
+    asyncio.run(run())
+
+
+def test_subscribe_updates_merge_while_queued():
+    async def run():
+        process = bot_controller.BotProcess(username="bot")
+        first = process.subscribe("chat", senders=["Alice"])
+        second = process.subscribe("chat", prefix="?")
+        assert queued(process) == [("subscribe", {"event": "chat", "enabled": True, "senders": ["Alice"],
+                                                  "prefix": "?"})]
+        assert process.outbox[0]["futures"] == [first, second]
+    asyncio.run(run())
@@ -0,0 +1,55 @@
+"""Checks on the Node planners, run through tests/js/planners.js."""
+import json
+import os
+import shutil
+import subprocess
+
+import pytest
+
+pytestmark = pytest.mark.skipif(shutil.which("node") is None, reason="needs node")
+
+SCRIPT = os.path.join(os.path.dirname(__file__), "js", "planners.js")
+
+
+@pytest.fixture(scope="module")
+def results():
+    out = subprocess.run(["node", SCRIPT], capture_output=True, text=True, check=True, timeout=60)
+    return json.loads(out.stdout)
+
+
+def test_excavation_digs_every_target_in_reach(results):
+    # planners.js raises if a planned dig is out of reach of its spot
+    for case in ("tunnel", "volume", "gravel"):
+        assert results[case]["left"] == 0, case
+        assert results[case]["spots"] < 1000, case
+
+
+def test_excavation_needs_few_spots(results):
+    assert results["tunnel"]["targets"] == 40 and results["tunnel"]["spots"] <= 6
+    assert results["volume"]["targets"] == 605 and results["volume"]["spots"] <= 15
+
+
+def test_gravel_that_falls_in_is_dug_again(results):
+    # two gravel blocks above the tunnel: each one is dug once more
+    assert results["gravel"]["digs"] == results["gravel"]["targets"] + 2
+    assert results["gravel"]["gravel_left"] == 0
+
+
+def test_a_trunk_is_felled_from_one_spot(results):
+    assert results["trunk"]["reached"] == results["trunk"]["logs"]
+
+
+def test_exposed_blocks_per_block_dug(results):
+    assert results["exposure"] == {"tunnel": 3.03, "branch": 2.89, "volume": 1.5}
+
+
+def test_a_farm_is_worked_from_a_few_stops(results):
+    farm = results["farm"]
+    assert (farm["plots"], farm["fields"], farm["stops"]) == (80, 1, 4)
+    assert farm["uncovered"] == 0 and farm["out_of_reach"] == 0
+
+
+def test_tree_tour_walks_far_less_than_a_distance_sort(results):
+    forest = results["forest"]
+    assert forest["trees"] == 40
+    assert forest["tour_walk"] * 4 < forest["sorted_walk"]
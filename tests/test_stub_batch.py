@@ -0,0 +1,35 @@
+import asyncio
+import shutil
+
+import pytest
+
+import bot_controller
+
+pytestmark = pytest.mark.skipif(shutil.which("node") is None, reason="needs node")
+
+STEPS = [("echo", {"a": 1}), ("fail", {}), ("echo", {"b": 2})]
+
+
+def run_batch(monkeypatch, stop_on_error):
+    monkeypatch.setenv("BRIDGE_STUB", "1")
+
+    async def run():
+        process = bot_controller.BotProcess(username="bot")
+        await process.start()
+        try:
+            return (await process.send_batch(STEPS, stop_on_error=stop_on_error))["data"]
+        finally:
+            await process.stop()
+    return asyncio.run(run())
+
+
+def test_stub_batch_stops_at_the_first_failure(monkeypatch):
+    data = run_batch(monkeypatch, True)
+    assert (data["completed"], data["total"]) == (1, 3)
+    assert [step["ok"] for step in data["results"]] == [True, False]
+
+
+def test_stub_batch_runs_every_step_without_stop_on_error(monkeypatch):
+    data = run_batch(monkeypatch, False)
+    assert (data["completed"], data["total"]) == (2, 3)
+    assert data["results"][2]["data"] == {"b": 2}
@@ -0,0 +1,78 @@
+import bot_controller
+import chunk_mirror
+import world_cache
+
+BLOCK_STATES = {"air": (0, 0), "stone": (1, 1), "oak_log": (10, 12)}
+OVERWORLD = "minecraft:overworld"
+
+
+def make_mirror(root, dimension=OVERWORLD):
+    mirror = chunk_mirror.ChunkMirror()
+    mirror.load_block_states({"blocks": BLOCK_STATES, "dimension": dimension, "version": "1.20.1",
+                              "min_y": -64, "height": 384})
+    mirror.attach_cache(world_cache.WorldCache(str(root), dimension, "1.20.1", -64, 384, mirror.block_states))
+    return mirror
+
+
+def log_section(x=0, y=0, z=0):
+    # one log at the section's first block, the rest air
+    return {"event": "chunk_section", "x": x, "y": y, "z": z, "palette": [0, 10], "bits": 1,
+            "data": [1] + [0] * 511}
+
+
+def logs_in(mirror, key):
+    region, slot = mirror.cache.locate(key)
+    return int(region.summary[slot + (world_cache.CATEGORIES.index("logs"),)])
+
+
+def test_breaking_a_log_lowers_the_summary_without_overflow(tmp_path):
+    mirror = make_mirror(tmp_path)
+    mirror.apply(log_section())
+    assert logs_in(mirror, (0, 0, 0)) == 1
+    mirror.apply({"event": "block_update", "x": 0, "y": 0, "z": 0, "state": 0})
+    assert logs_in(mirror, (0, 0, 0)) == 0
+    assert mirror.block_at(0, 0, 0) == 0
+
+
+def test_summary_is_clamped_at_zero(tmp_path):
+    mirror = make_mirror(tmp_path)
+    mirror.apply(log_section())
+    mirror.cache.note_change((0, 0, 0), 10, 0)
+    # a second removal the summary never counted (e.g. a missed update)
+    mirror.cache.note_change((0, 0, 0), 10, 0)
+    assert logs_in(mirror, (0, 0, 0)) == 0
+
+
+def test_dimension_change_reopens_the_cache(tmp_path):
+    process = bot_controller.BotProcess(username="bot")
+    mirror = make_mirror(tmp_path / "localhost_52387")
+    process.mirrors["bot"] = mirror
+    process.mirror_cache_dirs["bot"] = str(tmp_path)
+    process.handle_event(dict(log_section(), bot="bot"))
+    overworld = mirror.cache
+    assert overworld.stats["new"] == 1
+
+    process.handle_event({"event": "world_reset", "bot": "bot", "dimension": "minecraft:the_nether",
+                          "min_y": 0, "height": 256})
+    assert mirror.sections == {}
+    assert mirror.cache is not overworld
+    assert mirror.cache.dir.endswith("minecraft_the_nether")
+
+    process.handle_event(dict(log_section(), bot="bot", palette=[1], bits=0, data=[]))
+    assert overworld.stats["stale"] == 0
+    assert mirror.cache.stats["new"] == 1
+
+
+def test_sections_survive_a_restart_in_small_files(tmp_path):
+    mirror = make_mirror(tmp_path)
+    mirror.apply(log_section())
+    mirror.apply(log_section(x=40, y=2, z=-3))
+    mirror.cache.flush()
+
+    reopened = make_mirror(tmp_path)
+    assert reopened.cache.get((0, 0, 0))[0, 0, 0] == 10
+    assert reopened.cache.get((40, 2, -3))[0, 0, 0] == 10
+    assert reopened.cache.get((1, 0, 0)) is None
+    # no file is sized for a whole region, seen or not
+    sizes = [path.stat().st_size for path in tmp_path.rglob("r.*")]
+    assert max(sizes) <= world_cache.PAGE * 16 ** 3 * 2
@@ -0,0 +1,95 @@
+// tree_planner.js
+// Groups log positions into trees (26-connected, so diagonal branches stay with
+// their trunk) and orders the trees into a short walking tour: nearest
+// neighbour from the bot, then 2-opt until no swap shortens it. Deforesting
+// re-plans after every tree from wherever the bot ended up.
+const Vec3 = require('vec3');
+
+// trees considered per plan; farther ones are picked up by later re-plans
+const MAX_PLANNED_TREES = 64;
+const MAX_2OPT_PASSES = 20;
+
+function posKey(p) {
+    return `${p.x},${p.y},${p.z}`;
+}
+
+// [{ base, logs }] where base is the lowest log and logs are sorted bottom-up.
+function groupTrees(logs) {
+    const byKey = new Map(logs.map(p => [posKey(p), p]));
+    const seen = new Set();
+    const trees = [];
+    for (const start of logs) {
+        const startKey = posKey(start);
+        if (seen.has(startKey)) continue;
+        seen.add(startKey);
+        const members = [];
+        const stack = [start];
+        while (stack.length) {
+            const p = stack.pop();
+            members.push(p);
+            for (let dx = -1; dx <= 1; dx++) {
+                for (let dy = -1; dy <= 1; dy++) {
+                    for (let dz = -1; dz <= 1; dz++) {
+                        const key = `${p.x + dx},${p.y + dy},${p.z + dz}`;
+                        if (seen.has(key) || !byKey.has(key)) continue;
+                        seen.add(key);
+                        stack.push(byKey.get(key));
+                    }
+                }
+            }
+        }
+        members.sort((a, b) => a.y - b.y);
+        trees.push({ base: members[0], logs: members });
+    }
+    return trees;
+}
+
+function pathLength(start, trees) {
+    let total = 0;
+    let at = start;
+    for (const tree of trees) {
+        total += at.distanceTo(tree.base);
+        at = tree.base;
+    }
+    return total;
+}
+
+// Open tour over trees starting at `start`: nearest neighbour, then 2-opt.
+function planTour(trees, start) {
+    const origin = new Vec3(start.x, start.y, start.z);
+    const pool = [...trees]
+        .sort((a, b) => a.base.distanceTo(origin) - b.base.distanceTo(origin))
+        .slice(0, MAX_PLANNED_TREES);
+    const tour = [];
+    let at = origin;
+    while (pool.length) {
+        let best = 0;
+        for (let i = 1; i < pool.length; i++) {
+            if (pool[i].base.distanceTo(at) < pool[best].base.distanceTo(at)) best = i;
+        }
+        const [next] = pool.splice(best, 1);
+        tour.push(next);
+        at = next.base;
+    }
+
+    // reversing tour[i..j] swaps edges (i-1, i) and (j, j+1); the last stop has no outgoing edge
+    const point = i => (i < 0 ? origin : tour[i].base);
+    for (let pass = 0; pass < MAX_2OPT_PASSES; pass++) {
+        let improved = false;
+        for (let i = 0; i < tour.length - 1; i++) {
+            for (let j = i + 1; j < tour.length; j++) {
+                const before = point(i - 1).distanceTo(point(i)) + (j + 1 < tour.length ? point(j).distanceTo(point(j + 1)) : 0);
+                const after = point(i - 1).distanceTo(point(j)) + (j + 1 < tour.length ? point(i).distanceTo(point(j + 1)) : 0);
+                if (after < before - 1e-9) {
+                    const reversed = tour.slice(i, j + 1).reverse();
+                    tour.splice(i, reversed.length, ...reversed);
+                    improved = true;
+                }
+            }
+        }
+        if (!improved) break;
+    }
+    return tour;
+}
+
+module.exports = { groupTrees, planTour, pathLength };
@@ -0,0 +1,145 @@
+// vein_finder.js
+// Groups ore blocks into veins. Starting from an exposed ore (one with an open
+// face: air, water, a torch...) it flood-fills the 26-connected ore blocks of
+// the same kind, so ore sitting just off a tunnel line is part of the vein
+// that was seen from the tunnel. Veins are remembered until they are mined
+// out; blockUpdate removes dug blocks from them.
+const Vec3 = require('vec3');
+const { blockSets, CATEGORIES } = require('./block_registry');
+
+const ORE = CATEGORIES.indexOf('ores') + 1;
+const MAX_VEIN_BLOCKS = 256;
+const FACES = [[1, 0, 0], [-1, 0, 0], [0, 1, 0], [0, -1, 0], [0, 0, 1], [0, 0, -1]];
+const NEIGHBOURS = [];
+for (let dx = -1; dx <= 1; dx++) {
+    for (let dy = -1; dy <= 1; dy++) {
+        for (let dz = -1; dz <= 1; dz++) {
+            if (dx || dy || dz) NEIGHBOURS.push([dx, dy, dz]);
+        }
+    }
+}
+
+function posKey(x, y, z) {
+    return `${x},${y},${z}`;
+}
+
+class VeinFinder {
+    constructor(bot) {
+        this.bot = bot;
+        this.known = blockSets(bot);
+        this.nextId = 1;
+        // vein id -> { id, ore, blocks: Map(key -> Vec3), exposed }
+        this.veins = new Map();
+        // block key -> vein id
+        this.blockVein = new Map();
+        this.probe = new Vec3(0, 0, 0);
+    }
+
+    stateAt(x, y, z) {
+        this.probe.x = x; this.probe.y = y; this.probe.z = z;
+        return this.bot.world.getBlockStateId(this.probe);
+    }
+
+    isOreState(state) {
+        return state !== undefined && state < this.known.categories.length && this.known.categories[state] === ORE;
+    }
+
+    blockType(state) {
+        const block = this.bot.registry.blocksByStateId[state];
+        return block ? block.id : null;
+    }
+
+    isExposed(x, y, z) {
+        for (const [dx, dy, dz] of FACES) {
+            const block = this.bot.registry.blocksByStateId[this.stateAt(x + dx, y + dy, z + dz)];
+            if (block && block.boundingBox === 'empty') return true;
+        }
+        return false;
+    }
+
+    // Flood-fill the vein containing an ore position; returns the vein (new or known).
+    fill(start) {
+        const startKey = posKey(start.x, start.y, start.z);
+        const knownId = this.blockVein.get(startKey);
+        if (knownId !== undefined) return this.veins.get(knownId);
+        const startState = this.stateAt(start.x, start.y, start.z);
+        if (!this.isOreState(startState)) return null;
+        const type = this.blockType(startState);
+
+        const vein = { id: this.nextId++, ore: this.bot.registry.blocksByStateId[startState].name, blocks: new Map(), exposed: false };
+        const stack = [[start.x, start.y, start.z]];
+        const seen = new Set([startKey]);
+        while (stack.length && vein.blocks.size < MAX_VEIN_BLOCKS) {
+            const [x, y, z] = stack.pop();
+            const key = posKey(x, y, z);
+            vein.blocks.set(key, new Vec3(x, y, z));
+            this.blockVein.set(key, vein.id);
+            if (!vein.exposed && this.isExposed(x, y, z)) vein.exposed = true;
+            for (const [dx, dy, dz] of NEIGHBOURS) {
+                const nx = x + dx, ny = y + dy, nz = z + dz;
+                const nkey = posKey(nx, ny, nz);
+                if (seen.has(nkey)) continue;
+                seen.add(nkey);
+                const state = this.stateAt(nx, ny, nz);
+                if (this.isOreState(state) && this.blockType(state) === type) stack.push([nx, ny, nz]);
+            }
+        }
+        this.veins.set(vein.id, vein);
+        return vein;
+    }
+
+    // Veins reachable from the exposed ores the block index knows about near center.
+    discover(blockIndex, center, radius, exposedOnly = true) {
+        const found = new Map();
+        for (const pos of blockIndex.near('ores', center, radius)) {
+            const id = this.blockVein.get(posKey(pos.x, pos.y, pos.z));
+            if (id !== undefined) {
+                const vein = this.veins.get(id);
+                if (vein && (vein.exposed || !exposedOnly)) found.set(id, vein);
+                continue;
+            }
+            if (exposedOnly && !this.isExposed(pos.x, pos.y, pos.z)) continue;
+            const vein = this.fill(pos);
+            if (vein) found.set(vein.id, vein);
+        }
+        return [...found.values()];
+    }
+
+    // Veins with at least one ore inside the box lo..hi (any corner order).
+    inBox(blockIndex, a, b) {
+        const lo = new Vec3(Math.min(a.x, b.x), Math.min(a.y, b.y), Math.min(a.z, b.z)).floored();
+        const hi = new Vec3(Math.max(a.x, b.x), Math.max(a.y, b.y), Math.max(a.z, b.z)).floored();
+        const center = lo.plus(hi).scaled(0.5);
+        const radius = hi.minus(lo).scaled(0.5).norm() + 1;
+        const found = new Map();
+        for (const pos of blockIndex.near('ores', center, radius)) {
+            if (pos.x < lo.x || pos.y < lo.y || pos.z < lo.z || pos.x > hi.x || pos.y > hi.y || pos.z > hi.z) continue;
+            const vein = this.fill(pos);
+            if (vein) found.set(vein.id, vein);
+        }
+        return [...found.values()];
+    }
+
+    // Keep veins in step with the world: dug (or replaced) ore leaves its vein.
+    update(oldBlock, newBlock) {
+        if (!newBlock) return;
+        const p = newBlock.position;
+        const key = posKey(p.x, p.y, p.z);
+        const id = this.blockVein.get(key);
+        if (id === undefined || this.isOreState(newBlock.stateId)) return;
+        this.blockVein.delete(key);
+        const vein = this.veins.get(id);
+        if (!vein) return;
+        vein.blocks.delete(key);
+        if (!vein.blocks.size) this.veins.delete(id);
+        else vein.exposed = true; // digging into it opened it up
+    }
+
+    describe(vein, from) {
+        const blocks = [...vein.blocks.values()];
+        const nearest = from ? blocks.reduce((a, b) => (a.distanceTo(from) <= b.distanceTo(from) ? a : b)) : blocks[0];
+        return { id: vein.id, ore: vein.ore, count: blocks.length, exposed: vein.exposed, x: nearest.x, y: nearest.y, z: nearest.z };
+    }
+}
+
+module.exports = { VeinFinder };
@@ -0,0 +1,207 @@
+"""Persistent, memory-mapped cache of mirrored chunk sections.
+
+One directory per server and dimension, holding Anvil-sized regions of 32x32
+chunk columns. Each region is a set of ``numpy.memmap`` files:
+
+* ``r.<rx>.<rz>.present``  - uint8 per section: 0 never seen, 1 cached
+* ``r.<rx>.<rz>.summary``  - uint16 per section: block count per interest
+  category (logs, ores, crops, chests), so planning can skip empty sections
+  without reading them
+* ``r.<rx>.<rz>.slots``    - int32 per section: where its blocks are stored
+  (1-based, 0 = nowhere yet)
+* ``r.<rx>.<rz>.<n>.sections`` - uint16 state ids of PAGE sections, (PAGE, 16, 16, 16)
+
+Sections get the next free slot when first seen and pages are created as
+slots fill up, so disk use follows what was seen (512 KiB per page) on any
+filesystem, sparse files or not. Regions are opened on first use.
+ChunkMirror sections are views into the pages, which means block updates
+are written straight through. A ``meta.json`` records the layout, version,
+world height and block-state table; if any of them changes, the dimension's
+cache is discarded.
+"""
+import hashlib
+import json
+import os
+
+import numpy as np
+
+REGION = 32
+# sections per page file
+PAGE = 64
+# bumped when the file layout changes, so old caches are discarded
+LAYOUT = 2
+CATEGORIES = ("logs", "ores", "crops", "chests")
+# same rules as block_registry.js on the Node side
+CATEGORY_RULES = {
+    "logs": lambda name: "log" in name and "stripped" not in name,
+    "ores": lambda name: name.endswith("_ore") or name == "ancient_debris",
+    "crops": lambda name: name in ("wheat", "carrots", "potatoes", "beetroots"),
+    "chests": lambda name: name.endswith("chest"),
+}
+
+
+def category_table(block_states):
+    """state id -> category number (index in CATEGORIES + 1, 0 = none)."""
+    top = max((high for _, high in block_states.values()), default=0)
+    table = np.zeros(top + 1, dtype=np.uint8)
+    for name, (low, high) in block_states.items():
+        for number, category in enumerate(CATEGORIES, start=1):
+            if CATEGORY_RULES[category](name):
+                table[low:high + 1] = number
+                break
+    return table
+
+
+class Region:
+    def __init__(self, base, section_count, create):
+        mode = "w+" if create else "r+"
+        self.base = base
+        self.present = np.memmap(base + ".present", dtype=np.uint8, mode=mode,
+                                 shape=(REGION, REGION, section_count))
+        self.summary = np.memmap(base + ".summary", dtype=np.uint16, mode=mode,
+                                 shape=(REGION, REGION, section_count, len(CATEGORIES)))
+        self.slots = np.memmap(base + ".slots", dtype=np.int32, mode=mode,
+                               shape=(REGION, REGION, section_count))
+        self.allocated = int(self.slots.max())
+        self.pages = {}
+
+    def page(self, number):
+        sections = self.pages.get(number)
+        if sections is None:
+            path = f"{self.base}.{number}.sections"
+            mode = "r+" if os.path.exists(path) else "w+"
+            sections = self.pages[number] = np.memmap(path, dtype=np.uint16, mode=mode,
+                                                      shape=(PAGE, 16, 16, 16))
+        return sections
+
+    def section(self, slot, create=False):
+        """Writable view of a section's blocks; with ``create`` a slot is assigned if
+        it has none yet, otherwise None."""
+        number = int(self.slots[slot])
+        if not number:
+            if not create:
+                return None
+            self.allocated += 1
+            number = self.slots[slot] = self.allocated
+        page, offset = divmod(number - 1, PAGE)
+        return self.page(page)[offset]
+
+    def flush(self):
+        self.present.flush()
+        self.summary.flush()
+        self.slots.flush()
+        for sections in self.pages.values():
+            sections.flush()
+
+
+class WorldCache:
+    """Chunk sections of one dimension, persisted across controller restarts."""
+
+    def __init__(self, root, dimension, version, min_y, height, block_states):
+        self.dir = os.path.join(root, dimension.replace(":", "_").replace("/", "_"))
+        self.min_y = min_y
+        self.section_count = height >> 4
+        self.table = category_table(block_states)
+        self.regions = {}
+        self.stats = {"new": 0, "confirmed": 0, "stale": 0, "loaded": 0}
+        os.makedirs(self.dir, exist_ok=True)
+        digest = hashlib.sha1(json.dumps(sorted(block_states.items())).encode()).hexdigest()
+        meta = {"layout": LAYOUT, "version": version, "min_y": min_y, "height": height, "block_states": digest}
+        meta_path = os.path.join(self.dir, "meta.json")
+        if os.path.exists(meta_path):
+            with open(meta_path) as f:
+                if json.load(f) != meta:
+                    self.clear()
+        with open(meta_path, "w") as f:
+            json.dump(meta, f)
+
+    def clear(self):
+        for name in os.listdir(self.dir):
+            if name.startswith("r."):
+                os.remove(os.path.join(self.dir, name))
+        self.regions.clear()
+
+    def region(self, rx, rz, create=False):
+        region = self.regions.get((rx, rz))
+        if region is None:
+            base = os.path.join(self.dir, f"r.{rx}.{rz}")
+            if not create and not os.path.exists(base + ".present"):
+                return None
+            region = self.regions[(rx, rz)] = Region(base, self.section_count, create and not os.path.exists(base + ".present"))
+        return region
+
+    def locate(self, key, create=False):
+        cx, sy, cz = key
+        index = sy - (self.min_y >> 4)
+        if not 0 <= index < self.section_count:
+            return None, None
+        region = self.region(cx >> 5, cz >> 5, create)
+        if region is None:
+            return None, None
+        return region, (cx & 31, cz & 31, index)
+
+    def get(self, key):
+        """Cached section (a writable view into the map), or None if never seen."""
+        region, slot = self.locate(key)
+        if region is None or not region.present[slot]:
+            return None
+        self.stats["loaded"] += 1
+        return region.section(slot)
+
+    def put(self, key, section):
+        """Store a live section, checking it against what was cached; returns the view."""
+        region, slot = self.locate(key, create=True)
+        if region is None:
+            return section
+        view = region.section(slot, create=True)
+        if not region.present[slot]:
+            self.stats["new"] += 1
+        elif np.array_equal(view, section):
+            self.stats["confirmed"] += 1
+        else:
+            self.stats["stale"] += 1
+        view[...] = section
+        region.present[slot] = 1
+        region.summary[slot] = self.summarize(view)
+        return view
+
+    def summarize(self, section):
+        states = section.ravel()
+        categories = self.table[np.minimum(states, len(self.table) - 1)]
+        counts = np.bincount(categories, minlength=len(CATEGORIES) + 1)
+        return counts[1:].astype(np.uint16)
+
+    def note_change(self, key, old_state, new_state):
+        """Keep the interest summary in step with a single-block update."""
+        region, slot = self.locate(key)
+        if region is None or not region.present[slot]:
+            return
+        for state, delta in ((old_state, -1), (new_state, 1)):
+            category = self.table[state] if state is not None and state < len(self.table) else 0
+            if category:
+                # uint16 on disk: add in Python ints and clamp, never wrap below 0
+                index = slot + (category - 1,)
+                region.summary[index] = max(0, int(region.summary[index]) + delta)
+
+    def keys_in(self, lo, hi, category=None):
+        """Cached section keys between two section keys (inclusive), optionally only
+        those whose summary says they hold ``category``."""
+        wanted = CATEGORIES.index(category) if category is not None else None
+        keys = []
+        for rx in range(lo[0] >> 5, (hi[0] >> 5) + 1):
+            for rz in range(lo[2] >> 5, (hi[2] >> 5) + 1):
+                region = self.region(rx, rz)
+                if region is None:
+                    continue
+                mask = region.present.astype(bool)
+                if wanted is not None:
+                    mask &= region.summary[..., wanted] > 0
+                for lx, lz, index in zip(*np.nonzero(mask)):
+                    key = (rx * REGION + int(lx), int(index) + (self.min_y >> 4), rz * REGION + int(lz))
+                    if all(lo[i] <= key[i] <= hi[i] for i in range(3)):
+                        keys.append(key)
+        return keys
+
+    def flush(self):
+        for region in self.regions.values():
+            region.flush()